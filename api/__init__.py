@@ -1,27 +1,80 @@
+import asyncio
 from fastapi import FastAPI
-from api.db.main import init_db
+from fastapi.responses import PlainTextResponse
+from api.config import Config
+from api.db.main import dispose_engine, init_db, warm_up_db
+from api.db.redis import close_redis_clients, warm_up_redis
+from api.health.service import health_service
+from api.cache import ResponseCacheMiddleware
+from api.instrumentation import InstrumentationMiddleware
+from api.load_shedding import LoadSheddingMiddleware
+from api.metrics import MetricsMiddleware, registry
+from api.rate_limit import RateLimitHeadersMiddleware
+from api.profiling import LoopLagMonitor
+from api.follows.graph import FollowGraphRelay, FollowGraphSync
 from contextlib import asynccontextmanager
 from api.auth.routes import router as auth_router
 from api.posts.routes import router as posts_router
 from api.comments.routes import router as comments_router
 from api.votes.routes import router as votes_router
 from api.follows.routes import router as follows_router
+from api.admin.routes import router as admin_router
+from api.health.routes import router as health_router
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
+    await asyncio.gather(
+        warm_up_db(min(Config.WARMUP_DB_CONNECTIONS, Config.DB_POOL_SIZE)),
+        warm_up_redis(Config.WARMUP_REDIS_CONNECTIONS),
+    )
+    health_service.mark_started()
+    loop_lag_monitor = None
+    if Config.LOOP_LAG_MONITOR_ENABLED:
+        loop_lag_monitor = LoopLagMonitor(threshold=Config.LOOP_LAG_THRESHOLD_MS / 1000)
+        loop_lag_monitor.start()
+    follow_graph_sync = None
+    follow_graph_relay = None
+    if Config.FOLLOW_GRAPH_ENABLED:
+        follow_graph_sync = FollowGraphSync(Config.FOLLOW_GRAPH_DIR, Config.FOLLOW_GRAPH_SYNC_INTERVAL)
+        follow_graph_sync.start()
+        follow_graph_relay = FollowGraphRelay(Config.FOLLOW_GRAPH_RELAY_INTERVAL)
+        follow_graph_relay.start()
     yield
+    if follow_graph_relay is not None:
+        await follow_graph_relay.stop()
+    if follow_graph_sync is not None:
+        await follow_graph_sync.stop()
+    if loop_lag_monitor is not None:
+        loop_lag_monitor.stop()
+    await close_redis_clients()
+    await dispose_engine()
 
 version = "v1"
 
 app = FastAPI(title="chefly", version=version, description="A simple API for a cooking recipe sharing and voting", lifespan=lifespan)
 
+if Config.LOAD_SHEDDING_ENABLED:
+    app.add_middleware(LoadSheddingMiddleware)
+app.add_middleware(RateLimitHeadersMiddleware)
+app.add_middleware(ResponseCacheMiddleware)
+app.add_middleware(InstrumentationMiddleware)
+if Config.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 app.get("/")(lambda: {"message": "Hello World"})
 
-app.get("/health")(lambda: {"status": "ok"})
+app.get("/health", include_in_schema=False)(lambda: {"status": "ok"})
+
+if Config.METRICS_ENABLED:
+    app.get("/metrics", include_in_schema=False)(
+        lambda: PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+    )
 
+app.include_router(health_router)
 app.include_router(auth_router)
 app.include_router(posts_router)
 app.include_router(comments_router)
 app.include_router(votes_router)
-app.include_router(follows_router)
\ No newline at end of file
+app.include_router(follows_router)
+app.include_router(admin_router)
\ No newline at end of file
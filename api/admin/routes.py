@@ -0,0 +1,30 @@
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from api.auth.dependencies import AdminTokenBearer
+from api.config import Config
+from api.profiling import profile_event_loop, profile_in_progress
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile(
+    seconds: float = Query(default=10, gt=0, le=120),
+    interval_ms: float = Query(default=5, ge=1, le=1000),
+    token_details: dict = Depends(AdminTokenBearer())
+):
+    if not Config.PROFILING_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profiling is disabled")
+    if profile_in_progress():
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A profile is already running")
+    
+    logger.info(f"Profiling event loop for {seconds}s at {interval_ms}ms intervals")
+    collapsed = await profile_event_loop(seconds, interval_ms / 1000)
+    return PlainTextResponse(
+        content=collapsed,
+        headers={"Content-Disposition": 'attachment; filename="profile.collapsed"'},
+    )
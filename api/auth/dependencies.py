@@ -5,6 +5,7 @@ from fastapi.security.http import HTTPAuthorizationCredentials
 from .utils import decode_token
 from fastapi import HTTPException, status
 from datetime import datetime
+from api.config import Config
 from api.db.redis import add_jwt_to_blacklist, is_jwt_blacklisted
 
 class TokenBearer(HTTPBearer):
@@ -13,6 +14,8 @@ class TokenBearer(HTTPBearer):
 
     async def __call__(self, request: Request) -> Optional[HTTPAuthorizationCredentials  | None]:
         credentials = await super().__call__(request)
+        if credentials is None:
+            return None
         
         token = credentials.credentials
         
@@ -50,4 +53,11 @@ class RefreshTokenBearer(TokenBearer):
         if token_data and not token_data.get("refresh"):
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access token used")
         if token_data.get("exp") < datetime.now().timestamp():
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Token expired")
\ No newline at end of file
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Token expired")
+
+class AdminTokenBearer(AccessTokenBearer):
+    def verify_token_data(self, token_data: dict) -> None:
+        super().verify_token_data(token_data)
+        email = (token_data.get("user") or {}).get("email", "")
+        if email.lower() not in Config.admin_emails:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
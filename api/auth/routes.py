@@ -9,12 +9,13 @@ from api.config import Config
 from datetime import timedelta, datetime
 from .dependencies import RefreshTokenBearer, AccessTokenBearer
 from api.db.redis import add_jwt_to_blacklist
+from api.rate_limit import login_rate_limiter, signup_rate_limiter
 
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 user_service = UserService()
 
-@router.post("/signup")
+@router.post("/signup", dependencies=[Depends(signup_rate_limiter)])
 async def create_user(user_data: UserCreate, session: AsyncSession = Depends(get_session)):
     email =  user_data.email
     if await user_service.user_exists(email, session):
@@ -22,7 +23,7 @@ async def create_user(user_data: UserCreate, session: AsyncSession = Depends(get
     user = await user_service.create_user(user_data, session)
     return user
 
-@router.post("/login")
+@router.post("/login", dependencies=[Depends(login_rate_limiter)])
 async def login(user_data: UserLogin, session: AsyncSession = Depends(get_session)):
     email = user_data.email
     password = user_data.password
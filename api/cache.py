@@ -0,0 +1,284 @@
+"""Response-level caching for public, caller-independent GET endpoints.
+
+Serialized bodies are kept in a small in-process TTL cache in front of Redis.
+Each entry carries a strong ETag so conditional requests can be answered with
+``304 Not Modified`` without running the route (and therefore without touching
+the database). Entries are grouped so that write paths can drop everything
+derived from the data they changed.
+"""
+
+import hashlib
+import logging
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from urllib.parse import parse_qsl, urlencode
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.config import Config
+from api.db.redis import redis_client
+from api.metrics import RESPONSE_CACHE
+
+logger = logging.getLogger(__name__)
+
+_local_hits = RESPONSE_CACHE.labels("local_hit")
+_redis_hits = RESPONSE_CACHE.labels("redis_hit")
+_misses = RESPONSE_CACHE.labels("miss")
+
+RESPONSE_KEY_PREFIX = "cache:resp"
+GROUP_INDEX_PREFIX = "cache:index"
+
+# (path pattern, invalidation group). Group names may reference named groups
+# from the pattern so per-resource entries can be dropped individually.
+CACHEABLE_ROUTES = (
+    (re.compile(r"^/posts/feed$"), "feed"),
+    (
+        re.compile(r"^/follows/users/(?P<user_id>[0-9a-fA-F-]{36})/(followers|following)-count$"),
+        "follow-counts:{user_id}",
+    ),
+)
+
+
+@dataclass(slots=True)
+class CachedResponse:
+    etag: str
+    body: bytes
+    expires_at: float
+
+
+def follow_counts_group(user_id) -> str:
+    return f"follow-counts:{str(user_id).lower()}"
+
+
+def _response_key(group: str, key: str) -> str:
+    return f"{RESPONSE_KEY_PREFIX}:{group}:{key}"
+
+
+def _group_index_key(group: str) -> str:
+    return f"{GROUP_INDEX_PREFIX}:{group}"
+
+
+def _compute_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """Two-level (process-local, then Redis) store for serialized responses."""
+
+    def __init__(self, local_ttl: int, redis_ttl: int, max_entries: int):
+        self.local_ttl = local_ttl
+        self.redis_ttl = redis_ttl
+        self.max_entries = max_entries
+        self._local: OrderedDict[str, CachedResponse] = OrderedDict()
+
+    async def get(self, group: str, key: str) -> CachedResponse | None:
+        full_key = _response_key(group, key)
+        now = time.monotonic()
+
+        entry = self._local.get(full_key)
+        if entry is not None:
+            if entry.expires_at > now:
+                _local_hits.inc()
+                return entry
+            del self._local[full_key]
+
+        try:
+            raw = await redis_client.get(full_key)
+        except Exception:
+            logger.warning("Response cache read failed", exc_info=True)
+            _misses.inc()
+            return None
+        if raw is None:
+            _misses.inc()
+            return None
+        _redis_hits.inc()
+
+        etag, _, body = raw.partition("\n")
+        entry = CachedResponse(etag=etag, body=body.encode("utf-8"), expires_at=now + self.local_ttl)
+        self._store_local(full_key, entry)
+        return entry
+
+    async def set(self, group: str, key: str, body: bytes, etag: str) -> None:
+        full_key = _response_key(group, key)
+        self._store_local(
+            full_key,
+            CachedResponse(etag=etag, body=body, expires_at=time.monotonic() + self.local_ttl),
+        )
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.set(full_key, f"{etag}\n{body.decode('utf-8')}", ex=self.redis_ttl)
+                pipe.sadd(_group_index_key(group), full_key)
+                pipe.expire(_group_index_key(group), self.redis_ttl)
+                await pipe.execute()
+        except Exception:
+            logger.warning("Response cache write failed", exc_info=True)
+
+    async def invalidate(self, *groups: str) -> None:
+        prefixes = tuple(f"{RESPONSE_KEY_PREFIX}:{group}:" for group in groups)
+        for full_key in [k for k in self._local if k.startswith(prefixes)]:
+            del self._local[full_key]
+
+        for group in groups:
+            index_key = _group_index_key(group)
+            keys = await redis_client.smembers(index_key)
+            await redis_client.delete(index_key, *keys)
+
+    def _store_local(self, full_key: str, entry: CachedResponse) -> None:
+        self._local[full_key] = entry
+        self._local.move_to_end(full_key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+
+response_cache = ResponseCache(
+    local_ttl=Config.RESPONSE_CACHE_LOCAL_TTL,
+    redis_ttl=Config.RESPONSE_CACHE_TTL,
+    max_entries=Config.RESPONSE_CACHE_MAX_ENTRIES,
+)
+
+
+async def safe_invalidate(*groups: str) -> None:
+    """Best-effort invalidation; a Redis failure must not fail the write."""
+    try:
+        await response_cache.invalidate(*groups)
+    except Exception:
+        logger.warning("Failed to invalidate response cache", exc_info=True)
+
+
+class ResponseCacheMiddleware:
+    """Serve cached bodies with ETag/Cache-Control for the routes in ``CACHEABLE_ROUTES``.
+
+    Requests carrying an ``Authorization`` header bypass the cache since their
+    response may be personalised.
+    """
+
+    def __init__(self, app: ASGIApp, cache: ResponseCache = response_cache):
+        self.app = app
+        self.cache = cache
+        self.cache_control = (
+            f"public, max-age={Config.RESPONSE_CACHE_MAX_AGE}, "
+            f"stale-while-revalidate={Config.RESPONSE_CACHE_MAX_AGE * 3}"
+        ).encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        group = self._match_group(scope["path"])
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                await self.app(scope, receive, send)
+                return
+            if name == b"if-none-match":
+                if_none_match = value.decode("latin-1")
+
+        key = self._cache_key(scope)
+        entry = await self.cache.get(group, key)
+        if entry is not None:
+            await self._send_cached(send, entry, if_none_match, head=scope["method"] == "HEAD")
+            return
+
+        await self._run_and_store(scope, receive, send, group, key, if_none_match)
+
+    def _match_group(self, path: str) -> str | None:
+        for pattern, group in CACHEABLE_ROUTES:
+            match = pattern.match(path)
+            if match:
+                return group.format(**{k: v.lower() for k, v in match.groupdict().items()})
+        return None
+
+    def _cache_key(self, scope: Scope) -> str:
+        query = scope["query_string"].decode("latin-1")
+        if not query:
+            return scope["path"]
+        return f"{scope['path']}?{urlencode(sorted(parse_qsl(query, keep_blank_values=True)))}"
+
+    def _headers(self, etag: str, content_length: int | None = None) -> list[tuple[bytes, bytes]]:
+        headers = [
+            (b"etag", etag.encode("latin-1")),
+            (b"cache-control", self.cache_control),
+        ]
+        if content_length is not None:
+            headers.append((b"content-type", b"application/json"))
+            headers.append((b"content-length", str(content_length).encode("latin-1")))
+        return headers
+
+    async def _send_cached(
+        self, send: Send, entry: CachedResponse, if_none_match: str | None, head: bool = False
+    ) -> None:
+        if if_none_match and _etag_matches(if_none_match, entry.etag):
+            await send({"type": "http.response.start", "status": 304, "headers": self._headers(entry.etag)})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": self._headers(entry.etag, len(entry.body)),
+            }
+        )
+        await send({"type": "http.response.body", "body": b"" if head else entry.body})
+
+    async def _run_and_store(
+        self, scope: Scope, receive: Receive, send: Send, group: str, key: str, if_none_match: str | None
+    ) -> None:
+        start_message: Message | None = None
+        chunks: list[bytes] = []
+
+        async def capture(message: Message) -> None:
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                if message["status"] != 200:
+                    await send(message)
+                return
+
+            if start_message is None or start_message["status"] != 200:
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            etag = _compute_etag(body)
+            if scope["method"] == "GET":
+                await self.cache.set(group, key, body, etag)
+
+            if if_none_match and _etag_matches(if_none_match, etag):
+                await send({"type": "http.response.start", "status": 304, "headers": self._headers(etag)})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            headers = [
+                (name, value)
+                for name, value in start_message["headers"]
+                if name not in (b"etag", b"cache-control")
+            ]
+            headers.extend(self._headers(etag))
+            await send({**start_message, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, capture)
@@ -0,0 +1,132 @@
+"""Circuit breaker for calls to a shared dependency.
+
+The breaker counts calls and failures over a tumbling window. A failure is an
+exception listed in ``failure_exceptions``, or a call slower than
+``slow_call_threshold``. Once at least ``min_calls`` calls have been seen in
+the window and the failure rate reaches ``failure_rate``, the breaker opens.
+While open, calls fail immediately with ``CircuitOpenError`` instead of
+waiting for a socket timeout. After ``open_duration`` one trial call is let
+through (half-open). Its outcome either closes the breaker or re-opens it for
+another ``open_duration``.
+"""
+
+import logging
+import time
+from typing import Awaitable, Callable, Tuple, Type, TypeVar
+
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from api.metrics import CIRCUIT_BREAKER_STATE
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(RedisConnectionError):
+    """Raised instead of calling the dependency while the breaker is open.
+
+    It subclasses Redis' ``ConnectionError`` so existing "Redis is unavailable"
+    handling treats a fast rejection exactly like a failed connection.
+    """
+
+
+class CircuitBreaker:
+
+    def __init__(
+        self,
+        name: str,
+        failure_exceptions: Tuple[Type[BaseException], ...],
+        failure_rate: float = 0.5,
+        min_calls: int = 20,
+        window: float = 10.0,
+        slow_call_threshold: float = 0.25,
+        open_duration: float = 5.0,
+    ):
+        self.name = name
+        self.failure_exceptions = failure_exceptions
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.slow_call_threshold = slow_call_threshold
+        self.open_duration = open_duration
+
+        self.state = CLOSED
+        self._calls = 0
+        self._failures = 0
+        self._window_ends_at = time.monotonic() + window
+        self._opened_until = 0.0
+        self._trial_in_flight = False
+        self._state_gauge = CIRCUIT_BREAKER_STATE.labels(name)
+        self._state_gauge.set(_STATE_VALUES[CLOSED])
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == OPEN and time.monotonic() < self._opened_until
+
+    async def call(self, func: Callable[..., Awaitable[T]], *args, **kwargs) -> T:
+        trial = self._before_call()
+        started = time.perf_counter()
+        try:
+            result = await func(*args, **kwargs)
+        except self.failure_exceptions:
+            self._after_call(trial, failed=True)
+            raise
+        except BaseException:
+            # Application-level errors (e.g. WRONGTYPE) say nothing about the
+            # dependency's health.
+            self._after_call(trial, failed=False)
+            raise
+        self._after_call(trial, failed=time.perf_counter() - started > self.slow_call_threshold)
+        return result
+
+    def _before_call(self) -> bool:
+        if self.state == CLOSED:
+            return False
+        if self.state == OPEN and time.monotonic() >= self._opened_until:
+            self._transition(HALF_OPEN)
+        if self.state == HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        raise CircuitOpenError(f"Circuit breaker '{self.name}' is open")
+
+    def _after_call(self, trial: bool, failed: bool) -> None:
+        if trial:
+            self._trial_in_flight = False
+            if failed:
+                self._open()
+            else:
+                self._transition(CLOSED)
+            return
+        if self.state != CLOSED:
+            return
+
+        now = time.monotonic()
+        if now >= self._window_ends_at:
+            self._calls = 0
+            self._failures = 0
+            self._window_ends_at = now + self.window
+        self._calls += 1
+        if failed:
+            self._failures += 1
+            if self._calls >= self.min_calls and self._failures / self._calls >= self.failure_rate:
+                self._open()
+
+    def _open(self) -> None:
+        self._opened_until = time.monotonic() + self.open_duration
+        self._transition(OPEN)
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        log = logger.warning if state == OPEN else logger.info
+        log(f"Circuit breaker '{self.name}' {self.state} -> {state}")
+        self.state = state
+        self._state_gauge.set(_STATE_VALUES[state])
+        if state == CLOSED:
+            self._calls = 0
+            self._failures = 0
+            self._window_ends_at = time.monotonic() + self.window
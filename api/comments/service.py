@@ -2,12 +2,14 @@ from typing import List
 from uuid import UUID
 
 from fastapi import HTTPException, status
+from sqlalchemy import func, update
 from sqlalchemy.orm.attributes import set_committed_value
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from api.db.models import Comments, Posts
 from api.posts.algorithm import safe_record_interaction
+from api.posts.ranking import hot_score_sql, update_hot_score
 from api.posts.service import PostService
 
 from .schemas import CommentCreate, CommentEdit, CommentResponse
@@ -29,6 +31,7 @@ class CommentService:
             )
             if post:
                 post.comment_count += 1
+                update_hot_score(post)
                 await session.commit()
                 await session.refresh(post)
                 
@@ -177,7 +180,32 @@ class CommentService:
                     detail="You are not the author of this comment"
                 )
             
-            comment.is_deleted = True
+            if comment.is_deleted:
+                return
+            # Both updates are conditional/set-based so concurrent deletes and
+            # new comments on the same post cannot lose or double-count a decrement.
+            deleted = await session.execute(
+                update(Comments)
+                .where(Comments.id == comment_id, Comments.is_deleted.is_(False))
+                .values(is_deleted=True)
+                .returning(Comments.id)
+            )
+            if deleted.first() is not None:
+                posts_table = Posts.__table__
+                comment_count = func.greatest(func.coalesce(posts_table.c.comment_count, 0) - 1, 0)
+                await session.execute(
+                    update(posts_table)
+                    .where(posts_table.c.id == comment.post_id)
+                    .values(
+                        comment_count=comment_count,
+                        hot_score=hot_score_sql(
+                            posts_table.c.upvote_count,
+                            posts_table.c.downvote_count,
+                            comment_count,
+                            posts_table.c.created_at,
+                        ),
+                    )
+                )
             await session.commit()
         except HTTPException:
             await session.rollback()
@@ -1,9 +1,16 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import Literal, Optional
 
 class Settings(BaseSettings):
     
     DB_URL: str 
+    DB_ECHO: bool = False
+    DB_CREATE_ALL: bool = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    WARMUP_DB_CONNECTIONS: int = 5
+    WARMUP_REDIS_CONNECTIONS: int = 2
     JWT_SECRET: str 
     JWT_ALGORITHM: str 
     JWT_ACCESS_EXPIRY: int = 43200
@@ -11,6 +18,69 @@ class Settings(BaseSettings):
     REDIS_HOST: str
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
+    REDIS_MODE: Literal["standalone", "sentinel", "cluster"] = "standalone"
+    REDIS_PASSWORD: Optional[str] = None
+    REDIS_SSL: bool = False
+    REDIS_SENTINELS: str = ""
+    REDIS_SENTINEL_SERVICE: str = "mymaster"
+    REDIS_SENTINEL_PASSWORD: Optional[str] = None
+    REDIS_CLUSTER_NODES: str = ""
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_AUTH_MAX_CONNECTIONS: int = 20
+    REDIS_FYP_MAX_CONNECTIONS: int = 50
+    REDIS_SOCKET_CONNECT_TIMEOUT: float = 1.0
+    REDIS_SOCKET_TIMEOUT: float = 0.5
+    REDIS_FYP_SOCKET_TIMEOUT: float = 2.0
+    REDIS_RETRY_ATTEMPTS: int = 2
+    REDIS_RETRY_BACKOFF_BASE: float = 0.01
+    REDIS_RETRY_BACKOFF_CAP: float = 0.2
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
+    REDIS_BREAKER_ENABLED: bool = True
+    REDIS_BREAKER_FAILURE_RATE: float = 0.5
+    REDIS_BREAKER_MIN_CALLS: int = 20
+    REDIS_BREAKER_WINDOW: float = 10.0
+    REDIS_BREAKER_SLOW_CALL_MS: int = 250
+    REDIS_FYP_BREAKER_SLOW_CALL_MS: int = 1000
+    REDIS_BREAKER_OPEN_SECONDS: float = 5.0
+    BATCH_MAX_OPERATIONS: int = 100
+    METRICS_ENABLED: bool = True
+    LOAD_SHEDDING_ENABLED: bool = True
+    LOAD_SHED_MAX_IN_FLIGHT: int = 256
+    LOAD_SHED_PRIORITY_RESERVE: float = 0.2
+    LOAD_SHED_RETRY_AFTER: int = 1
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_TRUST_FORWARDED: bool = False
+    RATE_LIMIT_LEASE_SIZE: int = 5
+    RATE_LIMIT_LOGIN_BURST: int = 10
+    RATE_LIMIT_LOGIN_PER_MINUTE: float = 10
+    RATE_LIMIT_SIGNUP_BURST: int = 5
+    RATE_LIMIT_SIGNUP_PER_MINUTE: float = 5
+    RATE_LIMIT_VOTES_BURST: int = 60
+    RATE_LIMIT_VOTES_PER_MINUTE: float = 120
+    RATE_LIMIT_FOLLOWS_BURST: int = 100
+    RATE_LIMIT_FOLLOWS_PER_MINUTE: float = 60
+    HEALTH_CHECK_TIMEOUT_MS: int = 250
+    HEALTH_CHECK_CACHE_TTL_MS: int = 1000
+    READY_MAX_POOL_CHECKOUT_MS: int = 100
+    ADMIN_EMAILS: str = ""
+    PROFILING_ENABLED: bool = False
+    LOOP_LAG_MONITOR_ENABLED: bool = False
+    LOOP_LAG_THRESHOLD_MS: int = 100
+    RESPONSE_CACHE_TTL: int = 30
+    RESPONSE_CACHE_LOCAL_TTL: int = 2
+    RESPONSE_CACHE_MAX_AGE: int = 10
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1024
+    FOLLOW_SUGGESTIONS_TTL: int = 3600
+    FOLLOW_GRAPH_ENABLED: bool = False
+    FOLLOW_GRAPH_DIR: str = "data/follow_graph"
+    FOLLOW_GRAPH_SYNC_INTERVAL: float = 0.1
+    FOLLOW_GRAPH_RELAY_INTERVAL: float = 0.5
+    FOLLOW_GRAPH_MAX_LAG: float = 5.0
+    # FOLLOW_GRAPH_ENABLED requires `python -m api.jobs.follow_graph_snapshot`
+    # on a cron (every few minutes). Workers read the snapshot plus this stream;
+    # without a snapshot every follow is relayed and trimmed without being read.
+    FOLLOW_GRAPH_STREAM_MAXLEN: int = 1000000
+    SIMILAR_POSTS_INDEX_DIR: str = "data/similar_posts"
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -18,6 +88,10 @@ class Settings(BaseSettings):
         ignore_extra=True,
         case_sensitive=True
     )
+
+    @property
+    def admin_emails(self) -> set[str]:
+        return {email.strip().lower() for email in self.ADMIN_EMAILS.split(",") if email.strip()}
     
     
 Config = Settings()
\ No newline at end of file
@@ -1,20 +1,102 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from typing import AsyncGenerator
-from api.config import Config
+import asyncio
+import logging
+from typing import AsyncGenerator, Optional
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.pool import Pool
 from sqlmodel import SQLModel
 
-async_engine  = create_async_engine(
-    Config.DB_URL,
-    echo=True,
-)
+from api.config import Config
+from api.instrumentation import instrument_engine
+from api.metrics import register_pool_collector
+
+logger = logging.getLogger(__name__)
+
+_engine: Optional[AsyncEngine] = None
+_sessionmaker: Optional[async_sessionmaker[AsyncSession]] = None
+
+
+def get_engine() -> AsyncEngine:
+    """Return the process-wide engine, creating it on first use.
+
+    Creating the engine (and its pool) lazily keeps ``import api`` cheap, and
+    makes sure each worker process builds its own pool after forking.
+    """
+    global _engine
+    if _engine is None:
+        _engine = create_async_engine(
+            Config.DB_URL,
+            echo=Config.DB_ECHO,
+            pool_size=Config.DB_POOL_SIZE,
+            max_overflow=Config.DB_MAX_OVERFLOW,
+            pool_timeout=Config.DB_POOL_TIMEOUT,
+        )
+        instrument_engine(_engine)
+    return _engine
+
+
+def _current_pool() -> Optional[Pool]:
+    return _engine.sync_engine.pool if _engine is not None else None
+
+
+register_pool_collector(_current_pool)
+
+
+def get_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    global _sessionmaker
+    if _sessionmaker is None:
+        _sessionmaker = async_sessionmaker(bind=get_engine(), class_=AsyncSession, expire_on_commit=False)
+    return _sessionmaker
+
 
 async def init_db():
-    async with async_engine.begin() as conn:
+    """Create tables directly from the models; only when ``DB_CREATE_ALL`` is set.
+
+    Alembic migrations own the schema everywhere else.
+    """
+    if not Config.DB_CREATE_ALL:
+        return
+    async with get_engine().begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
-        
+
+
+def _warm_up_statements():
+    from api.db.models import Posts, User
+
+    # The hottest statements, so their compiled form is cached by SQLAlchemy
+    # and each pooled connection has them prepared by asyncpg.
+    return [
+        text("SELECT 1"),
+        select(Posts).order_by(Posts.created_at.desc()).limit(1),
+        select(User).where(User.email == "").limit(1),
+    ]
+
+
+async def warm_up_db(connections: int) -> None:
+    """Open ``connections`` pooled connections and prepare the hot statements on each."""
+    statements = _warm_up_statements()
+    engine = get_engine()
+
+    async def warm_connection() -> None:
+        async with engine.connect() as conn:
+            for statement in statements:
+                await conn.execute(statement)
+
+    results = await asyncio.gather(*(warm_connection() for _ in range(connections)), return_exceptions=True)
+    failures = [result for result in results if isinstance(result, Exception)]
+    if failures:
+        logger.warning(f"Database warm-up: {len(failures)}/{connections} connections failed: {failures[0]}")
+
+
+async def dispose_engine() -> None:
+    global _engine, _sessionmaker
+    if _engine is not None:
+        await _engine.dispose()
+    _engine = None
+    _sessionmaker = None
+
+
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    async_session = async_sessionmaker(bind= async_engine, class_=AsyncSession, expire_on_commit=False)
-    
-    async with async_session() as session:
+    async with get_sessionmaker()() as session:
         yield session
-        
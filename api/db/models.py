@@ -3,7 +3,7 @@ from enum import Enum
 from typing import List, Optional
 from uuid import UUID, uuid4
 
-from sqlalchemy import ForeignKey, UniqueConstraint, text
+from sqlalchemy import ForeignKey, Index, UniqueConstraint, text
 import sqlalchemy.dialects.postgresql as pg
 from sqlmodel import Column, Field, Relationship, SQLModel
 
@@ -18,7 +18,10 @@ class VoteType(str, Enum):
 
 class Follows(SQLModel, table=True):
     __tablename__ = "follows"
-    __table_args__ = (UniqueConstraint("follower_id", "following_id", name="unique_follower_following"),)
+    __table_args__ = (
+        UniqueConstraint("follower_id", "following_id", name="unique_follower_following"),
+        Index("ix_follows_follower_id_created_at", "follower_id", "created_at"),
+    )
     id: UUID = Field(
         sa_column=Column(pg.UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()")),
         default_factory=uuid4
@@ -35,10 +38,37 @@ class Follows(SQLModel, table=True):
     created_at: datetime = Field(
         sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=False, server_default=text("CURRENT_TIMESTAMP"), index=True),
         default_factory=datetime.now
+    )
+
+class FollowGraphOutbox(SQLModel, table=True):
+    """Follow graph events committed with the follow change, waiting to be relayed to Redis."""
+    __tablename__ = "follow_graph_outbox"
+    id: Optional[int] = Field(
+        sa_column=Column(pg.BIGINT, primary_key=True, autoincrement=True),
+        default=None
+    )
+    follower_id: UUID = Field(sa_column=Column(pg.UUID(as_uuid=True), nullable=False))
+    following_id: UUID = Field(sa_column=Column(pg.UUID(as_uuid=True), nullable=False))
+    followed: bool = Field(sa_column=Column(pg.BOOLEAN, nullable=False))
+    created_at: datetime = Field(
+        sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=False, server_default=text("CURRENT_TIMESTAMP")),
+        default_factory=datetime.now
     )    
     
 class Posts(SQLModel, table=True):
     __tablename__ = "posts"
+    __table_args__ = (
+        Index("ix_posts_created_at_upvote_count", "created_at", "upvote_count"),
+        Index("ix_posts_author_id_created_at", "author_id", "created_at"),
+        Index("ix_posts_author_id_hot_score", "author_id", "hot_score"),
+        Index("ix_posts_hot_score_id", "hot_score", "id"),
+        # Per-type partial indexes for the content_type feed tabs.
+        *(
+            Index(f"ix_posts_{post_type.value}_{'_'.join(columns)}", *columns, postgresql_where=text(f"content_type = '{post_type.name}'"))
+            for post_type in PostType
+            for columns in (("created_at", "upvote_count"), ("hot_score", "id"), ("upvote_count",))
+        ),
+    )
     id: UUID = Field(
         sa_column=Column(pg.UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()")),
         default_factory=uuid4
@@ -65,6 +95,7 @@ class Posts(SQLModel, table=True):
     upvote_count: int = Field(sa_column=Column(pg.INTEGER, nullable=True, server_default="0", index=True), default=0)
     downvote_count: int = Field(sa_column=Column(pg.INTEGER, nullable=True, server_default="0", index=True), default=0)
     comment_count: int = Field(sa_column=Column(pg.INTEGER, nullable=True, server_default="0", index=True), default=0)
+    hot_score: float = Field(sa_column=Column(pg.DOUBLE_PRECISION, nullable=False, server_default="0"), default=0.0)
     
 class User(SQLModel, table=True):
     __tablename__ = "users"
@@ -103,7 +134,11 @@ class User(SQLModel, table=True):
     
 class Votes(SQLModel, table=True):
     __tablename__ = "votes"
-    __table_args__ = (UniqueConstraint("post_id", "user_id", name="unique_user_post_vote"),)
+    __table_args__ = (
+        UniqueConstraint("post_id", "user_id", name="unique_user_post_vote"),
+        Index("ix_votes_post_id_created_at_id", "post_id", "created_at", "id"),
+        Index("ix_votes_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
     id: UUID = Field(
         sa_column=Column(pg.UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()")),
         default_factory=uuid4
@@ -126,6 +161,10 @@ class Votes(SQLModel, table=True):
     
 class Comments(SQLModel, table=True):
     __tablename__ = "comments"
+    __table_args__ = (
+        Index("ix_comments_live_post_id_created_at", "post_id", "created_at", postgresql_where=text("NOT is_deleted")),
+        Index("ix_comments_live_parent_id_created_at", "parent_id", "created_at", postgresql_where=text("NOT is_deleted")),
+    )
     id: UUID = Field(
         sa_column=Column(pg.UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()")),
         default_factory=uuid4
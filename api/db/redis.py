@@ -1,34 +1,230 @@
-from redis.asyncio import Redis
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+from redis.asyncio import BlockingConnectionPool, Redis
+from redis.asyncio.connection import Connection, SSLConnection
+from redis.asyncio.cluster import ClusterNode
+from redis.asyncio.retry import Retry
+from redis.asyncio.sentinel import Sentinel
+from redis.backoff import ExponentialWithJitterBackoff
+from redis.exceptions import ConnectionError, TimeoutError
+
+from api.circuit_breaker import CircuitBreaker
 from api.config import Config
+from api.instrumentation import InstrumentedPipeline, InstrumentedRedis, InstrumentedRedisCluster
 
+logger = logging.getLogger(__name__)
 
 JTI_EXPIRY = 3600
+LOCAL_REVOKED_MAX_ENTRIES = 100_000
+
+
+class GuardedPipeline(InstrumentedPipeline):
+    breaker: CircuitBreaker
+
+    async def execute(self, raise_on_error: bool = True):
+        return await self.breaker.call(super().execute, raise_on_error)
+
+
+class GuardedRedis(InstrumentedRedis):
+    """``InstrumentedRedis`` whose commands and pipeline flushes go through a circuit breaker."""
+
+    breaker: CircuitBreaker
+
+    async def execute_command(self, *args, **options):
+        return await self.breaker.call(super().execute_command, *args, **options)
+
+    def pipeline(self, transaction: bool = True, shard_hint: Optional[str] = None) -> GuardedPipeline:
+        pipe = GuardedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+        pipe.breaker = self.breaker
+        return pipe
+
+
+class GuardedRedisCluster(InstrumentedRedisCluster):
+    breaker: CircuitBreaker
+
+    async def execute_command(self, *args, **kwargs):
+        return await self.breaker.call(super().execute_command, *args, **kwargs)
+
+
+def _parse_nodes(nodes: str) -> List[Tuple[str, int]]:
+    parsed = []
+    for node in nodes.split(","):
+        node = node.strip()
+        if node:
+            host, _, port = node.rpartition(":")
+            parsed.append((host, int(port)))
+    return parsed
+
+
+def _retry() -> Retry:
+    return Retry(
+        ExponentialWithJitterBackoff(cap=Config.REDIS_RETRY_BACKOFF_CAP, base=Config.REDIS_RETRY_BACKOFF_BASE),
+        Config.REDIS_RETRY_ATTEMPTS,
+        supported_errors=(ConnectionError, TimeoutError),
+    )
+
+
+def _breaker(name: str, slow_call_threshold: float) -> CircuitBreaker:
+    return CircuitBreaker(
+        name,
+        failure_exceptions=(ConnectionError, TimeoutError),
+        failure_rate=Config.REDIS_BREAKER_FAILURE_RATE,
+        min_calls=Config.REDIS_BREAKER_MIN_CALLS,
+        window=Config.REDIS_BREAKER_WINDOW,
+        slow_call_threshold=slow_call_threshold,
+        open_duration=Config.REDIS_BREAKER_OPEN_SECONDS,
+    )
+
 
-redis_client = Redis(
-    host=Config.REDIS_HOST,
-    port=Config.REDIS_PORT,
-    db=Config.REDIS_DB,
-    decode_responses=True,
+def create_redis_client(name: str, max_connections: int, socket_timeout: float, slow_call_threshold: float) -> Redis:
+    """Build a client with its own connection pool, according to ``REDIS_MODE``.
+
+    Every logical client gets a separate pool, so one workload exhausting its
+    connections (or waiting on slow replies) cannot starve the others. Each
+    one also gets its own circuit breaker, unless ``REDIS_BREAKER_ENABLED`` is
+    off.
+    """
+    client = _build_client(max_connections, socket_timeout, guarded=Config.REDIS_BREAKER_ENABLED)
+    if Config.REDIS_BREAKER_ENABLED:
+        client.breaker = _breaker(name, slow_call_threshold)
+    return client
+
+
+def _build_client(max_connections: int, socket_timeout: float, guarded: bool) -> Redis:
+    connection_kwargs = dict(
+        password=Config.REDIS_PASSWORD,
+        decode_responses=True,
+        socket_timeout=socket_timeout,
+        socket_connect_timeout=Config.REDIS_SOCKET_CONNECT_TIMEOUT,
+        health_check_interval=Config.REDIS_HEALTH_CHECK_INTERVAL,
+        retry=_retry(),
+    )
+
+    if Config.REDIS_MODE == "cluster":
+        startup_nodes = [
+            ClusterNode(host, port)
+            for host, port in _parse_nodes(Config.REDIS_CLUSTER_NODES) or [(Config.REDIS_HOST, Config.REDIS_PORT)]
+        ]
+        cluster_class = GuardedRedisCluster if guarded else InstrumentedRedisCluster
+        return cluster_class(
+            startup_nodes=startup_nodes,
+            max_connections=max_connections,
+            ssl=Config.REDIS_SSL,
+            **connection_kwargs,
+        )
+
+    if Config.REDIS_MODE == "sentinel":
+        sentinel = Sentinel(
+            _parse_nodes(Config.REDIS_SENTINELS),
+            sentinel_kwargs={
+                "password": Config.REDIS_SENTINEL_PASSWORD,
+                "socket_timeout": socket_timeout,
+                "socket_connect_timeout": Config.REDIS_SOCKET_CONNECT_TIMEOUT,
+                "retry": _retry(),
+            },
+        )
+        return sentinel.master_for(
+            Config.REDIS_SENTINEL_SERVICE,
+            redis_class=GuardedRedis if guarded else InstrumentedRedis,
+            db=Config.REDIS_DB,
+            max_connections=max_connections,
+            ssl=Config.REDIS_SSL,
+            **connection_kwargs,
+        )
+
+    # A blocking pool makes callers wait (up to the socket timeout) for a free
+    # connection instead of failing with "Too many connections" under bursts.
+    pool = BlockingConnectionPool(
+        host=Config.REDIS_HOST,
+        port=Config.REDIS_PORT,
+        db=Config.REDIS_DB,
+        max_connections=max_connections,
+        timeout=socket_timeout,
+        connection_class=SSLConnection if Config.REDIS_SSL else Connection,
+        **connection_kwargs,
+    )
+    return (GuardedRedis if guarded else InstrumentedRedis).from_pool(pool)
+
+
+# General purpose: response cache, rate limiting, health checks.
+redis_client = create_redis_client(
+    "redis", Config.REDIS_MAX_CONNECTIONS, Config.REDIS_SOCKET_TIMEOUT, Config.REDIS_BREAKER_SLOW_CALL_MS / 1000
+)
+# JWT blacklist lookups sit on every authenticated request.
+auth_redis_client = create_redis_client(
+    "redis_auth", Config.REDIS_AUTH_MAX_CONNECTIONS, Config.REDIS_SOCKET_TIMEOUT, Config.REDIS_BREAKER_SLOW_CALL_MS / 1000
 )
+# FYP scoring and interaction writes: heavier, more latency tolerant.
+fyp_redis_client = create_redis_client(
+    "redis_fyp", Config.REDIS_FYP_MAX_CONNECTIONS, Config.REDIS_FYP_SOCKET_TIMEOUT, Config.REDIS_FYP_BREAKER_SLOW_CALL_MS / 1000
+)
+
+# jti -> expiry (monotonic) of tokens revoked through this worker. Consulted
+# when Redis is unavailable so a just-logged-out token keeps being rejected.
+_local_revoked: Dict[str, float] = {}
+
+
+def _remember_revoked(jti: str) -> None:
+    now = time.monotonic()
+    if len(_local_revoked) >= LOCAL_REVOKED_MAX_ENTRIES:
+        for expired in [key for key, expires_at in _local_revoked.items() if expires_at <= now]:
+            del _local_revoked[expired]
+        while len(_local_revoked) >= LOCAL_REVOKED_MAX_ENTRIES:
+            del _local_revoked[next(iter(_local_revoked))]
+    _local_revoked[jti] = now + JTI_EXPIRY
+
+
+def _locally_revoked(jti: str) -> bool:
+    expires_at = _local_revoked.get(jti)
+    if expires_at is None:
+        return False
+    if expires_at <= time.monotonic():
+        del _local_revoked[jti]
+        return False
+    return True
 
 
 async def add_jwt_to_blacklist(jti: str) -> None:
-    await redis_client.set(
-        name = jti,
-        value = "",
-        ex = JTI_EXPIRY
-    )
+    _remember_revoked(jti)
+    try:
+        await auth_redis_client.set(
+            name = jti,
+            value = "",
+            ex = JTI_EXPIRY
+        )
+    except (ConnectionError, TimeoutError):
+        logger.warning("Redis unavailable; token revoked on this worker only", exc_info=True)
     
 async def is_jwt_blacklisted(jti: str) -> bool:
-    return await redis_client.get(jti) is not None
+    if _locally_revoked(jti):
+        return True
+    try:
+        return await auth_redis_client.get(jti) is not None
+    except (ConnectionError, TimeoutError):
+        # Degrade to the local revoked set rather than failing every
+        # authenticated request while Redis is down.
+        logger.debug("Redis unavailable; checked token against local revoked set only")
+        return False
 
 
 async def get_redis() -> Redis:
     return redis_client
 
 
+async def warm_up_redis(connections: int) -> None:
+    """Open ``connections`` connections per client so the first requests don't pay for connecting."""
+    clients = (redis_client, auth_redis_client, fyp_redis_client)
+    results = await asyncio.gather(
+        *(client.ping() for client in clients for _ in range(connections)), return_exceptions=True
+    )
+    failures = [result for result in results if isinstance(result, Exception)]
+    if failures:
+        logger.warning(f"Redis warm-up: {len(failures)}/{len(results)} pings failed: {failures[0]}")
 
 
-
-
-    
\ No newline at end of file
+async def close_redis_clients() -> None:
+    for client in (redis_client, auth_redis_client, fyp_redis_client):
+        await client.aclose()
@@ -0,0 +1,299 @@
+"""In-memory follow graph for adjacency reads.
+
+``api.jobs.follow_graph_snapshot`` dumps ``follows`` as a compressed sparse
+row (CSR) matrix into a versioned directory and points ``current`` at it:
+
+- ``ids.npy``: every user that appears in an edge, as sorted 16-byte UUIDs.
+  A user's row number is one binary search.
+- ``indptr.npy`` / ``indices.npy``: the row of user ``i`` follows
+  ``indices[indptr[i]:indptr[i + 1]]``. Each row is sorted, so a membership
+  check is a second binary search.
+
+The arrays are loaded with ``mmap_mode="r"``, so every worker on a host
+shares one copy through the page cache.
+
+Changes made after the snapshot arrive as events on the
+``follows:graph:events`` Redis stream. ``FollowService`` writes each event
+to ``follow_graph_outbox`` in the same transaction as the follow change, so
+an event exists exactly when its change commits. A ``FollowGraphRelay`` task
+on every worker moves outbox rows to the stream in id order. An advisory lock
+lets only one worker relay at a time, and rows are deleted only once their
+XADD succeeded, so a Redis outage delays events but never loses them. Every
+worker runs a ``FollowGraphSync`` task that tails the stream into an overlay
+of ``{follower: {following: is_following}}`` entries. Each entry is the
+latest state of an edge and takes precedence over the snapshot. The snapshot
+records the stream id it was taken at, and a newly loaded snapshot replays
+everything after that id. Events are states rather than increments, so
+replaying one that the snapshot already contains is harmless.
+
+The worker that handled a write also applies the event to its own graph
+straight after the commit. That worker reads its own writes immediately.
+Other workers see the change once the relay has published it and their tail
+has caught up, normally within ``FOLLOW_GRAPH_RELAY_INTERVAL`` plus
+``FOLLOW_GRAPH_SYNC_INTERVAL``.
+
+If the snapshot is missing or the tail falls more than
+``FOLLOW_GRAPH_MAX_LAG`` seconds behind, ``get_follow_graph`` returns None
+and callers query Postgres instead. While Redis is down, the relay cannot
+publish and the tails cannot read, so every worker falls back to Postgres.
+"""
+
+import asyncio
+import bisect
+import json
+import logging
+import os
+import time
+from typing import Iterable, Optional
+from uuid import UUID
+
+import numpy as np
+from asyncpg.pgproto.pgproto import UUID as PgUUID
+from sqlalchemy import delete, func, select
+
+from api.config import Config
+from api.db.main import get_engine
+from api.db.models import FollowGraphOutbox
+from api.db.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+EVENTS_STREAM = "follows:graph:events"
+META_FILE = "meta.json"
+IDS_FILE = "ids.npy"
+INDPTR_FILE = "indptr.npy"
+INDICES_FILE = "indices.npy"
+CURRENT_LINK = "current"
+SYNC_BATCH = 1000
+RELAY_BATCH = 1000
+# pg_try_advisory_xact_lock key held by whichever worker is relaying the outbox.
+RELAY_LOCK_ID = 0x666F6C6C6F7773
+
+
+def _uuids(packed: bytes) -> list[UUID]:
+    # asyncpg's C UUID (what it returns for uuid columns) builds ~8x faster than uuid.UUID.
+    return [PgUUID(packed[i : i + 16]) for i in range(0, len(packed), 16)]
+
+
+class FollowGraph:
+    """One snapshot version plus the overlay of events applied since it was taken."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, META_FILE)) as fh:
+            self.meta = json.load(fh)
+        self.stream_id: str = self.meta["stream_id"]
+        # Plain ndarray views of the maps: np.memmap slicing is several times slower.
+        self.ids = np.asarray(np.load(os.path.join(path, IDS_FILE), mmap_mode="r"))
+        self.indptr = np.asarray(np.load(os.path.join(path, INDPTR_FILE), mmap_mode="r"))
+        self.indices = np.asarray(np.load(os.path.join(path, INDICES_FILE), mmap_mode="r"))
+        self._overlay: dict[UUID, dict[UUID, bool]] = {}
+        self.synced_at = 0.0
+
+    def _row(self, user_id: UUID) -> Optional[int]:
+        key = user_id.bytes
+        row = int(np.searchsorted(self.ids, key))
+        # "S16" strips trailing NUL bytes on read; ids are fixed-width, so stripping the key is exact.
+        if row < self.ids.shape[0] and self.ids[row] == key.rstrip(b"\0"):
+            return row
+        return None
+
+    def _snapshot_follows(self, follower: Optional[int], following: Optional[int]) -> bool:
+        if follower is None or following is None:
+            return False
+        start, end = int(self.indptr[follower]), int(self.indptr[follower + 1])
+        # Rows are short; a bisect over the view beats a numpy call's fixed overhead.
+        position = bisect.bisect_left(self.indices, following, start, end)
+        return position < end and int(self.indices[position]) == following
+
+    def is_following(self, follower_id: UUID, following_id: UUID) -> bool:
+        overlay = self._overlay.get(follower_id)
+        if overlay is not None and following_id in overlay:
+            return overlay[following_id]
+        return self._snapshot_follows(self._row(follower_id), self._row(following_id))
+
+    def following(self, user_id: UUID) -> list[UUID]:
+        row = self._row(user_id)
+        overlay = self._overlay.get(user_id, {})
+        neighbours = self.indices[:0]
+        if row is not None:
+            neighbours = self.indices[int(self.indptr[row]) : int(self.indptr[row + 1])]
+        # Drop unfollows as row numbers, before any UUID objects are built.
+        unfollowed = [self._row(user) for user, followed in overlay.items() if not followed]
+        if unfollowed:
+            neighbours = neighbours[~np.isin(neighbours, [other for other in unfollowed if other is not None])]
+        following = _uuids(self.ids[neighbours].tobytes())
+        following.extend(
+            user for user, followed in overlay.items()
+            if followed and not self._snapshot_follows(row, self._row(user))
+        )
+        return following
+
+    def apply(self, follower_id: UUID, following_id: UUID, followed: bool) -> None:
+        self._overlay.setdefault(follower_id, {})[following_id] = followed
+
+    def apply_entries(self, entries: list) -> None:
+        for entry_id, fields in entries:
+            self.apply(UUID(fields["f"]), UUID(fields["t"]), fields["s"] == "1")
+            self.stream_id = entry_id
+
+    @property
+    def overlay_size(self) -> int:
+        return sum(len(edges) for edges in self._overlay.values())
+
+
+_graph: Optional[FollowGraph] = None
+
+
+def get_follow_graph() -> Optional[FollowGraph]:
+    """The synced graph, or None when it is unavailable or stale (use Postgres)."""
+    graph = _graph
+    if graph is None or time.monotonic() - graph.synced_at > Config.FOLLOW_GRAPH_MAX_LAG:
+        return None
+    return graph
+
+
+_relay_wakeup = asyncio.Event()
+
+
+def outbox_rows(events: Iterable[tuple[UUID, UUID, bool]]) -> list[FollowGraphOutbox]:
+    """Outbox rows for ``events``, to add to the transaction that makes the changes."""
+    if not Config.FOLLOW_GRAPH_ENABLED:
+        return []
+    return [
+        FollowGraphOutbox(follower_id=follower_id, following_id=following_id, followed=followed)
+        for follower_id, following_id, followed in events
+    ]
+
+
+def apply_committed_follow_events(events: Iterable[tuple[UUID, UUID, bool]]) -> None:
+    """Apply just-committed events to this worker's graph and wake its relay."""
+    if _graph is not None:
+        for follower_id, following_id, followed in events:
+            _graph.apply(follower_id, following_id, followed)
+    _relay_wakeup.set()
+
+
+async def relay_follow_events(batch: int = RELAY_BATCH) -> int:
+    """Move the oldest outbox rows to the event stream and return how many were relayed.
+
+    A change to an edge only commits after the previous change to it has
+    committed, so each edge's rows are in id order. If the XADD fails, the
+    transaction rolls back and the rows are retried. If the commit fails after
+    the XADD, the rows are published again, followed by every later row for the
+    same edges, so the latest state still wins.
+    """
+    outbox = FollowGraphOutbox.__table__
+    async with get_engine().begin() as conn:
+        if not await conn.scalar(select(func.pg_try_advisory_xact_lock(RELAY_LOCK_ID))):
+            return 0
+        rows = (
+            await conn.execute(
+                select(outbox.c.id, outbox.c.follower_id, outbox.c.following_id, outbox.c.followed)
+                .order_by(outbox.c.id)
+                .limit(batch)
+            )
+        ).all()
+        if not rows:
+            return 0
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for row in rows:
+                pipe.xadd(
+                    EVENTS_STREAM,
+                    {"f": str(row.follower_id), "t": str(row.following_id), "s": "1" if row.followed else "0"},
+                    maxlen=Config.FOLLOW_GRAPH_STREAM_MAXLEN,
+                    approximate=True,
+                )
+            await pipe.execute()
+        # By id rather than range: a lower id may still commit after this read.
+        await conn.execute(delete(outbox).where(outbox.c.id.in_([row.id for row in rows])))
+    return len(rows)
+
+
+class FollowGraphRelay:
+    """Background task that drains ``follow_graph_outbox`` into the event stream."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="follow-graph-relay")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        while True:
+            _relay_wakeup.clear()
+            try:
+                while await relay_follow_events() == RELAY_BATCH:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Follow graph relay failed", exc_info=True)
+            try:
+                await asyncio.wait_for(_relay_wakeup.wait(), timeout=self.interval)
+            except TimeoutError:
+                pass
+
+
+class FollowGraphSync:
+    """Background task that loads snapshots and tails the event stream into the live graph."""
+
+    def __init__(self, root: str, interval: float):
+        self.root = root
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="follow-graph-sync")
+
+    async def stop(self) -> None:
+        global _graph
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        _graph = None
+
+    async def _catch_up(self, graph: FollowGraph) -> None:
+        while True:
+            response = await redis_client.xread({EVENTS_STREAM: graph.stream_id}, count=SYNC_BATCH)
+            entries = response[0][1] if response else []
+            graph.apply_entries(entries)
+            if len(entries) < SYNC_BATCH:
+                graph.synced_at = time.monotonic()
+                return
+
+    async def sync_once(self) -> None:
+        global _graph
+        try:
+            path = os.path.realpath(os.path.join(self.root, CURRENT_LINK), strict=True)
+        except OSError:
+            return
+        if _graph is None or _graph.path != path:
+            graph = await asyncio.to_thread(FollowGraph, path)
+            await self._catch_up(graph)
+            _graph = graph
+            logger.info("Loaded follow graph %s (%s users, %s edges)", path, graph.meta["users"], graph.meta["edges"])
+            return
+        await self._catch_up(_graph)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sync_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Follow graph sync failed", exc_info=True)
+            await asyncio.sleep(self.interval)
@@ -1,21 +1,24 @@
 from logging import Logger
 import logging
+from typing import List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from fastapi.responses import JSONResponse
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from api.auth.dependencies import AccessTokenBearer
 from api.db.main import get_session
+from api.follows.schemas import FollowBatch, FollowBatchResult
 from api.follows.service import FollowService
+from api.rate_limit import follow_rate_limiter
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/follows", tags=["follows"])
 follow_service = FollowService()
 
-@router.post("/users/{user_id}/follow")
+@router.post("/users/{user_id}/follow", dependencies=[Depends(follow_rate_limiter)])
 async def follow_user(
     user_id: str,
     session: AsyncSession = Depends(get_session),
@@ -27,7 +30,7 @@ async def follow_user(
     follow = await follow_service.follow_user(follower_id, following_id, session)
     return {"message": "Successfully followed user", "follow": follow}
 
-@router.delete("/users/{user_id}/follow")
+@router.delete("/users/{user_id}/follow", dependencies=[Depends(follow_rate_limiter)])
 async def unfollow_user(
     user_id: str,
     session: AsyncSession = Depends(get_session),
@@ -44,6 +47,26 @@ async def unfollow_user(
         status_code=status.HTTP_200_OK
     )
 
+@router.post("/batch", response_model=List[FollowBatchResult])
+async def follow_users_batch(
+    request: Request,
+    follow_batch: FollowBatch,
+    session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(AccessTokenBearer())
+):
+    follower_id = UUID(token_details["user"]["user_id"])
+    await follow_rate_limiter.limit(request, cost=len(follow_batch.operations))
+    return await follow_service.follow_users_batch(follower_id, follow_batch.operations, session)
+
+@router.get("/suggestions")
+async def get_follow_suggestions(
+    limit: int = Query(default=20, ge=1, le=50),
+    session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(AccessTokenBearer())
+):
+    user_id = UUID(token_details["user"]["user_id"])
+    return await follow_service.get_follow_suggestions(user_id, session, limit)
+
 @router.get("/users/{user_id}/followers")
 async def get_followers(
     user_id: str,
@@ -0,0 +1,21 @@
+from typing import List, Literal
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from api.config import Config
+
+
+class FollowBatchItem(BaseModel):
+    user_id: UUID
+    action: Literal["follow", "unfollow"]
+
+
+class FollowBatch(BaseModel):
+    operations: List[FollowBatchItem] = Field(min_length=1, max_length=Config.BATCH_MAX_OPERATIONS)
+
+
+class FollowBatchResult(BaseModel):
+    user_id: UUID
+    action: Literal["follow", "unfollow"]
+    status: Literal["followed", "unfollowed", "unchanged", "not_found", "invalid"]
@@ -2,12 +2,19 @@ from typing import List
 from uuid import UUID
 
 from fastapi import HTTPException, status
+from sqlalchemy import bindparam, delete, func, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from api.auth.service import UserService
+from api.cache import follow_counts_group, safe_invalidate
 from api.db.models import Follows, User
-from api.posts.algorithm import safe_record_interaction
+from api.follows.graph import apply_committed_follow_events, get_follow_graph, outbox_rows
+from api.follows.suggestions import get_follow_suggestions, safe_invalidate_suggestions
+from api.posts.algorithm import Interaction, safe_record_interaction, safe_record_interactions
+
+from .schemas import FollowBatchItem, FollowBatchResult
 
 class FollowService:
     
@@ -49,10 +56,14 @@ class FollowService:
                 following_user.followers_count += 1
                 
             session.add(new_follow)
+            session.add_all(outbox_rows([(follower_id, following_id, True)]))
             await session.commit()
             await session.refresh(new_follow)
             await session.refresh(follower_user)
             await session.refresh(following_user)
+            await safe_invalidate(follow_counts_group(follower_id), follow_counts_group(following_id))
+            await safe_invalidate_suggestions(follower_id)
+            apply_committed_follow_events([(follower_id, following_id, True)])
 
             await safe_record_interaction(
                 user_id=follower_id,
@@ -93,7 +104,11 @@ class FollowService:
                 following_user.followers_count -= 1 if following_user.followers_count > 0 else 0
                 
             await session.delete(existing_follow)
+            session.add_all(outbox_rows([(follower_id, following_id, False)]))
             await session.commit()
+            await safe_invalidate(follow_counts_group(follower_id), follow_counts_group(following_id))
+            await safe_invalidate_suggestions(follower_id)
+            apply_committed_follow_events([(follower_id, following_id, False)])
 
             await safe_record_interaction(
                 user_id=follower_id,
@@ -108,6 +123,124 @@ class FollowService:
             await session.rollback()
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error unfollowing user: {e}")
         
+    async def follow_users_batch(
+        self, follower_id: UUID, operations: List[FollowBatchItem], session: AsyncSession
+    ) -> List[FollowBatchResult]:
+        """Apply many follow/unfollow operations for one user in a single transaction.
+
+        Later operations on the same target win. Inserts and deletes are done
+        with one statement each and counters are adjusted in bulk.
+        """
+        try:
+            follower_user = await self.user_service.get_user_by_id(follower_id, session)
+
+            requested = {op.user_id: op.action for op in operations}
+            target_ids = [user_id for user_id in requested if user_id != follower_id]
+
+            result = await session.execute(select(User.id).where(User.id.in_(target_ids)))
+            existing_users = set(result.scalars().all())
+
+            result = await session.execute(
+                select(Follows.following_id).where(
+                    Follows.follower_id == follower_id,
+                    Follows.following_id.in_(target_ids),
+                )
+            )
+            already_following = set(result.scalars().all())
+
+            to_follow = [
+                user_id for user_id in target_ids
+                if requested[user_id] == "follow" and user_id in existing_users and user_id not in already_following
+            ]
+            to_unfollow = [
+                user_id for user_id in target_ids
+                if requested[user_id] == "unfollow" and user_id in already_following
+            ]
+
+            followed: set[UUID] = set()
+            if to_follow:
+                result = await session.execute(
+                    pg_insert(Follows)
+                    .values([{"follower_id": follower_id, "following_id": user_id} for user_id in to_follow])
+                    .on_conflict_do_nothing(constraint="unique_follower_following")
+                    .returning(Follows.following_id)
+                )
+                followed = set(result.scalars().all())
+
+            unfollowed: set[UUID] = set()
+            if to_unfollow:
+                result = await session.execute(
+                    delete(Follows)
+                    .where(
+                        Follows.follower_id == follower_id,
+                        Follows.following_id.in_(to_unfollow),
+                    )
+                    .returning(Follows.following_id)
+                )
+                unfollowed = set(result.scalars().all())
+
+            if followed or unfollowed:
+                users_table = User.__table__
+                await session.execute(
+                    update(users_table)
+                    .where(users_table.c.id == follower_id)
+                    .values(
+                        following_count=func.greatest(
+                            users_table.c.following_count + len(followed) - len(unfollowed), 0
+                        )
+                    )
+                )
+                await session.execute(
+                    update(users_table)
+                    .where(users_table.c.id == bindparam("b_id"))
+                    .values(
+                        followers_count=func.greatest(
+                            users_table.c.followers_count + bindparam("b_delta"), 0
+                        )
+                    ),
+                    [{"b_id": user_id, "b_delta": 1} for user_id in followed]
+                    + [{"b_id": user_id, "b_delta": -1} for user_id in unfollowed],
+                )
+                events = [(follower_id, user_id, True) for user_id in followed] + [
+                    (follower_id, user_id, False) for user_id in unfollowed
+                ]
+                session.add_all(outbox_rows(events))
+                await session.commit()
+                await session.refresh(follower_user)
+
+                await safe_invalidate(
+                    follow_counts_group(follower_id),
+                    *(follow_counts_group(user_id) for user_id in followed | unfollowed),
+                )
+                await safe_invalidate_suggestions(follower_id)
+                apply_committed_follow_events(events)
+                await safe_record_interactions(
+                    [Interaction(follower_id, "follows", user_id) for user_id in followed]
+                    + [Interaction(follower_id, "unfollows", user_id) for user_id in unfollowed]
+                )
+
+            results: List[FollowBatchResult] = []
+            for user_id, action in requested.items():
+                if user_id == follower_id:
+                    op_status = "invalid"
+                elif user_id not in existing_users:
+                    op_status = "not_found"
+                elif user_id in followed:
+                    op_status = "followed"
+                elif user_id in unfollowed:
+                    op_status = "unfollowed"
+                else:
+                    op_status = "unchanged"
+                results.append(FollowBatchResult(user_id=user_id, action=action, status=op_status))
+            return results
+
+        except HTTPException:
+            await session.rollback()
+            raise
+        except Exception as e:
+            await session.rollback()
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error applying follow batch: {e}")
+
     async def get_followers(self, user_id: UUID, session: AsyncSession) -> List[User]:
         try:
             result = await session.execute(
@@ -121,8 +254,26 @@ class FollowService:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error getting followers: {e}")
         
 
+    async def get_following_ids(self, user_id: UUID, session: AsyncSession) -> List[UUID]:
+        """Ids of the accounts ``user_id`` follows, from the in-memory graph when it is in sync."""
+        try:
+            graph = get_follow_graph()
+            if graph is not None:
+                return graph.following(user_id)
+            result = await session.execute(select(Follows.following_id).where(Follows.follower_id == user_id))
+            return list(result.scalars().all())
+        except Exception as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error getting following ids: {e}")
+
     async def get_following(self, user_id: UUID, session: AsyncSession) -> List[User]:
         try:
+            graph = get_follow_graph()
+            if graph is not None:
+                following_ids = graph.following(user_id)
+                if not following_ids:
+                    return []
+                result = await session.execute(select(User).where(User.id.in_(following_ids)))
+                return list(result.scalars().all())
             result = await session.execute(
                 select(User)
                 .join(Follows, User.id == Follows.following_id)
@@ -179,6 +330,9 @@ class FollowService:
         
     async def get_follow_status(self, follower_id: UUID, following_id: UUID, session: AsyncSession) -> bool:
         try:
+            graph = get_follow_graph()
+            if graph is not None:
+                return graph.is_following(follower_id, following_id)
             result = await session.execute(
                 select(Follows).where(
                     Follows.follower_id == follower_id,
@@ -188,4 +342,21 @@ class FollowService:
             return result.scalar_one_or_none() is not None
         except Exception as e:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error getting follow status: {e}")
-        
+
+    async def get_follow_suggestions(self, user_id: UUID, session: AsyncSession, limit: int = 20) -> List[dict]:
+        """Accounts to follow, ranked by second-degree follows and shared upvotes (see ``api/follows/suggestions.py``)."""
+        try:
+            suggestions = (await get_follow_suggestions(session, user_id))[:limit]
+            if not suggestions:
+                return []
+            result = await session.execute(
+                select(User).where(User.id.in_([UUID(suggestion["user_id"]) for suggestion in suggestions]))
+            )
+            users = {str(user.id): user for user in result.scalars().all()}
+            return [
+                {**users[suggestion["user_id"]].model_dump(), **suggestion}
+                for suggestion in suggestions
+                if suggestion["user_id"] in users
+            ]
+        except Exception as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error getting follow suggestions: {e}")
@@ -0,0 +1,149 @@
+""""Who to follow" suggestions.
+
+Candidates come from two capped fan-outs that run in a single statement:
+
+- Second-degree follows. We take the user's ``MAX_SEEDS`` most recent
+  follows, and from each of them the ``FANOUT`` accounts it most recently
+  followed. Each path is weighted ``1 / ln(2 + seed.following_count)``
+  (Adamic-Adar), so a seed that follows everyone says little about any one
+  account.
+- Shared interactions. We take the user's ``MAX_LIKED`` most recent
+  upvotes, and for each post the ``FANOUT`` accounts that most recently
+  upvoted it. Each path is weighted ``1 / ln(2 + post.upvote_count)``, so a
+  viral post counts for less than a niche one.
+
+Every fan-out is a ``LATERAL ... ORDER BY created_at DESC LIMIT`` probe of a
+composite index. Follower lists are never scanned, so the work is bounded by
+``MAX_SEEDS * FANOUT + MAX_LIKED * FANOUT`` index entries, however many
+accounts the user follows and however large the followed celebrities'
+audiences are. Accounts already followed are excluded with an anti-join on
+the ``(follower_id, following_id)`` unique index.
+
+The ranked list is cached per user in Redis for
+``Config.FOLLOW_SUGGESTIONS_TTL`` seconds. ``FollowService`` drops the entry
+whenever the user follows or unfollows someone, and the list is recomputed
+on the next read.
+"""
+
+import json
+import logging
+from uuid import UUID
+
+from sqlalchemy import Float, bindparam, text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from api.config import Config
+from api.db.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+MAX_SEEDS = 200
+MAX_LIKED = 200
+FANOUT = 50
+SHARED_INTERACTION_WEIGHT = 0.5
+SUGGESTIONS_CACHE_SIZE = 50
+
+SUGGESTIONS_SQL = text("""
+WITH seeds AS (
+    SELECT f.following_id AS seed_id, 1.0 / ln(2 + greatest(u.following_count, 0)) AS weight
+    FROM follows f JOIN users u ON u.id = f.following_id
+    WHERE f.follower_id = :user_id
+    ORDER BY f.created_at DESC
+    LIMIT :max_seeds
+),
+second_degree AS (
+    SELECT n.following_id AS candidate_id, count(*) AS mutuals, sum(s.weight) AS score
+    FROM seeds s
+    CROSS JOIN LATERAL (
+        SELECT following_id FROM follows
+        WHERE follower_id = s.seed_id
+        ORDER BY created_at DESC
+        LIMIT :fanout
+    ) n
+    GROUP BY n.following_id
+),
+liked AS (
+    SELECT v.post_id, 1.0 / ln(2 + greatest(coalesce(p.upvote_count, 0), 0)) AS weight
+    FROM votes v JOIN posts p ON p.id = v.post_id
+    WHERE v.user_id = :user_id AND v.vote_type = 'UPVOTE'
+    ORDER BY v.created_at DESC
+    LIMIT :max_liked
+),
+co_voters AS (
+    SELECT c.user_id AS candidate_id, count(*) AS shared, sum(l.weight) AS score
+    FROM liked l
+    CROSS JOIN LATERAL (
+        SELECT user_id FROM votes
+        WHERE post_id = l.post_id AND vote_type = 'UPVOTE'
+        ORDER BY created_at DESC
+        LIMIT :fanout
+    ) c
+    GROUP BY c.user_id
+)
+SELECT candidate_id, sum(mutuals) AS mutuals, sum(shared) AS shared, sum(score) AS score
+FROM (
+    SELECT candidate_id, mutuals, 0 AS shared, score FROM second_degree
+    UNION ALL
+    SELECT candidate_id, 0, shared, :shared_weight * score FROM co_voters
+) candidates
+WHERE candidate_id <> :user_id
+  AND NOT EXISTS (
+      SELECT 1 FROM follows f WHERE f.follower_id = :user_id AND f.following_id = candidates.candidate_id
+  )
+GROUP BY candidate_id
+ORDER BY score DESC, candidate_id
+LIMIT :limit
+""").bindparams(bindparam("shared_weight", type_=Float))
+
+
+def _suggestions_key(user_id: UUID) -> str:
+    return f"follows:suggestions:{user_id}"
+
+
+async def compute_follow_suggestions(session: AsyncSession, user_id: UUID, limit: int = SUGGESTIONS_CACHE_SIZE) -> list[dict]:
+    result = await session.execute(
+        SUGGESTIONS_SQL,
+        {
+            "user_id": user_id,
+            "max_seeds": MAX_SEEDS,
+            "max_liked": MAX_LIKED,
+            "fanout": FANOUT,
+            "shared_weight": SHARED_INTERACTION_WEIGHT,
+            "limit": limit,
+        },
+    )
+    return [
+        {
+            "user_id": str(row.candidate_id),
+            "mutual_follows": int(row.mutuals),
+            "shared_interactions": int(row.shared),
+            "score": round(float(row.score), 4),
+        }
+        for row in result
+    ]
+
+
+async def get_follow_suggestions(session: AsyncSession, user_id: UUID) -> list[dict]:
+    """Ranked suggestions from Redis, recomputed on a miss; Redis errors fall through to the database."""
+    key = _suggestions_key(user_id)
+    try:
+        cached = await redis_client.get(key)
+        if cached is not None:
+            return json.loads(cached)
+    except Exception:
+        logger.warning("Follow suggestions cache read failed", exc_info=True)
+
+    suggestions = await compute_follow_suggestions(session, user_id)
+    try:
+        await redis_client.set(key, json.dumps(suggestions), ex=Config.FOLLOW_SUGGESTIONS_TTL)
+    except Exception:
+        logger.warning("Follow suggestions cache write failed", exc_info=True)
+    return suggestions
+
+
+async def safe_invalidate_suggestions(*user_ids: UUID) -> None:
+    """Best-effort; a Redis failure must not fail the follow, the entry just lives out its TTL."""
+    try:
+        await redis_client.delete(*(_suggestions_key(user_id) for user_id in user_ids))
+    except Exception:
+        logger.warning("Failed to invalidate follow suggestions", exc_info=True)
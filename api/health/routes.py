@@ -0,0 +1,21 @@
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+
+from api.health.schemas import ReadinessReport
+from api.health.service import health_service
+
+router = APIRouter(tags=["health"])
+
+@router.get("/live")
+async def live():
+    return {"status": "ok"}
+
+@router.get("/ready", response_model=ReadinessReport, responses={503: {"model": ReadinessReport}})
+async def ready():
+    report = await health_service.readiness()
+    status_code = status.HTTP_200_OK if report.status == "ready" else status.HTTP_503_SERVICE_UNAVAILABLE
+    return JSONResponse(
+        status_code=status_code,
+        content=report.model_dump(),
+        headers={"Cache-Control": "no-store"},
+    )
@@ -0,0 +1,17 @@
+from typing import Dict, Literal, Optional
+
+from pydantic import BaseModel
+
+
+class DependencyCheck(BaseModel):
+    status: Literal["ok", "degraded", "down"]
+    latency_ms: float
+    checkout_ms: Optional[float] = None
+    error: Optional[str] = None
+
+
+class ReadinessReport(BaseModel):
+    status: Literal["ready", "unready"]
+    checks: Dict[str, DependencyCheck]
+    checked_at: float
+    cached: bool = False
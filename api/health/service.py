@@ -0,0 +1,103 @@
+"""Dependency probes for ``/ready``.
+
+A probe result is cached for ``HEALTH_CHECK_CACHE_TTL_MS`` and concurrent
+probes share one in-flight check. This way a busy load balancer (or several)
+adds at most one ``SELECT 1`` and one ``PING`` per TTL window to each worker.
+Only the database gates readiness; Redis is reported but never fails it.
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+from sqlalchemy import text
+
+from api.config import Config
+from api.db.main import get_engine
+from api.db.redis import auth_redis_client, redis_client
+
+from .schemas import DependencyCheck, ReadinessReport
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+class HealthService:
+
+    def __init__(self):
+        self.timeout = Config.HEALTH_CHECK_TIMEOUT_MS / 1000
+        self.cache_ttl = Config.HEALTH_CHECK_CACHE_TTL_MS / 1000
+        self.max_checkout = Config.READY_MAX_POOL_CHECKOUT_MS / 1000
+        self._report: Optional[ReadinessReport] = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+        self.started = False
+
+    def mark_started(self) -> None:
+        """Called once startup warm-up is done; until then the worker reports unready."""
+        self.started = True
+
+    async def check_database(self) -> DependencyCheck:
+        started = time.perf_counter()
+        checkout = None
+        try:
+            async with asyncio.timeout(self.timeout):
+                async with get_engine().connect() as conn:
+                    checkout = time.perf_counter() - started
+                    await conn.execute(text("SELECT 1"))
+        except TimeoutError:
+            return DependencyCheck(
+                status="down",
+                latency_ms=_ms(time.perf_counter() - started),
+                checkout_ms=_ms(checkout) if checkout is not None else None,
+                error="timeout" if checkout is not None else "pool checkout timeout",
+            )
+        except Exception as e:
+            return DependencyCheck(status="down", latency_ms=_ms(time.perf_counter() - started), error=str(e))
+
+        # A reachable database behind a saturated pool still can't serve traffic.
+        status = "degraded" if checkout > self.max_checkout else "ok"
+        return DependencyCheck(status=status, latency_ms=_ms(time.perf_counter() - started), checkout_ms=_ms(checkout))
+
+    async def check_redis(self, client) -> DependencyCheck:
+        # Every Redis-backed feature falls back when Redis is unavailable (and the
+        # circuit breaker fails those calls instantly), so an unreachable Redis
+        # degrades the worker instead of taking it out of rotation.
+        started = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.timeout):
+                await client.ping()
+        except TimeoutError:
+            return DependencyCheck(status="degraded", latency_ms=_ms(time.perf_counter() - started), error="timeout")
+        except Exception as e:
+            return DependencyCheck(status="degraded", latency_ms=_ms(time.perf_counter() - started), error=str(e))
+        return DependencyCheck(status="ok", latency_ms=_ms(time.perf_counter() - started))
+
+    async def readiness(self) -> ReadinessReport:
+        if not self.started:
+            return ReadinessReport(status="unready", checks={}, checked_at=time.time())
+
+        if self._report is not None and time.monotonic() < self._expires_at:
+            return self._report.model_copy(update={"cached": True})
+
+        async with self._lock:
+            # Another request may have refreshed the report while we waited.
+            if self._report is not None and time.monotonic() < self._expires_at:
+                return self._report.model_copy(update={"cached": True})
+
+            database, redis, redis_auth = await asyncio.gather(
+                self.check_database(), self.check_redis(redis_client), self.check_redis(auth_redis_client)
+            )
+            checks = {"database": database, "redis": redis, "redis_auth": redis_auth}
+            ready = database.status == "ok"
+            self._report = ReadinessReport(
+                status="ready" if ready else "unready",
+                checks=checks,
+                checked_at=time.time(),
+            )
+            self._expires_at = time.monotonic() + self.cache_ttl
+            return self._report
+
+
+health_service = HealthService()
@@ -0,0 +1,228 @@
+"""Per-request SQL and Redis accounting.
+
+Statement counts and time are collected through SQLAlchemy cursor events and an
+instrumented Redis client. They go into the ``RequestStats`` of the active
+context and are reported back as a ``Server-Timing`` header and as structured
+log fields. ``assert_max_queries`` turns the same counters into a query budget
+for tests and scripts, so N+1 regressions fail loudly.
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+from redis.asyncio import Redis, RedisCluster
+from redis.asyncio.client import Pipeline
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.metrics import REDIS_COMMAND_LATENCY
+
+request_logger = logging.getLogger("api.requests")
+
+
+@dataclass(slots=True)
+class RequestStats:
+    sql_statements: int = 0
+    sql_time: float = 0.0
+    redis_commands: int = 0
+    redis_round_trips: int = 0
+    redis_time: float = 0.0
+    sql_log: list = field(default_factory=list)
+    record_sql: bool = False
+
+    def merge(self, other: "RequestStats") -> None:
+        self.sql_statements += other.sql_statements
+        self.sql_time += other.sql_time
+        self.redis_commands += other.redis_commands
+        self.redis_round_trips += other.redis_round_trips
+        self.redis_time += other.redis_time
+        if self.record_sql:
+            self.sql_log.extend(other.sql_log)
+
+
+_current_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _current_stats.get()
+
+
+@contextmanager
+def collect_stats(record_sql: bool = False) -> Iterator[RequestStats]:
+    """Collect SQL/Redis counters for everything run inside the block.
+
+    Nested blocks (including requests served in-process) also roll their
+    counters up into the enclosing block.
+    """
+    parent = _current_stats.get()
+    stats = RequestStats(record_sql=record_sql or (parent is not None and parent.record_sql))
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+        if parent is not None:
+            parent.merge(stats)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def assert_max_queries(max_sql: int, max_redis_round_trips: Optional[int] = None) -> Iterator[RequestStats]:
+    """Fail if the block issues more SQL statements (or Redis round trips) than allowed.
+
+    Example::
+
+        with assert_max_queries(3):
+            await client.get(f"/comments/post/{post_id}", headers=auth)
+    """
+    with collect_stats(record_sql=True) as stats:
+        yield stats
+    if stats.sql_statements > max_sql:
+        statements = "\n".join(f"  {sql}" for sql in stats.sql_log)
+        raise QueryBudgetExceeded(
+            f"Expected at most {max_sql} SQL statements, got {stats.sql_statements}:\n{statements}"
+        )
+    if max_redis_round_trips is not None and stats.redis_round_trips > max_redis_round_trips:
+        raise QueryBudgetExceeded(
+            f"Expected at most {max_redis_round_trips} Redis round trips, got {stats.redis_round_trips}"
+        )
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    started = conn.info.get("query_started_at")
+    if started:
+        stats.sql_time += time.perf_counter() - started.pop()
+    stats.sql_statements += 1
+    if stats.record_sql:
+        stats.sql_log.append(statement)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+_pipeline_latency = REDIS_COMMAND_LATENCY.labels("PIPELINE")
+
+
+class InstrumentedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        commands = len(self.command_stack)
+        started = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            elapsed = time.perf_counter() - started
+            _pipeline_latency.observe(elapsed)
+            stats = _current_stats.get()
+            if stats is not None:
+                stats.redis_time += elapsed
+                stats.redis_commands += commands
+                stats.redis_round_trips += 1
+
+
+class InstrumentedRedis(Redis):
+    """``Redis`` client that accounts each command (and each pipeline flush) to the active request."""
+
+    async def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            elapsed = time.perf_counter() - started
+            REDIS_COMMAND_LATENCY.labels(args[0]).observe(elapsed)
+            stats = _current_stats.get()
+            if stats is not None:
+                stats.redis_time += elapsed
+                stats.redis_commands += 1
+                stats.redis_round_trips += 1
+
+    def pipeline(self, transaction: bool = True, shard_hint: Optional[str] = None) -> InstrumentedPipeline:
+        return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+class InstrumentedRedisCluster(RedisCluster):
+    """Cluster counterpart of ``InstrumentedRedis``; cluster pipelines are not accounted."""
+
+    async def execute_command(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            REDIS_COMMAND_LATENCY.labels(args[0]).observe(elapsed)
+            stats = _current_stats.get()
+            if stats is not None:
+                stats.redis_time += elapsed
+                stats.redis_commands += 1
+                stats.redis_round_trips += 1
+
+
+def server_timing(stats: RequestStats, total: float) -> bytes:
+    return (
+        f'db;dur={stats.sql_time * 1000:.2f};desc="{stats.sql_statements} queries", '
+        f'redis;dur={stats.redis_time * 1000:.2f};desc="{stats.redis_commands} cmds/{stats.redis_round_trips} rtt", '
+        f"app;dur={total * 1000:.2f}"
+    ).encode("latin-1")
+
+
+class InstrumentationMiddleware:
+    """Attach a fresh ``RequestStats`` to each request and report it on the way out."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(stats, time.perf_counter() - started)))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        with collect_stats() as stats:
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                request_logger.info(
+                    "%s %s %s",
+                    scope["method"],
+                    scope["path"],
+                    status_code,
+                    extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status_code": status_code,
+                        "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                        "sql_statements": stats.sql_statements,
+                        "sql_ms": round(stats.sql_time * 1000, 3),
+                        "redis_commands": stats.redis_commands,
+                        "redis_round_trips": stats.redis_round_trips,
+                        "redis_ms": round(stats.redis_time * 1000, 3),
+                    },
+                )
@@ -0,0 +1,200 @@
+"""Offline collaborative filtering for the FYP.
+
+Usage::
+
+    python -m api.jobs.collaborative_filtering --top-k 50 --min-users 3
+    python -m api.jobs.collaborative_filtering --kind posts --dry-run --output cf.json
+
+Votes, comments and follows are folded into one ``(user, item, weight)``
+stream by a single ``GROUP BY`` in Postgres, using the FYP ``SCORE_WEIGHT``s
+and dropping net-negative pairs. The stream is read in chunks from a
+server-side cursor, so no ORM objects are built and no table is ever held in
+memory. The pairs become a sparse user x item CSR matrix (items are authors,
+or posts with ``--kind posts``). Weights are damped with ``log1p``, each user
+is capped to their ``--max-items-per-user`` strongest items, and items with
+fewer than ``--min-users`` users are dropped. Item-item cosine similarity is
+then computed in row blocks as sparse products. The top ``--top-k``
+neighbours of every item are kept with a vectorised per-row selection and
+written to Redis as sorted sets (``fyp:similar_<kind>:<id>``), where
+``get_personalized_posts`` reads them.
+
+Requires the ``jobs`` extra (``scipy``).
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from uuid import UUID
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import Float, bindparam, text
+
+from api.db.main import dispose_engine, get_engine
+from api.db.redis import fyp_redis_client
+from api.posts.algorithm import SCORE_WEIGHT, _similar_items_key
+
+ITEM_COLUMNS = {"authors": "p.author_id", "posts": "p.id"}
+
+INTERACTIONS_SQL = """
+SELECT user_id, item_id, sum(weight) AS weight FROM (
+    SELECT v.user_id, {item} AS item_id,
+           CASE WHEN v.vote_type = 'UPVOTE' THEN :upvote ELSE :downvote END AS weight
+    FROM votes v JOIN posts p ON p.id = v.post_id
+    UNION ALL
+    SELECT c.user_id, {item}, :comment
+    FROM comments c JOIN posts p ON p.id = c.post_id
+    WHERE NOT c.is_deleted
+    {follows}
+) interactions
+GROUP BY user_id, item_id
+HAVING sum(weight) > 0
+"""
+
+FOLLOWS_SQL = """
+    UNION ALL
+    SELECT follower_id, following_id, :follow FROM follows
+"""
+
+
+def top_k_per_row(matrix: sparse.csr_matrix, k: int) -> sparse.csr_matrix:
+    """Keep the ``k`` largest entries of every row, without a Python loop over rows."""
+    counts = np.diff(matrix.indptr)
+    if counts.max(initial=0) <= k:
+        return matrix
+    rows = np.repeat(np.arange(matrix.shape[0]), counts)
+    order = np.lexsort((-matrix.data, rows))
+    rank = np.arange(order.size) - matrix.indptr[rows[order]]
+    keep = np.sort(order[rank < k])
+    indptr = np.concatenate(([0], np.cumsum(np.minimum(counts, k))))
+    return sparse.csr_matrix((matrix.data[keep], matrix.indices[keep], indptr), shape=matrix.shape)
+
+
+async def load_interactions(kind: str, chunk_size: int) -> tuple[sparse.csr_matrix, list[UUID], int]:
+    users: dict[UUID, int] = {}
+    items: dict[UUID, int] = {}
+    row_chunks, col_chunks, data_chunks = [], [], []
+
+    sql = INTERACTIONS_SQL.format(item=ITEM_COLUMNS[kind], follows=FOLLOWS_SQL if kind == "authors" else "")
+    # Typed so Postgres does not resolve the untyped CASE/UNION parameters as text.
+    weights = [
+        bindparam(name, SCORE_WEIGHT[key], type_=Float)
+        for name, key in (("upvote", "upvotes"), ("downvote", "downvotes"), ("comment", "comments"), ("follow", "follows"))
+    ]
+    statement = text(sql).bindparams(*(w for w in weights if f":{w.key}" in sql))
+    async with get_engine().connect() as conn:
+        result = await conn.stream(statement)
+        async for rows in result.partitions(chunk_size):
+            row_chunks.append(np.fromiter((users.setdefault(row[0], len(users)) for row in rows), np.int32, len(rows)))
+            col_chunks.append(np.fromiter((items.setdefault(row[1], len(items)) for row in rows), np.int32, len(rows)))
+            data_chunks.append(np.fromiter((row[2] for row in rows), np.float32, len(rows)))
+
+    pairs = sum(len(chunk) for chunk in data_chunks)
+    if not pairs:
+        return sparse.csr_matrix((0, 0), dtype=np.float32), [], 0
+    matrix = sparse.csr_matrix(
+        (np.concatenate(data_chunks), (np.concatenate(row_chunks), np.concatenate(col_chunks))),
+        shape=(len(users), len(items)),
+        dtype=np.float32,
+    )
+    return matrix, list(items), pairs
+
+
+def prepare(matrix: sparse.csr_matrix, item_ids: list[UUID], max_items_per_user: int, min_users: int):
+    """Damp, cap and prune the matrix, then L2-normalise its item columns."""
+    matrix.data = np.log1p(matrix.data)
+    matrix = top_k_per_row(matrix, max_items_per_user)
+
+    support = np.diff(matrix.tocsc().indptr)
+    keep = np.flatnonzero(support >= min_users)
+    matrix = matrix[:, keep]
+    item_ids = [item_ids[i] for i in keep]
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0)).ravel())
+    norms[norms == 0] = 1.0
+    return (matrix @ sparse.diags(1.0 / norms).astype(np.float32)).tocsr(), item_ids
+
+
+def similarity_blocks(normalized: sparse.csr_matrix, top_k: int, block_size: int):
+    """Yield ``(first_item, block)`` where ``block`` holds each item's top-k cosine neighbours."""
+    by_item = normalized.T.tocsr()
+    for start in range(0, by_item.shape[0], block_size):
+        block = (by_item[start : start + block_size] @ normalized).tocsr()
+        rows = np.repeat(np.arange(block.shape[0]), np.diff(block.indptr))
+        block.data[block.indices == rows + start] = 0
+        block.eliminate_zeros()
+        yield start, top_k_per_row(block, top_k)
+
+
+async def write_block(start: int, block: sparse.csr_matrix, item_ids: list[UUID], kind: str, ttl: int) -> int:
+    keys = 0
+    async with fyp_redis_client.pipeline(transaction=False) as pipe:
+        for row in range(block.shape[0]):
+            lo, hi = block.indptr[row], block.indptr[row + 1]
+            if lo == hi:
+                continue
+            key = _similar_items_key(kind, item_ids[start + row])
+            pipe.delete(key)
+            pipe.zadd(key, {str(item_ids[col]): round(float(score), 4) for col, score in zip(block.indices[lo:hi], block.data[lo:hi])})
+            pipe.expire(key, ttl)
+            keys += 1
+        if keys:
+            await pipe.execute()
+    return keys
+
+
+async def run(args: argparse.Namespace) -> dict:
+    started = time.perf_counter()
+    matrix, item_ids, pairs = await load_interactions(args.kind, args.chunk_size)
+    loaded = time.perf_counter()
+    users, items = matrix.shape
+
+    normalized, item_ids = prepare(matrix, item_ids, args.max_items_per_user, args.min_users)
+    keys = neighbours = 0
+    for start, block in similarity_blocks(normalized, args.top_k, args.block_size):
+        neighbours += block.nnz
+        if not args.dry_run:
+            keys += await write_block(start, block, item_ids, args.kind, args.ttl)
+    finished = time.perf_counter()
+
+    await dispose_engine()
+    return {
+        "kind": args.kind,
+        "users": users,
+        "items": items,
+        "items_kept": len(item_ids),
+        "pairs": pairs,
+        "neighbours": neighbours,
+        "keys_written": keys,
+        "load_seconds": round(loaded - started, 2),
+        "compute_seconds": round(finished - loaded, 2),
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--kind", choices=sorted(ITEM_COLUMNS), default="authors")
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Rows fetched per cursor round trip")
+    parser.add_argument("--max-items-per-user", type=int, default=500)
+    parser.add_argument("--min-users", type=int, default=2, help="Drop items with fewer interacting users")
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--block-size", type=int, default=1024, help="Items per similarity product")
+    parser.add_argument("--ttl", type=int, default=60 * 60 * 48, help="Seconds before unrefreshed lists expire")
+    parser.add_argument("--dry-run", action="store_true", help="Compute and report without writing to Redis")
+    parser.add_argument("--output")
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Snapshot the ``follows`` table into the CSR files read by ``api/follows/graph.py``.
+
+Usage::
+
+    python -m api.jobs.follow_graph_snapshot
+    python -m api.jobs.follow_graph_snapshot --keep 3 --output graph.json
+
+The id of the newest event on ``follows:graph:events`` is read before the
+table, so workers replay every change the snapshot might have missed. Edges
+are streamed from a server-side cursor as raw 16-byte ids. Users are numbered
+by their sorted UUIDs, and the adjacency is built with a lexsort and a
+bincount, so no per-edge Python objects outlive a chunk. Run it more often
+than ``FOLLOW_GRAPH_STREAM_MAXLEN`` events accumulate, otherwise the stream
+is trimmed past the snapshot and workers miss changes until the next run.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import numpy as np
+from sqlalchemy import select
+
+from api.config import Config
+from api.db.main import dispose_engine, get_engine
+from api.db.models import Follows
+from api.db.redis import close_redis_clients, redis_client
+from api.follows import graph
+from api.jobs.snapshots import new_version, publish
+
+
+async def stream_position() -> str:
+    newest = await redis_client.xrevrange(graph.EVENTS_STREAM, count=1)
+    return newest[0][0] if newest else "0-0"
+
+
+async def load_edges(chunk_size: int) -> tuple[np.ndarray, np.ndarray]:
+    followers, followings = [], []
+    async with get_engine().connect() as conn:
+        result = await conn.stream(select(Follows.follower_id, Follows.following_id))
+        async for rows in result.partitions(chunk_size):
+            followers.append(np.frombuffer(b"".join(row[0].bytes for row in rows), dtype="V16"))
+            followings.append(np.frombuffer(b"".join(row[1].bytes for row in rows), dtype="V16"))
+    if not followers:
+        return np.zeros(0, dtype="S16"), np.zeros(0, dtype="S16")
+    # Viewed as "S16" so numpy orders them bytewise, like Postgres orders uuid.
+    return np.concatenate(followers).view("S16"), np.concatenate(followings).view("S16")
+
+
+def build_csr(followers: np.ndarray, followings: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    ids = np.unique(np.concatenate((followers, followings)))
+    src = np.searchsorted(ids, followers).astype(np.int32)
+    dst = np.searchsorted(ids, followings).astype(np.int32)
+    order = np.lexsort((dst, src))
+    indptr = np.zeros(ids.size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=ids.size), out=indptr[1:])
+    return ids, indptr, dst[order]
+
+
+async def run(args: argparse.Namespace) -> dict:
+    started = time.perf_counter()
+    stream_id = await stream_position()
+    followers, followings = await load_edges(args.chunk_size)
+    loaded = time.perf_counter()
+
+    ids, indptr, indices = build_csr(followers, followings)
+    version, path = new_version(args.root)
+    np.save(os.path.join(path, graph.IDS_FILE), ids)
+    np.save(os.path.join(path, graph.INDPTR_FILE), indptr)
+    np.save(os.path.join(path, graph.INDICES_FILE), indices)
+    with open(os.path.join(path, graph.META_FILE), "w") as fh:
+        json.dump({"users": int(ids.size), "edges": int(indices.size), "stream_id": stream_id, "built_at": int(time.time())}, fh)
+    publish(args.root, version, args.keep)
+
+    await close_redis_clients()
+    await dispose_engine()
+    return {
+        "version": version,
+        "users": int(ids.size),
+        "edges": int(indices.size),
+        "stream_id": stream_id,
+        "bytes": sum(entry.stat().st_size for entry in os.scandir(path)),
+        "load_seconds": round(loaded - started, 2),
+        "build_seconds": round(time.perf_counter() - loaded, 2),
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--root", default=Config.FOLLOW_GRAPH_DIR)
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Rows fetched per cursor round trip")
+    parser.add_argument("--keep", type=int, default=2, help="Snapshot versions to keep on disk")
+    parser.add_argument("--output")
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""Recompute the denormalised counters and repair the rows that drifted.
+
+Usage::
+
+    python -m api.jobs.reconcile_counters --dry-run --output drift.json
+    python -m api.jobs.reconcile_counters --batch-size 5000 --pause 0.05
+
+Covered counters: ``posts.upvote_count``, ``downvote_count`` and
+``comment_count`` (live comments, replies included), and ``users.followers_count``
+and ``following_count``.
+
+Each table is walked in primary-key order, ``--batch-size`` rows at a time.
+For every batch, one statement reads the stored counters together with the
+true counts, computed by ``GROUP BY`` over the child rows of just that
+batch. Both come from the same snapshot. Drifted rows are then repaired
+with a single ``UPDATE ... FROM (VALUES ...)`` that only matches rows whose
+counters still equal the values that were read. A row changed by a
+concurrent vote, comment or follow in the meantime is left alone and
+counted as a conflict, and the next run picks it up. Each batch commits on
+its own and the repair gives up after ``--lock-timeout-ms`` instead of
+queueing behind writers. No lock is held across batches, so the job can
+run online. Repaired posts also get their ``hot_score`` recomputed.
+"""
+
+import argparse
+import asyncio
+import heapq
+import json
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+from uuid import UUID
+
+from sqlalchemy import Integer, Table, Uuid, column, func, text, update, values
+from sqlalchemy.exc import DBAPIError
+
+from api.db.main import dispose_engine, get_engine
+from api.db.models import Posts, User
+from api.posts.ranking import hot_score_sql
+
+LOCK_NOT_AVAILABLE = "55P03"
+WORST_ROWS = 10
+# asyncpg binds at most 32767 parameters per statement; posts use 7 per row.
+REPAIR_CHUNK = 4000
+# Stands in for a NULL counter in the compare-and-set; real counts are never negative.
+NULL_COUNTER = -1
+
+POST_COUNTS_SQL = text("""
+WITH batch AS (
+    SELECT id, upvote_count, downvote_count, comment_count FROM posts
+    WHERE id > :after ORDER BY id LIMIT :batch_size
+)
+SELECT b.id,
+       b.upvote_count AS seen_upvote_count,
+       b.downvote_count AS seen_downvote_count,
+       b.comment_count AS seen_comment_count,
+       coalesce(v.upvotes, 0) AS true_upvote_count,
+       coalesce(v.downvotes, 0) AS true_downvote_count,
+       coalesce(c.comments, 0) AS true_comment_count
+FROM batch b
+LEFT JOIN (
+    SELECT post_id,
+           count(*) FILTER (WHERE vote_type = 'UPVOTE') AS upvotes,
+           count(*) FILTER (WHERE vote_type = 'DOWNVOTE') AS downvotes
+    FROM votes WHERE post_id IN (SELECT id FROM batch)
+    GROUP BY post_id
+) v ON v.post_id = b.id
+LEFT JOIN (
+    SELECT post_id, count(*) AS comments
+    FROM comments WHERE NOT is_deleted AND post_id IN (SELECT id FROM batch)
+    GROUP BY post_id
+) c ON c.post_id = b.id
+ORDER BY b.id
+""")
+
+USER_COUNTS_SQL = text("""
+WITH batch AS (
+    SELECT id, followers_count, following_count FROM users
+    WHERE id > :after ORDER BY id LIMIT :batch_size
+)
+SELECT b.id,
+       b.followers_count AS seen_followers_count,
+       b.following_count AS seen_following_count,
+       coalesce(fr.n, 0) AS true_followers_count,
+       coalesce(fg.n, 0) AS true_following_count
+FROM batch b
+LEFT JOIN (
+    SELECT following_id, count(*) AS n FROM follows
+    WHERE following_id IN (SELECT id FROM batch) GROUP BY following_id
+) fr ON fr.following_id = b.id
+LEFT JOIN (
+    SELECT follower_id, count(*) AS n FROM follows
+    WHERE follower_id IN (SELECT id FROM batch) GROUP BY follower_id
+) fg ON fg.follower_id = b.id
+ORDER BY b.id
+""")
+
+
+@dataclass
+class CounterTable:
+    name: str
+    table: Table
+    counters: tuple[str, ...]
+    counts_sql: object
+    # Extra SET clauses derived from the repaired counters, e.g. hot_score.
+    derived: Optional[Callable] = None
+
+
+TABLES = {
+    "posts": CounterTable(
+        "posts",
+        Posts.__table__,
+        ("upvote_count", "downvote_count", "comment_count"),
+        POST_COUNTS_SQL,
+        lambda table, drift: {
+            "hot_score": hot_score_sql(
+                drift.c.true_upvote_count, drift.c.true_downvote_count, drift.c.true_comment_count, table.c.created_at
+            )
+        },
+    ),
+    "users": CounterTable(
+        "users",
+        User.__table__,
+        ("followers_count", "following_count"),
+        USER_COUNTS_SQL,
+    ),
+}
+
+
+def repair_statement(spec: CounterTable, rows: list):
+    """Compare-and-set the true counts onto rows whose counters are still what we read."""
+    drift = values(
+        column("id", Uuid),
+        *(column(f"seen_{name}", Integer) for name in spec.counters),
+        *(column(f"true_{name}", Integer) for name in spec.counters),
+        name="drift",
+    ).data(
+        [
+            (
+                row.id,
+                *(NULL_COUNTER if getattr(row, f"seen_{name}") is None else getattr(row, f"seen_{name}") for name in spec.counters),
+                *(getattr(row, f"true_{name}") for name in spec.counters),
+            )
+            for row in rows
+        ]
+    )
+    table = spec.table
+    assignments = {name: drift.c[f"true_{name}"] for name in spec.counters}
+    if spec.derived is not None:
+        assignments.update(spec.derived(table, drift))
+    return (
+        update(table)
+        .where(table.c.id == drift.c.id)
+        .where(*(func.coalesce(table.c[name], NULL_COUNTER) == drift.c[f"seen_{name}"] for name in spec.counters))
+        .values(assignments)
+        .returning(table.c.id)
+    )
+
+
+class DriftStats:
+    def __init__(self, counters: tuple[str, ...]):
+        self.counters = counters
+        self.rows = 0
+        self.drifted_rows = 0
+        self.repaired = 0
+        self.conflicts = 0
+        self.per_counter = {name: {"rows": 0, "abs_drift": 0, "net_drift": 0, "max_abs_drift": 0} for name in counters}
+        self._worst: list[tuple[int, str, dict]] = []
+
+    def drift(self, row) -> dict:
+        return {name: getattr(row, f"true_{name}") - (getattr(row, f"seen_{name}") or 0) for name in self.counters}
+
+    def add(self, rows: list) -> list:
+        self.rows += len(rows)
+        drifted = []
+        for row in rows:
+            deltas = self.drift(row)
+            # NULL counters count as drift even when the true count is zero.
+            if not any(deltas.values()) and all(getattr(row, f"seen_{name}") is not None for name in self.counters):
+                continue
+            drifted.append(row)
+            for name, delta in deltas.items():
+                if delta or getattr(row, f"seen_{name}") is None:
+                    stats = self.per_counter[name]
+                    stats["rows"] += 1
+                    stats["abs_drift"] += abs(delta)
+                    stats["net_drift"] += delta
+                    stats["max_abs_drift"] = max(stats["max_abs_drift"], abs(delta))
+            entry = (sum(abs(delta) for delta in deltas.values()), str(row.id), deltas)
+            if len(self._worst) < WORST_ROWS:
+                heapq.heappush(self._worst, entry)
+            else:
+                heapq.heappushpop(self._worst, entry)
+        self.drifted_rows += len(drifted)
+        return drifted
+
+    def report(self) -> dict:
+        return {
+            "rows": self.rows,
+            "drifted_rows": self.drifted_rows,
+            "drift_rate": round(self.drifted_rows / self.rows, 6) if self.rows else 0.0,
+            "repaired": self.repaired,
+            "conflicts": self.conflicts,
+            "counters": self.per_counter,
+            "worst": [{"id": row_id, "drift": deltas} for _, row_id, deltas in sorted(self._worst, reverse=True)],
+        }
+
+
+async def reconcile(spec: CounterTable, args: argparse.Namespace) -> dict:
+    engine = get_engine()
+    stats = DriftStats(spec.counters)
+    after = UUID(int=0)
+    batches = 0
+    started = time.perf_counter()
+
+    while True:
+        async with engine.connect() as conn:
+            rows = (await conn.execute(spec.counts_sql, {"after": after, "batch_size": args.batch_size})).all()
+        if not rows:
+            break
+        after = rows[-1].id
+        batches += 1
+        drifted = stats.add(rows)
+
+        if drifted and not args.dry_run:
+            try:
+                async with engine.begin() as conn:
+                    await conn.execute(text(f"SET LOCAL lock_timeout = '{int(args.lock_timeout_ms)}ms'"))
+                    repaired = 0
+                    for start in range(0, len(drifted), REPAIR_CHUNK):
+                        result = await conn.execute(repair_statement(spec, drifted[start : start + REPAIR_CHUNK]))
+                        repaired += len(result.all())
+                stats.repaired += repaired
+                stats.conflicts += len(drifted) - repaired
+            except DBAPIError as e:
+                if getattr(e.orig, "sqlstate", None) != LOCK_NOT_AVAILABLE:
+                    raise
+                stats.conflicts += len(drifted)
+
+        if batches % 20 == 0:
+            print(f"{spec.name}: {stats.rows} rows, {stats.drifted_rows} drifted", file=sys.stderr)
+        if args.pause:
+            await asyncio.sleep(args.pause)
+
+    return {**stats.report(), "batches": batches, "seconds": round(time.perf_counter() - started, 2)}
+
+
+async def run(args: argparse.Namespace) -> dict:
+    report = {"dry_run": args.dry_run, "batch_size": args.batch_size}
+    for name in args.tables:
+        report[name] = await reconcile(TABLES[name], args)
+    await dispose_engine()
+    return report
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tables", nargs="+", choices=sorted(TABLES), default=sorted(TABLES))
+    parser.add_argument("--batch-size", type=int, default=5000, help="Parent rows counted and repaired per transaction")
+    parser.add_argument("--lock-timeout-ms", type=int, default=2000, help="Skip a batch's repair rather than wait longer for row locks")
+    parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches to throttle load")
+    parser.add_argument("--dry-run", action="store_true", help="Report drift without repairing it")
+    parser.add_argument("--output")
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
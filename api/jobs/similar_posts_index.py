@@ -0,0 +1,185 @@
+"""Build the memory-mapped index behind ``GET /posts/{post_id}/similar``.
+
+Usage::
+
+    python -m api.jobs.similar_posts_index --dim 128 --tables 4
+    python -m api.jobs.similar_posts_index --keep 3 --output similar.json
+
+The job makes two streaming passes over ``posts``, each through a server-side
+cursor in chunks. The first pass counts hashed-feature document frequencies
+for the IDF table. The second writes one vector per post, ordered by id,
+straight to ``vectors.f32``. LSH signatures are then computed in blocks over
+the memory-mapped vectors. Delta records of the previous version that the new
+base does not cover are carried over, and ``current`` is repointed atomically
+while the old delta is still locked, so no append falls between the two.
+Serving workers pick up the new version on their next query.
+See ``api/posts/similarity.py`` for the file layout.
+"""
+
+import argparse
+import asyncio
+import fcntl
+import json
+import os
+import time
+from contextlib import contextmanager
+
+import numpy as np
+from sqlalchemy import select
+
+from api.config import Config
+from api.db.main import dispose_engine, get_engine
+from api.db.models import Posts
+from api.jobs.snapshots import current_path, new_version, publish
+from api.posts import similarity
+
+SIGNATURE_BLOCK = 65536
+
+
+async def _stream_posts(chunk_size: int, *columns):
+    async with get_engine().connect() as conn:
+        result = await conn.stream(select(*columns).order_by(Posts.id))
+        async for rows in result.partitions(chunk_size):
+            yield rows
+
+
+async def document_frequencies(chunk_size: int) -> tuple[np.ndarray, int]:
+    df = np.zeros(1 << similarity.FEATURE_BITS, dtype=np.int32)
+    documents = 0
+    async for rows in _stream_posts(chunk_size, Posts.title, Posts.content):
+        for title, content in rows:
+            df[similarity.feature_ids(similarity.token_hashes(title, content))] += 1
+        documents += len(rows)
+    return df, documents
+
+
+async def write_vectors(path: str, idf: np.ndarray, dim: int, chunk_size: int) -> int:
+    count = 0
+    with open(os.path.join(path, similarity.VECTORS_FILE), "wb") as vectors, open(
+        os.path.join(path, similarity.IDS_FILE), "wb"
+    ) as ids:
+        async for rows in _stream_posts(chunk_size, Posts.id, Posts.title, Posts.content):
+            block = np.stack([similarity.post_vector(title, content, idf, dim) for _, title, content in rows])
+            block.tofile(vectors)
+            ids.write(b"".join(post_id.bytes for post_id, _, _ in rows))
+            count += len(rows)
+    return count
+
+
+def write_lsh(path: str, count: int, dim: int, tables: int, bits: int, seed: int) -> None:
+    planes = np.random.default_rng(seed).standard_normal((tables, bits, dim)).astype(np.float32)
+    planes.tofile(os.path.join(path, similarity.PLANES_FILE))
+
+    signatures = np.zeros((tables, count), dtype=np.uint32)
+    if count:
+        vectors = np.memmap(os.path.join(path, similarity.VECTORS_FILE), dtype=np.float32, mode="r", shape=(count, dim))
+        for start in range(0, count, SIGNATURE_BLOCK):
+            signatures[:, start : start + SIGNATURE_BLOCK] = similarity.lsh_signatures(
+                np.asarray(vectors[start : start + SIGNATURE_BLOCK]), planes
+            )
+    order = np.argsort(signatures, axis=1, kind="stable").astype(np.int64)
+    np.take_along_axis(signatures, order, axis=1).tofile(os.path.join(path, similarity.SORTED_SIGNATURES_FILE))
+    order.tofile(os.path.join(path, similarity.ORDER_FILE))
+
+
+@contextmanager
+def locked_delta(previous: str | None):
+    """Hold the previous version's delta ``flock`` until ``current`` is repointed.
+
+    Appenders re-check ``current`` after taking the lock, so none can write to
+    the old delta between the carry-over and the swap.
+    """
+    if previous is None:
+        yield
+        return
+    with open(os.path.join(previous, similarity.DELTA_FILE), "ab") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def carry_over_delta(previous: str | None, path: str, count: int, dim: int) -> int:
+    """Copy delta records of the previous version that the new base does not contain."""
+    if previous is None:
+        return 0
+    delta_path = os.path.join(previous, similarity.DELTA_FILE)
+    if not os.path.exists(delta_path):
+        return 0
+    with open(os.path.join(previous, similarity.META_FILE)) as fh:
+        if json.load(fh)["dim"] != dim:
+            return 0
+
+    delta = np.fromfile(delta_path, dtype=similarity.delta_dtype(dim))
+    if count:
+        ids = np.fromfile(os.path.join(path, similarity.IDS_FILE), dtype="S16")
+        delta_ids = delta["id"].view("S16")
+        rows = np.minimum(np.searchsorted(ids, delta_ids), count - 1)
+        delta = delta[ids[rows] != delta_ids]
+    delta.tofile(os.path.join(path, similarity.DELTA_FILE))
+    return int(delta.size)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    started = time.perf_counter()
+    root = args.root
+    version, path = new_version(root)
+
+    df, documents = await document_frequencies(args.chunk_size)
+    idf = (np.log((1 + documents) / (1 + df)) + 1).astype(np.float32)
+    idf.tofile(os.path.join(path, similarity.IDF_FILE))
+    counted = time.perf_counter()
+
+    count = await write_vectors(path, idf, args.dim, args.chunk_size)
+    vectorised = time.perf_counter()
+
+    bits = args.bits or int(np.clip(np.log2(max(count, 1) / 32), 4, 24))
+    write_lsh(path, count, args.dim, args.tables, bits, args.seed)
+    with open(os.path.join(path, similarity.META_FILE), "w") as fh:
+        json.dump({"dim": args.dim, "count": count, "tables": args.tables, "bits": bits, "built_at": int(time.time())}, fh)
+    previous = current_path(root)
+    with locked_delta(previous):
+        carried = carry_over_delta(previous, path, count, args.dim)
+        publish(root, version, args.keep)
+
+    await dispose_engine()
+    return {
+        "version": version,
+        "posts": count,
+        "dim": args.dim,
+        "tables": args.tables,
+        "bits": bits,
+        "delta_carried_over": carried,
+        "bytes": sum(entry.stat().st_size for entry in os.scandir(path)),
+        "df_seconds": round(counted - started, 2),
+        "vector_seconds": round(vectorised - counted, 2),
+        "lsh_seconds": round(time.perf_counter() - vectorised, 2),
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--root", default=Config.SIMILAR_POSTS_INDEX_DIR)
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--tables", type=int, default=4, help="LSH hash tables")
+    parser.add_argument("--bits", type=int, default=0, help="Hyperplanes per table (0 sizes buckets to ~32 posts)")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Rows fetched per cursor round trip")
+    parser.add_argument("--keep", type=int, default=2, help="Index versions to keep on disk")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output")
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Versioned on-disk snapshots shared by the offline jobs.
+
+A job writes a complete ``v<timestamp>`` directory under its root and then
+repoints the root's ``current`` symlink at it. Readers resolve ``current``
+once per load, so a rebuild never shows them a half-written version.
+"""
+
+import os
+import shutil
+import time
+
+CURRENT_LINK = "current"
+
+
+def new_version(root: str) -> tuple[str, str]:
+    """Create an empty version directory; returns ``(version, path)``."""
+    version = f"v{int(time.time())}"
+    path = os.path.join(root, version)
+    os.makedirs(path)
+    return version, path
+
+
+def current_path(root: str) -> str | None:
+    try:
+        return os.path.realpath(os.path.join(root, CURRENT_LINK), strict=True)
+    except OSError:
+        return None
+
+
+def publish(root: str, version: str, keep: int) -> None:
+    link = os.path.join(root, CURRENT_LINK)
+    staging = f"{link}.{os.getpid()}"
+    os.symlink(version, staging)
+    os.replace(staging, link)
+
+    # Workers may still have older versions mapped; unlinked files stay valid for them.
+    versions = sorted(name for name in os.listdir(root) if name.startswith("v") and name != version)
+    for name in versions[: max(0, len(versions) - (keep - 1))]:
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
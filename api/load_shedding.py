@@ -0,0 +1,174 @@
+"""Adaptive concurrency limiting.
+
+Every request is sorted into a route class before routing: cheap reads,
+expensive reads (FYP, similar posts, follow suggestions, vote summaries), auth
+(bcrypt-bound), and writes. Each class has its own AIMD limit on concurrent
+requests. The limit grows by roughly one slot per window of requests completed
+under the class's target latency, and it shrinks by ``backoff`` (at most once
+per target-latency window) when completions run slower. Requests over the limit are rejected straight away with
+``503`` and ``Retry-After``, instead of queueing on the shared DB pool and
+dragging everyone else's latency up with them.
+
+A global in-flight cap sits on top of the class limits. Part of it is reserved
+for priority classes, so writes such as ``/votes/create`` still get in while
+reads are being shed.
+"""
+
+import json
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.config import Config
+from api.metrics import CONCURRENCY_LIMIT, LOAD_SHED_REJECTIONS
+
+
+@dataclass(frozen=True, slots=True)
+class RouteClass:
+    name: str
+    initial_limit: int
+    min_limit: int
+    max_limit: int
+    target_latency: float
+    priority: bool = False
+
+
+READ = RouteClass("read", initial_limit=100, min_limit=10, max_limit=400, target_latency=0.1)
+EXPENSIVE_READ = RouteClass("expensive_read", initial_limit=20, min_limit=2, max_limit=100, target_latency=0.3)
+AUTH = RouteClass("auth", initial_limit=8, min_limit=2, max_limit=32, target_latency=0.5)
+WRITE = RouteClass("write", initial_limit=50, min_limit=5, max_limit=200, target_latency=0.25, priority=True)
+
+# (path pattern, class), checked in order; unmatched requests are classified by
+# method (GET/HEAD/OPTIONS are reads, everything else is a write).
+ROUTE_CLASSES = (
+    (re.compile(r"^/posts/fyp$"), EXPENSIVE_READ),
+    (re.compile(r"^/posts/[^/]+/similar$"), EXPENSIVE_READ),
+    (re.compile(r"^/follows/suggestions$"), EXPENSIVE_READ),
+    (re.compile(r"^/votes/(post|user)/[^/]+/summary$"), EXPENSIVE_READ),
+    (re.compile(r"^/auth/(login|signup|refresh)$"), AUTH),
+)
+EXEMPT_PATHS = re.compile(r"^/(live|ready|health|metrics|admin/)")
+READ_METHODS = frozenset(("GET", "HEAD", "OPTIONS"))
+
+
+class AdaptiveLimiter:
+    """Additive-increase/multiplicative-decrease limit on concurrent requests."""
+
+    def __init__(self, route_class: RouteClass, backoff: float = 0.9):
+        self.route_class = route_class
+        self.backoff = backoff
+        self.limit = float(route_class.initial_limit)
+        self.in_flight = 0
+        self._next_decrease_at = 0.0
+        self._limit_gauge = CONCURRENCY_LIMIT.labels(route_class.name)
+        self._limit_gauge.set(self.limit)
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= int(self.limit):
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self, latency: float) -> None:
+        utilised = self.in_flight * 2 >= self.limit
+        self.in_flight -= 1
+        route_class = self.route_class
+
+        if latency > route_class.target_latency:
+            now = time.monotonic()
+            if now >= self._next_decrease_at:
+                self.limit = max(route_class.min_limit, self.limit * self.backoff)
+                self._next_decrease_at = now + route_class.target_latency
+                self._limit_gauge.set(self.limit)
+        elif utilised and self.limit < route_class.max_limit:
+            # Only grow while the limit is actually being exercised, otherwise an
+            # idle period would inflate it to max_limit.
+            self.limit = min(route_class.max_limit, self.limit + 1 / self.limit)
+            self._limit_gauge.set(self.limit)
+
+
+class LoadShedder:
+    def __init__(self, max_in_flight: int, priority_reserve: float):
+        self.max_in_flight = max_in_flight
+        self.normal_cap = int(max_in_flight * (1 - priority_reserve))
+        self.in_flight = 0
+        self.limiters: Dict[str, AdaptiveLimiter] = {
+            route_class.name: AdaptiveLimiter(route_class) for route_class in (READ, EXPENSIVE_READ, AUTH, WRITE)
+        }
+
+    def classify(self, method: str, path: str) -> Optional[RouteClass]:
+        if EXEMPT_PATHS.match(path):
+            return None
+        for pattern, route_class in ROUTE_CLASSES:
+            if pattern.match(path):
+                return route_class
+        return READ if method in READ_METHODS else WRITE
+
+    def try_acquire(self, route_class: RouteClass) -> Optional[AdaptiveLimiter]:
+        cap = self.max_in_flight if route_class.priority else self.normal_cap
+        if self.in_flight >= cap:
+            return None
+        limiter = self.limiters[route_class.name]
+        if not limiter.try_acquire():
+            return None
+        self.in_flight += 1
+        return limiter
+
+    def release(self, limiter: AdaptiveLimiter, latency: float) -> None:
+        self.in_flight -= 1
+        limiter.release(latency)
+
+
+load_shedder = LoadShedder(
+    max_in_flight=Config.LOAD_SHED_MAX_IN_FLIGHT,
+    priority_reserve=Config.LOAD_SHED_PRIORITY_RESERVE,
+)
+
+
+class LoadSheddingMiddleware:
+    """Reject requests over their route class's concurrency limit with ``503``."""
+
+    def __init__(self, app: ASGIApp, shedder: LoadShedder = load_shedder):
+        self.app = app
+        self.shedder = shedder
+        self.retry_after = str(Config.LOAD_SHED_RETRY_AFTER).encode("latin-1")
+        self.body = json.dumps({"detail": "Server is over capacity, please retry shortly"}).encode("utf-8")
+        self._rejections = {name: LOAD_SHED_REJECTIONS.labels(name) for name in self.shedder.limiters}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route_class = self.shedder.classify(scope["method"], scope["path"])
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.shedder.try_acquire(route_class)
+        if limiter is None:
+            self._rejections[route_class.name].inc()
+            await self._reject(send)
+            return
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.shedder.release(limiter, time.perf_counter() - started)
+
+    async def _reject(self, send: Send) -> None:
+        message: Message = {
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(self.body)).encode("latin-1")),
+                (b"retry-after", self.retry_after),
+            ],
+        }
+        await send(message)
+        await send({"type": "http.response.body", "body": self.body})
@@ -0,0 +1,306 @@
+"""Minimal in-process Prometheus metrics.
+
+Label children are resolved once and cached by their label-value tuple, so the
+hot path is a dict lookup and a few integer/float increments. Nothing is
+allocated per observation. Gauges that are cheap to read on demand (pool
+stats, event-loop tasks) are computed at scrape time by collector callbacks.
+
+Metrics are per process. With several workers, scrape each one or aggregate
+downstream.
+"""
+
+import asyncio
+import bisect
+import re
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.pool import Pool
+from starlette.routing import compile_path
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Metric:
+    kind = ""
+    child_class = _CounterChild
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def _new_child(self):
+        return self.child_class()
+
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._new_child()
+        return child
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in self._children.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, values)} {child.value}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+    child_class = _GaugeChild
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, values, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, values)} {child.sum}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, values)} {child.count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], None]) -> None:
+        """Register a callback that refreshes gauges right before each scrape."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+REQUEST_LATENCY = registry.register(
+    Histogram("chefly_http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route"))
+)
+REQUESTS_TOTAL = registry.register(
+    Counter("chefly_http_requests_total", "HTTP requests by route template and status class.", ("method", "route", "status"))
+)
+REQUESTS_IN_FLIGHT = registry.register(Gauge("chefly_http_requests_in_flight", "HTTP requests currently being served."))
+REDIS_COMMAND_LATENCY = registry.register(
+    Histogram("chefly_redis_command_duration_seconds", "Redis command (or pipeline flush) latency.", ("command",), FAST_BUCKETS)
+)
+DB_POOL = registry.register(Gauge("chefly_db_pool_connections", "SQLAlchemy pool connections by state.", ("state",)))
+FYP_REQUESTS = registry.register(
+    Counter("chefly_fyp_requests_total", "FYP responses by the source that served them.", ("source",))
+)
+RESPONSE_CACHE = registry.register(
+    Counter("chefly_response_cache_requests_total", "Response cache lookups by result.", ("result",))
+)
+LOAD_SHED_REJECTIONS = registry.register(
+    Counter("chefly_load_shed_rejections_total", "Requests rejected with 503 by the concurrency limiter.", ("route_class",))
+)
+CONCURRENCY_LIMIT = registry.register(
+    Gauge("chefly_concurrency_limit", "Current adaptive concurrency limit per route class.", ("route_class",))
+)
+RATE_LIMIT_DECISIONS = registry.register(
+    Counter("chefly_rate_limit_decisions_total", "Rate limit decisions by limiter and where they were made.", ("limiter", "result"))
+)
+CIRCUIT_BREAKER_STATE = registry.register(
+    Gauge("chefly_circuit_breaker_state", "Circuit breaker state (0 closed, 1 half-open, 2 open).", ("breaker",))
+)
+EVENT_LOOP_TASKS = registry.register(
+    Gauge("chefly_event_loop_tasks", "Pending asyncio tasks on the serving event loop (background work queue depth).")
+)
+
+_STATUS_CLASSES = {code: f"{code // 100}xx" for code in range(100, 600)}
+_in_flight = REQUESTS_IN_FLIGHT.labels()
+_event_loop_tasks = EVENT_LOOP_TASKS.labels()
+
+
+def _collect_event_loop_tasks() -> None:
+    try:
+        _event_loop_tasks.set(len(asyncio.all_tasks()))
+    except RuntimeError:
+        pass
+
+
+registry.register_collector(_collect_event_loop_tasks)
+
+
+def register_pool_collector(get_pool: Callable[[], Optional[Pool]]) -> None:
+    """Report the pool returned by ``get_pool`` at scrape time; all zeros while it returns None.
+
+    Register once per process: ``get_pool`` follows engine re-creation, so
+    disposing and rebuilding the engine does not pile up collectors.
+    """
+    size, checked_out, overflow, checked_in = (
+        DB_POOL.labels("size"), DB_POOL.labels("checked_out"), DB_POOL.labels("overflow"), DB_POOL.labels("checked_in")
+    )
+
+    def collect() -> None:
+        pool = get_pool()
+        if pool is None:
+            for gauge in (size, checked_out, overflow, checked_in):
+                gauge.set(0)
+            return
+        if not hasattr(pool, "checkedout"):
+            return
+        size.set(pool.size())
+        checked_out.set(pool.checkedout())
+        overflow.set(pool.overflow())
+        checked_in.set(pool.checkedin())
+
+    registry.register_collector(collect)
+
+
+_RouteRow = Tuple[re.Pattern, Optional[frozenset], str]
+
+
+def _route_table(routes: Iterable) -> List[_RouteRow]:
+    """Flatten the app's routes into ``(path regex, methods, template)`` rows.
+
+    Included routers are expanded through ``effective_route_contexts()`` so the
+    templates carry their full prefix, matching what ``scope["route"]`` reports.
+    """
+    table = []
+    for route in routes:
+        if hasattr(route, "effective_route_contexts"):
+            table.extend(_route_table(route.effective_route_contexts()))
+            continue
+        path = getattr(route, "path", None)
+        if path is None:
+            continue
+        methods = getattr(route, "methods", None)
+        table.append((compile_path(path)[0], frozenset(methods) if methods else None, path))
+    return table
+
+
+class MetricsMiddleware:
+    """Record per-route latency, status and in-flight requests."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._children: Dict[Tuple[str, str, int], Tuple[_HistogramChild, _CounterChild]] = {}
+        self._routes: Optional[List[_RouteRow]] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        _in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _in_flight.dec()
+            route = scope.get("route")
+            template = route.path if route is not None else self._resolve_template(scope)
+            key = (scope["method"], template, status_code)
+            children = self._children.get(key)
+            if children is None:
+                children = self._children[key] = (
+                    REQUEST_LATENCY.labels(scope["method"], template),
+                    REQUESTS_TOTAL.labels(scope["method"], template, _STATUS_CLASSES.get(status_code, "5xx")),
+                )
+            children[0].observe(elapsed)
+            children[1].inc()
+
+    def _resolve_template(self, scope: Scope) -> str:
+        """Route template for requests answered before routing ran.
+
+        Response-cache hits and load-shedding 503s never reach the router, so
+        ``scope["route"]`` is unset; match the path against the app's routes
+        instead of lumping them under ``unmatched``.
+        """
+        if self._routes is None:
+            app = scope.get("app")
+            if app is None:
+                return "unmatched"
+            self._routes = _route_table(app.routes)
+        path, method = scope["path"], scope["method"]
+        fallback = "unmatched"
+        for regex, methods, template in self._routes:
+            if regex.match(path):
+                if methods is None or method in methods:
+                    return template
+                if fallback == "unmatched":
+                    fallback = template
+        return fallback
@@ -1,20 +1,47 @@
 """Ephemeral Redis-backed FYP recommendations using interaction score weights."""
 
 import logging
-from typing import List
+import time
+from dataclasses import dataclass
+from typing import List, Optional
 from uuid import UUID
 
+import numpy as np
 from fastapi import HTTPException, status
 from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+from redis.exceptions import RedisError
+from sqlalchemy import Float, cast, func
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from api.db.models import Posts
-from api.db.redis import redis_client
+from api.circuit_breaker import CircuitOpenError
+from api.db.models import Posts, PostType
+from api.db.redis import fyp_redis_client
+from api.metrics import FYP_REQUESTS
+from api.posts.filters import content_type_clause
+from api.posts.scoring import blend_scores, diversified_order
 
 logger = logging.getLogger(__name__)
 
+_fyp_cold_start = FYP_REQUESTS.labels("cold_start")
+_fyp_personalized = FYP_REQUESTS.labels("personalized")
+_fyp_backfilled = FYP_REQUESTS.labels("personalized_backfill")
+_fyp_popular_fallback = FYP_REQUESTS.labels("popular_fallback")
+_fyp_redis_unavailable = FYP_REQUESTS.labels("redis_unavailable")
+
 INTERACTIONS_TTL = 60 * 60 * 24 * 7
+POPULAR_CACHE_SIZE = 200
+SIMILAR_AUTHOR_SEEDS = 5
+SIMILAR_AUTHORS_PER_SEED = 10
+# Affinity given to the best similar author, relative to the top preferred author.
+SIMILAR_AUTHOR_AFFINITY = 0.5
+CANDIDATE_POOL_SIZE = 1000
+MAX_POSTS_PER_AUTHOR = 2
+POPULAR_CACHE_TTL = 30
+
+# Keyed by content type (None for all types) so each feed tab has its own snapshot.
+_popular_cache: dict[Optional[PostType], tuple[float, list[Posts]]] = {}
 
 SCORE_WEIGHT = {
     "upvotes": 1,
@@ -25,6 +52,14 @@ SCORE_WEIGHT = {
     "profile_view" : 3,
 }
 
+# How get_personalized_posts blends candidate features (see api/posts/scoring.py).
+BLEND_WEIGHT = {
+    "affinity": 1.0,
+    "recency": 0.6,
+    "popularity": 0.4,
+    "engagement": 0.2,
+}
+
 
 def _user_interactions_key(user_id: UUID) -> str:
     return f"user:{user_id}:interactions"
@@ -38,8 +73,51 @@ def _user_preferred_authors_key(user_id: UUID) -> str:
     return f"user:{user_id}:preferred_authors"
 
 
+def _similar_items_key(kind: str, item_id: UUID) -> str:
+    """Similarity list written by ``api.jobs.collaborative_filtering`` (``kind`` is ``authors`` or ``posts``)."""
+    return f"fyp:similar_{kind}:{item_id}"
+
+
 async def get_redis_client() -> Redis:
-    return redis_client
+    return fyp_redis_client
+
+
+@dataclass(slots=True)
+class Interaction:
+    user_id: UUID
+    interaction_type: str
+    author_id: UUID
+    post_id: UUID | None = None
+    mark_viewed: bool = True
+
+
+def _queue_interaction(pipe: Pipeline, interaction: Interaction) -> None:
+    weight = SCORE_WEIGHT.get(interaction.interaction_type, 0.5)
+    interactions_key = _user_interactions_key(interaction.user_id)
+    preferred_authors_key = _user_preferred_authors_key(interaction.user_id)
+
+    if interaction.post_id is not None:
+        pipe.hincrbyfloat(interactions_key, str(interaction.post_id), weight)
+        pipe.zincrby("fyp:ranked_posts", weight, str(interaction.post_id))
+        if interaction.mark_viewed:
+            pipe.sadd(_user_viewed_key(interaction.user_id), str(interaction.post_id))
+    else:
+        pipe.hincrbyfloat(interactions_key, f"author:{interaction.author_id}", weight)
+
+    pipe.zincrby(preferred_authors_key, weight, str(interaction.author_id))
+
+    pipe.expire(interactions_key, INTERACTIONS_TTL)
+    pipe.expire(preferred_authors_key, INTERACTIONS_TTL)
+
+
+async def record_interactions(redis: Redis, interactions: list[Interaction]) -> None:
+    """Apply a batch of interactions in a single Redis round trip."""
+    if not interactions:
+        return
+    async with redis.pipeline(transaction=False) as pipe:
+        for interaction in interactions:
+            _queue_interaction(pipe, interaction)
+        await pipe.execute()
 
 
 async def record_interaction(
@@ -51,26 +129,11 @@ async def record_interaction(
     *,
     mark_viewed: bool = True,
 ):
-    weight = SCORE_WEIGHT.get(interaction_type, 0.5)
-    interactions_key = _user_interactions_key(user_id)
-
-    if post_id is not None:
-        await redis.hincrbyfloat(interactions_key, str(post_id), weight)
-        await redis.zincrby("fyp:ranked_posts", weight, str(post_id))
-        if mark_viewed:
-            await redis.sadd(_user_viewed_key(user_id), str(post_id))
-    else:
-        await redis.hincrbyfloat(interactions_key, f"author:{author_id}", weight)
-
-    await redis.zincrby(
-        _user_preferred_authors_key(user_id),
-        weight,
-        str(author_id),
+    await record_interactions(
+        redis,
+        [Interaction(user_id, interaction_type, author_id, post_id, mark_viewed)],
     )
 
-    await redis.expire(interactions_key, INTERACTIONS_TTL)
-    await redis.expire(_user_preferred_authors_key(user_id), INTERACTIONS_TTL)
-
 
 async def safe_record_interaction(
     user_id: UUID,
@@ -82,30 +145,51 @@ async def safe_record_interaction(
 ) -> None:
     try:
         await record_interaction(
-            redis_client,
+            fyp_redis_client,
             user_id=user_id,
             interaction_type=interaction_type,
             author_id=author_id,
             post_id=post_id,
             mark_viewed=mark_viewed,
         )
+    except CircuitOpenError:
+        pass
     except Exception:
         logger.warning("Failed to record FYP interaction", exc_info=True)
 
 
+async def safe_record_interactions(interactions: list[Interaction]) -> None:
+    try:
+        await record_interactions(fyp_redis_client, interactions)
+    except CircuitOpenError:
+        pass
+    except Exception:
+        logger.warning("Failed to record FYP interactions", exc_info=True)
+
+
 async def get_fyp_recommendations(
     redis: Redis,
     session: AsyncSession,
     user_id: UUID,
     limit: int = 20,
     offset: int = 0,
+    content_type: Optional[PostType] = None,
 ) -> List[Posts]:
     try:
-        has_interactions = await redis.exists(_user_interactions_key(user_id))
-
-        if not has_interactions:
-            return await get_popular_posts(session, limit, offset)
-        return await get_personalized_posts(redis, session, user_id, limit, offset)
+        try:
+            has_interactions = await redis.exists(_user_interactions_key(user_id))
+
+            if not has_interactions:
+                _fyp_cold_start.inc()
+                return await get_cached_popular_posts(session, limit, offset, content_type)
+            return await get_personalized_posts(redis, session, user_id, limit, offset, content_type)
+        except RedisError as e:
+            # Degrade to the locally cached popular list rather than failing
+            # (or waiting on) every FYP request while Redis is unavailable.
+            if not isinstance(e, CircuitOpenError):
+                logger.warning("Redis unavailable; serving FYP from popular posts", exc_info=True)
+            _fyp_redis_unavailable.inc()
+            return await get_cached_popular_posts(session, limit, offset, content_type)
 
     except HTTPException:
         raise
@@ -117,17 +201,37 @@ async def get_fyp_recommendations(
 
 
 async def get_popular_posts(
-    session: AsyncSession, limit: int, offset: int = 0
+    session: AsyncSession, limit: int, offset: int = 0, content_type: Optional[PostType] = None
 ) -> list[Posts]:
-    result = await session.execute(
+    query = (
         select(Posts)
         .order_by(Posts.upvote_count.desc())
         .offset(offset)
         .limit(limit)
     )
+    if content_type is not None:
+        query = query.where(content_type_clause(content_type))
+    result = await session.execute(query)
     return list(result.scalars().all())
 
 
+async def get_cached_popular_posts(
+    session: AsyncSession, limit: int, offset: int = 0, content_type: Optional[PostType] = None
+) -> list[Posts]:
+    """``get_popular_posts`` served from a per-process, per-type snapshot of the top posts."""
+    if offset + limit > POPULAR_CACHE_SIZE:
+        return await get_popular_posts(session, limit, offset, content_type)
+
+    now = time.monotonic()
+    cached = _popular_cache.get(content_type)
+    if cached is None or cached[0] <= now:
+        cached = _popular_cache[content_type] = (
+            now + POPULAR_CACHE_TTL,
+            await get_popular_posts(session, POPULAR_CACHE_SIZE, 0, content_type),
+        )
+    return cached[1][offset : offset + limit]
+
+
 async def _fetch_posts_by_ids(
     session: AsyncSession,
     post_ids: list[UUID],
@@ -135,6 +239,7 @@ async def _fetch_posts_by_ids(
     limit: int,
     offset: int,
     rank_order: list[UUID] | None = None,
+    content_type: Optional[PostType] = None,
 ) -> list[Posts]:
     if not post_ids:
         return []
@@ -143,7 +248,10 @@ async def _fetch_posts_by_ids(
     if not candidate_ids:
         return []
 
-    result = await session.execute(select(Posts).where(Posts.id.in_(candidate_ids)))
+    query = select(Posts).where(Posts.id.in_(candidate_ids))
+    if content_type is not None:
+        query = query.where(content_type_clause(content_type))
+    result = await session.execute(query)
     posts_by_id = {post.id: post for post in result.scalars().all()}
 
     if rank_order:
@@ -154,57 +262,142 @@ async def _fetch_posts_by_ids(
     return ordered[offset : offset + limit]
 
 
+async def get_similar_authors(
+    redis: Redis, seed_author_ids: list[UUID], exclude: set[UUID], limit: int
+) -> list[tuple[UUID, float]]:
+    """Authors similar to ``seed_author_ids`` (most preferred first), best combined score first."""
+    if not seed_author_ids:
+        return []
+    async with redis.pipeline(transaction=False) as pipe:
+        for author_id in seed_author_ids:
+            pipe.zrevrange(_similar_items_key("authors", author_id), 0, SIMILAR_AUTHORS_PER_SEED - 1, withscores=True)
+        lists = await pipe.execute()
+
+    scores: dict[str, float] = {}
+    for rank, members in enumerate(lists):
+        for member, similarity in members:
+            scores[member] = scores.get(member, 0.0) + similarity / (rank + 1)
+
+    similar = []
+    for member in sorted(scores, key=scores.__getitem__, reverse=True):
+        author_id = UUID(member)
+        if author_id not in exclude:
+            similar.append((author_id, scores[member]))
+            if len(similar) == limit:
+                break
+    return similar
+
+
+# Counters are coalesced and created_at is read as epoch seconds in SQL, so the
+# rows transpose straight into NumPy columns.
+_CANDIDATE_COLUMNS = (
+    Posts.id,
+    Posts.author_id,
+    cast(func.extract("epoch", Posts.created_at), Float).label("created_at"),
+    func.coalesce(Posts.upvote_count, 0).label("upvote_count"),
+    func.coalesce(Posts.downvote_count, 0).label("downvote_count"),
+    func.coalesce(Posts.comment_count, 0).label("comment_count"),
+)
+
+
+def rank_candidates(rows: list, author_affinity: dict[UUID, float], now: float) -> list[UUID]:
+    """Order candidate rows (``_CANDIDATE_COLUMNS``) by blended score with the per-author cap."""
+    post_ids, author_ids, created_at, upvotes, downvotes, comments = zip(*rows)
+    authors = {author_id: code for code, author_id in enumerate(dict.fromkeys(author_ids))}
+    codes = np.array([authors[author_id] for author_id in author_ids], dtype=np.int64)
+    affinity = np.array([author_affinity.get(author_id, 0.0) for author_id in authors])[codes]
+
+    scores = blend_scores(
+        affinity,
+        np.array(created_at, dtype=np.float64),
+        np.array(upvotes, dtype=np.float64),
+        np.array(downvotes, dtype=np.float64),
+        np.array(comments, dtype=np.float64),
+        now,
+        BLEND_WEIGHT,
+    )
+    return [post_ids[i] for i in diversified_order(scores, codes, MAX_POSTS_PER_AUTHOR)]
+
+
+def candidate_query(author_ids: list[UUID], limit: int, content_type: Optional[PostType] = None):
+    """The hottest posts by ``author_ids``, served by ``ix_posts_author_id_hot_score``."""
+    query = (
+        select(*_CANDIDATE_COLUMNS)
+        .where(Posts.author_id.in_(author_ids))
+        .order_by(Posts.hot_score.desc())
+        .limit(limit)
+    )
+    if content_type is not None:
+        query = query.where(content_type_clause(content_type))
+    return query
+
+
+async def _drop_seen(redis: Redis, user_id: UUID, items: list, key=lambda item: item) -> list:
+    """``items`` minus the posts the user has viewed, checked with one ``SMISMEMBER``.
+
+    The viewed set can hold hundreds of thousands of ids, so it is never
+    loaded or sent to Postgres; only the bounded candidate list is looked up.
+    """
+    if not items:
+        return items
+    viewed = await redis.smismember(_user_viewed_key(user_id), [str(key(item)) for item in items])
+    return [item for item, was_viewed in zip(items, viewed) if not was_viewed]
+
+
 async def get_personalized_posts(
     redis: Redis,
     session: AsyncSession,
     user_id: UUID,
     limit: int,
     offset: int = 0,
+    content_type: Optional[PostType] = None,
 ) -> list[Posts]:
-    seen = {UUID(pid) for pid in await redis.smembers(_user_viewed_key(user_id))}
     candidate_count = offset + limit
-    posts: list[Posts] = []
-    collected_ids: set[UUID] = set()
 
-    preferred_author_ids = [
-        UUID(aid)
-        for aid in await redis.zrevrange(
-            _user_preferred_authors_key(user_id), 0, candidate_count
-        )
-    ]
-
-    if preferred_author_ids:
-        query = (
-            select(Posts)
-            .where(Posts.author_id.in_(preferred_author_ids))
-            .order_by(Posts.upvote_count.desc())
-            .limit(candidate_count)
+    preferred = await redis.zrevrange(
+        _user_preferred_authors_key(user_id), 0, candidate_count, withscores=True
+    )
+    peak = max((abs(score) for _, score in preferred), default=0.0) or 1.0
+    author_affinity = {UUID(aid): score / peak for aid, score in preferred}
+
+    rows: list = []
+    if author_affinity:
+        # Widen the pool with authors that users with similar taste interact with.
+        similar = await get_similar_authors(
+            redis,
+            list(author_affinity)[:SIMILAR_AUTHOR_SEEDS],
+            set(author_affinity),
+            SIMILAR_AUTHOR_SEEDS * SIMILAR_AUTHORS_PER_SEED,
         )
-        if seen:
-            query = query.where(Posts.id.notin_(seen))
-        result = await session.execute(query)
-        for post in result.scalars().all():
-            if post.id not in collected_ids:
-                posts.append(post)
-                collected_ids.add(post.id)
-
-    if len(posts) < candidate_count:
-        ranked_post_ids = [
-            UUID(pid)
-            for pid in await redis.zrevrange("fyp:ranked_posts", 0, candidate_count * 2)
-        ]
-        exclude = seen | collected_ids
-        backfill = await _fetch_posts_by_ids(
-            session,
-            ranked_post_ids,
-            exclude,
-            candidate_count - len(posts),
-            0,
-            rank_order=ranked_post_ids,
+        top_similarity = similar[0][1] if similar and similar[0][1] > 0 else 1.0
+        for author_id, similarity in similar:
+            author_affinity[author_id] = SIMILAR_AUTHOR_AFFINITY * similarity / top_similarity
+
+        query = candidate_query(list(author_affinity), max(CANDIDATE_POOL_SIZE, candidate_count), content_type)
+        rows = await _drop_seen(redis, user_id, list((await session.execute(query)).all()), key=lambda row: row.id)
+
+    backfilled = len(rows) < candidate_count
+    if backfilled:
+        exclude = {row.id for row in rows}
+        ranked_post_ids = await _drop_seen(
+            redis,
+            user_id,
+            [
+                post_id
+                for post_id in map(UUID, await redis.zrevrange("fyp:ranked_posts", 0, candidate_count * 2))
+                if post_id not in exclude
+            ],
         )
-        posts.extend(backfill)
-
-    if not posts:
-        return await get_popular_posts(session, limit, offset)
-
-    return posts[offset : offset + limit]
+        if ranked_post_ids:
+            query = select(*_CANDIDATE_COLUMNS).where(Posts.id.in_(ranked_post_ids))
+            if content_type is not None:
+                query = query.where(content_type_clause(content_type))
+            rows.extend((await session.execute(query)).all())
+
+    if not rows:
+        _fyp_popular_fallback.inc()
+        return await get_cached_popular_posts(session, limit, offset, content_type)
+
+    page_ids = rank_candidates(rows, author_affinity, time.time())[offset : offset + limit]
+    (_fyp_backfilled if backfilled else _fyp_personalized).inc()
+    return await _fetch_posts_by_ids(session, page_ids, set(), limit, 0, rank_order=page_ids)
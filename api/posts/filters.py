@@ -0,0 +1,17 @@
+"""Shared WHERE clauses for the post feeds."""
+
+from sqlalchemy import bindparam
+
+from api.db.models import Posts, PostType
+
+
+def content_type_clause(content_type: PostType):
+    """``content_type = '<TYPE>'`` rendered inline rather than as a bind parameter.
+
+    Postgres only uses a partial index whose predicate it can prove at plan
+    time. A bound ``$1`` turns into a generic plan after a few executions of the
+    prepared statement, and a generic plan cannot use the per-type indexes.
+    """
+    return Posts.content_type == bindparam(
+        "content_type", content_type, type_=Posts.__table__.c.content_type.type, unique=True, literal_execute=True
+    )
@@ -0,0 +1,46 @@
+"""Hot ranking for the public feed.
+
+The score is ``sign(s) * log10(max(|s|, 1)) + (created_at - HOT_EPOCH) / HOT_DECAY_SECONDS``
+where ``s`` is the net vote count plus weighted comments. Age enters as a
+constant offset that grows with creation time, so a post's score only changes
+when its counters do and never has to be recomputed as time passes. Every
+``HOT_DECAY_SECONDS`` of recency is worth one order of magnitude of votes.
+
+``hot_score`` is used by the ORM write paths and ``hot_score_sql`` by
+set-based updates and the backfill; both must stay in step.
+"""
+
+import math
+from datetime import datetime
+
+from sqlalchemy import func
+
+HOT_EPOCH = 1735689600  # 2025-01-01T00:00:00Z
+HOT_DECAY_SECONDS = 45000
+COMMENT_WEIGHT = 0.5
+
+
+def hot_score(upvotes: int | None, downvotes: int | None, comments: int | None, created_at: datetime) -> float:
+    # Naive datetimes come from ``datetime.now`` defaults and are local time,
+    # which is also how ``timestamp()`` reads them.
+    score = (upvotes or 0) - (downvotes or 0) + COMMENT_WEIGHT * (comments or 0)
+    order = math.log10(max(abs(score), 1))
+    sign = (score > 0) - (score < 0)
+    return sign * order + (created_at.timestamp() - HOT_EPOCH) / HOT_DECAY_SECONDS
+
+
+def update_hot_score(post) -> None:
+    """Recompute ``post.hot_score`` after its counters changed in the session."""
+    post.hot_score = hot_score(post.upvote_count, post.downvote_count, post.comment_count, post.created_at)
+
+
+def hot_score_sql(upvotes, downvotes, comments, created_at):
+    score = (
+        func.coalesce(upvotes, 0)
+        - func.coalesce(downvotes, 0)
+        + COMMENT_WEIGHT * func.coalesce(comments, 0)
+    )
+    return (
+        func.sign(score) * func.log(func.greatest(func.abs(score), 1))
+        + (func.extract("epoch", created_at) - HOT_EPOCH) / HOT_DECAY_SECONDS
+    )
@@ -1,13 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from fastapi.responses import JSONResponse
 from api.posts.schemas import PostCreate, PostEdit
 from api.posts.service import PostService
 from api.posts.algorithm import get_fyp_recommendations
 from api.db.main import get_session
-from api.db.redis import redis_client
+from api.db.models import PostType
+from api.db.redis import fyp_redis_client
 from sqlmodel.ext.asyncio.session import AsyncSession
 from api.auth.dependencies import AccessTokenBearer
+from api.votes.service import VoteService
 from logging import Logger
+from typing import Literal, Optional
 from uuid import UUID
 import logging
 
@@ -15,6 +18,20 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/posts", tags=["posts"])
 post_service = PostService()
+vote_service = VoteService()
+
+def wants_my_vote(include: Optional[str]) -> bool:
+    return include is not None and "my_vote" in include.split(",")
+
+async def my_vote_token(request: Request, include: Optional[str] = None) -> Optional[dict]:
+    """Token details only when ``include=my_vote`` asks for them.
+
+    Anonymous feed reads never decode the token or hit the blacklist, so a
+    stale token does not turn a public read into a 403.
+    """
+    if not wants_my_vote(include):
+        return None
+    return await AccessTokenBearer(auto_error=False)(request)
 
 @router.post("/create")
 async def create_post(post_data: PostCreate, session: AsyncSession = Depends(get_session), token_details: dict = Depends(AccessTokenBearer())):
@@ -36,7 +53,7 @@ async def get_all_posts(session: AsyncSession = Depends(get_session), token_deta
     return posts
 
 @router.get("/following-feed")
-async def get_following_feed(limit: int = 20, offset: int = 0, session: AsyncSession = Depends(get_session), token_details: dict = Depends(AccessTokenBearer())):
+async def get_following_feed(limit: int = 20, offset: int = 0, content_type: Optional[PostType] = None, include: Optional[str] = None, session: AsyncSession = Depends(get_session), token_details: dict = Depends(AccessTokenBearer())):
     user_id_str = token_details["user"]["user_id"]
     if not user_id_str:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
@@ -46,18 +63,33 @@ async def get_following_feed(limit: int = 20, offset: int = 0, session: AsyncSes
     except (ValueError, TypeError):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid user ID format")
     
-    posts = await post_service.following_feed(user_id, session, limit, offset)
+    posts = await post_service.following_feed(user_id, session, limit, offset, content_type)
+    if wants_my_vote(include):
+        return await vote_service.attach_my_votes(user_id, posts, session)
     return posts
 
 @router.get("/feed")
-async def get_feed(limit: int = 20, offset: int = 0, session: AsyncSession = Depends(get_session)):
-    posts = await post_service.feed(session, limit, offset)
+async def get_feed(limit: int = 20, offset: int = 0, sort: Literal["new", "hot"] = "new", cursor: Optional[str] = None, content_type: Optional[PostType] = None, include: Optional[str] = None, session: AsyncSession = Depends(get_session), token_details: Optional[dict] = Depends(my_vote_token)):
+    if wants_my_vote(include) and not token_details:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required for include=my_vote")
+
+    if sort == "hot":
+        page = await post_service.hot_feed(session, limit, cursor, content_type)
+        if wants_my_vote(include):
+            page["items"] = await vote_service.attach_my_votes(UUID(token_details["user"]["user_id"]), page["items"], session)
+        return page
+
+    posts = await post_service.feed(session, limit, offset, content_type)
+    if wants_my_vote(include):
+        return await vote_service.attach_my_votes(UUID(token_details["user"]["user_id"]), posts, session)
     return posts
 
 @router.get("/fyp")
 async def get_fyp_feed(
     limit: int = 20,
     offset: int = 0,
+    content_type: Optional[PostType] = None,
+    include: Optional[str] = None,
     session: AsyncSession = Depends(get_session),
     token_details: dict = Depends(AccessTokenBearer()),
 ):
@@ -71,14 +103,21 @@ async def get_fyp_feed(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid user ID format")
 
     posts = await get_fyp_recommendations(
-        redis=redis_client,
+        redis=fyp_redis_client,
         session=session,
         user_id=user_id,
         limit=limit,
         offset=offset,
+        content_type=content_type,
     )
+    if wants_my_vote(include):
+        return await vote_service.attach_my_votes(user_id, posts, session)
     return posts
 
+@router.get("/{post_id}/similar")
+async def get_similar_posts(post_id: str, limit: int = Query(default=10, ge=1, le=50), session: AsyncSession = Depends(get_session), token_details: dict = Depends(AccessTokenBearer())):
+    return await post_service.similar_posts(post_id, session, limit)
+
 @router.get("/{post_id}")
 async def get_post(post_id: str, session: AsyncSession = Depends(get_session), token_details: dict = Depends(AccessTokenBearer())):
     post = await post_service.get_post_by_id(post_id, session)
@@ -1,13 +1,20 @@
-from typing import List
+import asyncio
+from typing import List, Optional
 from uuid import UUID
 
 from fastapi import HTTPException, status
+from sqlalchemy import tuple_
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from api.db.models import Posts
+from api.cache import safe_invalidate
+from api.db.models import Posts, PostType
+from api.db.pagination import decode_cursor, encode_cursor
 from api.follows.service import FollowService
+from api.posts.filters import content_type_clause
+from api.posts.ranking import update_hot_score
 from api.posts.schemas import PostCreate, PostEdit
+from api.posts.similarity import get_similar_posts_index, safe_index_post
 
 class PostService:
     
@@ -16,9 +23,12 @@ class PostService:
     async def create_post(self, post_data: PostCreate, session: AsyncSession) -> Posts:
         try:
             new_post = Posts(**post_data.model_dump())
+            update_hot_score(new_post)
             session.add(new_post)
             await session.commit()
             await session.refresh(new_post)
+            await safe_invalidate("feed")
+            await asyncio.to_thread(safe_index_post, new_post.id, new_post.title, new_post.content)
             return new_post
         except Exception as e:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error creating post: {e}")
@@ -43,6 +53,7 @@ class PostService:
             if post:
                 await session.delete(post)
                 await session.commit()
+                await safe_invalidate("feed")
         except HTTPException:
             raise
         except Exception as e:
@@ -66,6 +77,9 @@ class PostService:
                         setattr(post, key, value)
                 await session.commit()
                 await session.refresh(post)
+                await safe_invalidate("feed")
+                if post_data.title is not None or post_data.content is not None:
+                    await asyncio.to_thread(safe_index_post, post.id, post.title, post.content)
                 return post
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
         
@@ -73,36 +87,110 @@ class PostService:
             await session.rollback()
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error editing post: {e}")
         
-    async def following_feed(self, user_id: UUID, session: AsyncSession, limit: int = 20, offset: int = 0) -> List[Posts]:
+    async def following_feed(
+        self, user_id: UUID, session: AsyncSession, limit: int = 20, offset: int = 0, content_type: Optional[PostType] = None
+    ) -> List[Posts]:
         try:
-            followers = await self.follow_service.get_following(user_id, session)
-            following_ids = [following.id for following in followers]
+            following_ids = await self.follow_service.get_following_ids(user_id, session)
             
-            result = await session.execute(
+            query = (
                 select(Posts)
                 .where(Posts.author_id.in_(following_ids))
                 .order_by(Posts.created_at.desc())
                 .limit(limit)
                 .offset(offset) 
             )
+            if content_type is not None:
+                query = query.where(content_type_clause(content_type))
+            result = await session.execute(query)
             posts = result.scalars().all()
             
-            return list(posts) if posts else await self.feed(session, limit, offset)
+            return list(posts) if posts else await self.feed(session, limit, offset, content_type)
 
         except Exception as e:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error getting following feed: {e}")
         
-    async def feed(self, session: AsyncSession, limit: int = 20, offset: int = 0) -> List[Posts]:
+    async def feed(
+        self, session: AsyncSession, limit: int = 20, offset: int = 0, content_type: Optional[PostType] = None
+    ) -> List[Posts]:
         try:
-            result = await session.execute(
+            query = (
                 select(Posts)
                 .order_by(Posts.created_at.desc())
                 .order_by(Posts.upvote_count.desc())
                 .limit(limit)
                 .offset(offset)
             )
+            if content_type is not None:
+                query = query.where(content_type_clause(content_type))
+            result = await session.execute(query)
             posts = result.scalars().all()
             return list(posts)
         
         except Exception as e:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error getting feed: {e}")
+
+    async def hot_feed(
+        self, session: AsyncSession, limit: int = 20, cursor: Optional[str] = None, content_type: Optional[PostType] = None
+    ) -> dict:
+        """Page through posts by stored ``hot_score``, served by ``ix_posts_hot_score_id`` (or its per-type partial twin).
+
+        Scores move as votes arrive, so a post can be skipped or repeated
+        across pages; clients de-duplicate by id.
+        """
+        try:
+            query = select(Posts).order_by(Posts.hot_score.desc(), Posts.id.desc()).limit(limit + 1)
+            if content_type is not None:
+                query = query.where(content_type_clause(content_type))
+            if cursor:
+                score, post_id = decode_cursor(cursor, 2)
+                try:
+                    query = query.where(tuple_(Posts.hot_score, Posts.id) < (float(score), UUID(post_id)))
+                except ValueError:
+                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+            result = await session.execute(query)
+            posts = list(result.scalars().all())
+            next_cursor = None
+            if len(posts) > limit:
+                posts = posts[:limit]
+                next_cursor = encode_cursor(posts[-1].hot_score, posts[-1].id)
+            return {"items": posts, "next_cursor": next_cursor}
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error getting hot feed: {e}")
+
+    async def similar_posts(self, post_id: str, session: AsyncSession, limit: int = 10) -> List[dict]:
+        """Posts whose text is most cosine-similar to ``post_id``'s, served from the memory-mapped index."""
+        try:
+            index = get_similar_posts_index()
+            if index is None:
+                raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Similar posts index is not built yet")
+            try:
+                target = UUID(post_id)
+            except ValueError:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid post ID format")
+
+            vector = index.lookup(target)
+            if vector is None:
+                post = await self.get_post_by_id(post_id, session)
+                vector = index.vector(post.title, post.content)
+
+            # Over-fetch a little: deleted posts stay in the index until the next build.
+            matches = index.query(vector, limit + limit // 2 + 1, exclude=target)
+            if not matches:
+                return []
+            result = await session.execute(select(Posts).where(Posts.id.in_([match_id for match_id, _ in matches])))
+            posts = {post.id: post for post in result.scalars().all()}
+            return [
+                {**posts[match_id].model_dump(), "similarity": round(score, 4)}
+                for match_id, score in matches
+                if match_id in posts
+            ][:limit]
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error getting similar posts: {e}")
@@ -0,0 +1,258 @@
+"""Content-based "more like this" for posts.
+
+Each post becomes a ``dim``-dimensional float32 vector. The text is hashed
+into a bag of words weighted by TF-IDF: sublinear tf, title tokens counted
+``TITLE_WEIGHT`` times, and IDF over ``2**FEATURE_BITS`` hashed features. The
+words are folded into the vector with signed feature hashing, which is a
+sparse random projection. ``crc32`` is used because Python's ``hash`` is
+salted per process, and every worker must produce the same vector for the
+same text.
+
+``api.jobs.similar_posts_index`` builds an index directory and points the
+``current`` symlink at it. The directory holds:
+
+- ``vectors.f32``: N x dim float32 rows sorted by post id, memory-mapped and
+  so shared by all workers through the page cache.
+- ``ids.bin``: the matching 16-byte ids, so a post's row is one binary search.
+- ``lsh_sorted`` / ``lsh_order``: per-table random-hyperplane signatures in
+  sorted order and the rows they belong to. A query probes its own bucket and all
+  buckets one bit away in every table, then ranks the candidate rows by exact
+  cosine.
+- ``delta.bin``: fixed-size records appended by ``create_post`` and ``edit_post`` under
+  ``flock`` and scanned brute-force, until the next build folds them into the
+  base. The newest record for a post supersedes older ones and its base row.
+"""
+
+import fcntl
+import json
+import logging
+import os
+import re
+import threading
+import zlib
+from typing import Optional
+from uuid import UUID
+
+import numpy as np
+
+from api.config import Config
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+FEATURE_BITS = 20
+TITLE_WEIGHT = 2
+
+META_FILE = "meta.json"
+VECTORS_FILE = "vectors.f32"
+IDS_FILE = "ids.bin"
+IDF_FILE = "idf.f32"
+PLANES_FILE = "planes.f32"
+SORTED_SIGNATURES_FILE = "lsh_sorted.u32"
+ORDER_FILE = "lsh_order.i64"
+DELTA_FILE = "delta.bin"
+CURRENT_LINK = "current"
+
+
+def token_hashes(title: str, content: str) -> np.ndarray:
+    tokens = TOKEN_RE.findall(title.lower()) * TITLE_WEIGHT + TOKEN_RE.findall(content.lower())
+    return np.fromiter((zlib.crc32(token.encode()) for token in tokens), np.uint32, len(tokens))
+
+
+def feature_ids(hashes: np.ndarray) -> np.ndarray:
+    """Distinct IDF features present in a document (for document frequencies)."""
+    return np.unique(hashes & ((1 << FEATURE_BITS) - 1))
+
+
+def post_vector(title: str, content: str, idf: np.ndarray, dim: int) -> np.ndarray:
+    """L2-normalised TF-IDF vector folded into ``dim`` signed hash dimensions."""
+    hashes, counts = np.unique(token_hashes(title, content), return_counts=True)
+    vector = np.zeros(dim, dtype=np.float32)
+    if hashes.size == 0:
+        return vector
+    weights = (1.0 + np.log(counts)) * idf[hashes & ((1 << FEATURE_BITS) - 1)]
+    signs = np.where(hashes >> 31, -1.0, 1.0)
+    dims = (hashes >> FEATURE_BITS) % dim
+    vector += np.bincount(dims, weights=weights * signs, minlength=dim).astype(np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+def lsh_signatures(vectors: np.ndarray, planes: np.ndarray) -> np.ndarray:
+    """Pack the sign bits of ``vectors`` against each table's hyperplanes: (tables, N) uint32."""
+    bits = planes.shape[1]
+    weights = (1 << np.arange(bits, dtype=np.uint32)).astype(np.uint32)
+    projected = np.einsum("nd,tbd->tnb", vectors, planes) > 0
+    return (projected.astype(np.uint32) * weights).sum(axis=2, dtype=np.uint32)
+
+
+def delta_dtype(dim: int) -> np.dtype:
+    return np.dtype([("id", "V16"), ("vector", "<f4", (dim,))])
+
+
+class SimilarPostsIndex:
+    """Read-only view of one built index version plus its append-only delta."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, META_FILE)) as fh:
+            self.meta = json.load(fh)
+        self.dim = self.meta["dim"]
+        self.count = self.meta["count"]
+        self.tables = self.meta["tables"]
+        self.bits = self.meta["bits"]
+        self.idf = np.fromfile(os.path.join(path, IDF_FILE), dtype=np.float32)
+        self.planes = np.fromfile(os.path.join(path, PLANES_FILE), dtype=np.float32).reshape(self.tables, self.bits, self.dim)
+        self.vectors = self._memmap(VECTORS_FILE, np.float32, (self.count, self.dim))
+        self.ids = self._memmap(IDS_FILE, "S16", (self.count,))
+        self.sorted_signatures = self._memmap(SORTED_SIGNATURES_FILE, np.uint32, (self.tables, self.count))
+        self.order = self._memmap(ORDER_FILE, np.int64, (self.tables, self.count))
+        self._probe_masks = np.concatenate(([0], 1 << np.arange(self.bits))).astype(np.uint32)
+        self._delta_path = os.path.join(path, DELTA_FILE)
+        self._delta_dtype = delta_dtype(self.dim)
+        self._delta_size = -1
+        self._delta = np.zeros(0, dtype=self._delta_dtype)
+
+    def _memmap(self, name: str, dtype, shape) -> np.ndarray:
+        if not self.count:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(os.path.join(self.path, name), dtype=dtype, mode="r", shape=shape)
+
+    def vector(self, title: str, content: str) -> np.ndarray:
+        return post_vector(title, content, self.idf, self.dim)
+
+    def _refresh_delta(self) -> np.ndarray:
+        try:
+            size = os.path.getsize(self._delta_path)
+        except FileNotFoundError:
+            size = 0
+        if size != self._delta_size:
+            records = size // self._delta_dtype.itemsize
+            delta = (
+                np.memmap(self._delta_path, dtype=self._delta_dtype, mode="r", shape=(records,))
+                if records
+                else np.zeros(0, dtype=self._delta_dtype)
+            )
+            if records > 1:
+                # An edit appends a new record; only the newest one per post counts.
+                _, last = np.unique(delta["id"].view("S16")[::-1], return_index=True)
+                if last.size < records:
+                    delta = delta[np.sort(records - 1 - last)]
+            self._delta = delta
+            self._delta_size = size
+        return self._delta
+
+    def is_current(self) -> bool:
+        return os.path.realpath(os.path.join(os.path.dirname(self.path), CURRENT_LINK)) == self.path
+
+    def lookup(self, post_id: UUID) -> Optional[np.ndarray]:
+        """Stored vector for ``post_id``, preferring the newest delta record (edits append too)."""
+        key = post_id.bytes
+        delta = self._refresh_delta()
+        matches = np.flatnonzero(delta["id"] == np.void(key))
+        if matches.size:
+            return np.asarray(delta["vector"][matches[-1]])
+        if self.count:
+            # "S16" strips trailing NUL bytes on read, so compare through numpy.
+            row = int(np.searchsorted(self.ids, key))
+            if row < self.count and self.ids[row : row + 1] == np.bytes_(key):
+                return np.asarray(self.vectors[row])
+        return None
+
+    def append(self, post_id: UUID, vector: np.ndarray) -> bool:
+        """Append a delta record; False if a rebuild has replaced this version meanwhile."""
+        record = np.zeros(1, dtype=self._delta_dtype)
+        record["id"] = np.void(post_id.bytes)
+        record["vector"] = vector
+        with open(self._delta_path, "ab") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                # The build job holds this lock from copying the delta until
+                # ``current`` is repointed, so the check is final once we hold it.
+                if not self.is_current():
+                    return False
+                fh.write(record.tobytes())
+                return True
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _candidate_rows(self, query: np.ndarray) -> np.ndarray:
+        signatures = lsh_signatures(query[None, :], self.planes)[:, 0]
+        found = []
+        for table in range(self.tables):
+            probes = signatures[table] ^ self._probe_masks
+            starts = np.searchsorted(self.sorted_signatures[table], probes, side="left")
+            ends = np.searchsorted(self.sorted_signatures[table], probes, side="right")
+            found.extend(self.order[table][start:end] for start, end in zip(starts, ends) if end > start)
+        return np.unique(np.concatenate(found)) if found else np.zeros(0, dtype=np.int64)
+
+    def query(self, vector: np.ndarray, limit: int, exclude: Optional[UUID] = None) -> list[tuple[UUID, float]]:
+        """Up to ``limit`` most cosine-similar posts, best first."""
+        ids, scores = [], []
+        delta = self._refresh_delta()
+        delta_ids = delta["id"].view("S16")
+        rows = self._candidate_rows(vector)
+        if rows.size:
+            base_ids = self.ids[rows]
+            base_scores = np.asarray(self.vectors[rows]) @ vector
+            if delta.size:
+                # Edited posts are ranked by their delta record, not the stale base row.
+                base_scores[np.isin(base_ids, delta_ids)] = -np.inf
+            ids.append(base_ids)
+            scores.append(base_scores)
+        if delta.size:
+            ids.append(delta_ids)
+            scores.append(np.asarray(delta["vector"]) @ vector)
+        if not ids:
+            return []
+
+        ids = np.concatenate(ids)
+        scores = np.concatenate(scores)
+        if exclude is not None:
+            scores[ids == exclude.bytes] = -np.inf
+        top = min(limit, scores.size)
+        best = np.argpartition(-scores, top - 1)[:top]
+        best = best[np.argsort(-scores[best])]
+        results, returned = [], set()
+        for i in best:
+            if np.isfinite(scores[i]) and scores[i] > 0 and ids[i] not in returned:
+                returned.add(ids[i])
+                results.append((UUID(bytes=bytes(ids[i]).ljust(16, b"\0")), float(scores[i])))
+        return results
+
+
+_index: Optional[SimilarPostsIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_similar_posts_index() -> Optional[SimilarPostsIndex]:
+    """The current index version, reloaded when the job repoints ``current``; None if never built."""
+    global _index
+    current = os.path.join(Config.SIMILAR_POSTS_INDEX_DIR, CURRENT_LINK)
+    try:
+        path = os.path.realpath(current, strict=True)
+    except OSError:
+        return None
+    if _index is None or _index.path != path:
+        with _index_lock:
+            if _index is None or _index.path != path:
+                _index = SimilarPostsIndex(path)
+    return _index
+
+
+def index_post(post_id: UUID, title: str, content: str) -> None:
+    # A rebuild that lands between loading the index and appending makes the
+    # append refuse; retry against the version it published.
+    for _ in range(3):
+        index = get_similar_posts_index()
+        if index is None or index.append(post_id, index.vector(title, content)):
+            return
+    raise RuntimeError("similar-posts index kept changing while appending")
+
+
+def safe_index_post(post_id: UUID, title: str, content: str) -> None:
+    """Best-effort; a missing or unwritable index must not fail post creation."""
+    try:
+        index_post(post_id, title, content)
+    except Exception:
+        logger.warning("Failed to add post to the similar-posts index", exc_info=True)
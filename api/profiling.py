@@ -0,0 +1,120 @@
+"""Opt-in production profiling for the event-loop thread.
+
+``profile_event_loop`` samples the loop thread's Python stack from a helper
+thread and returns the samples in collapsed-stack format, which is the input
+format of ``flamegraph.pl`` and speedscope. ``LoopLagMonitor`` keeps a
+heartbeat on the loop. When one callback blocks it for longer than the
+threshold, a watchdog thread logs the loop thread's current stack. That stack
+points straight at the blocking code, e.g. a synchronous bcrypt call.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from types import FrameType
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_STACK_DEPTH = 128
+
+
+def _collapse(frame: Optional[FrameType]) -> str:
+    parts = []
+    while frame is not None and len(parts) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        parts.append(f"{code.co_qualname} ({code.co_filename}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+
+class StackSampler:
+    """Periodically sample one thread's stack and count identical stacks."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+
+    def run(self, duration: float) -> None:
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.samples[_collapse(frame)] += 1
+            del frame
+            time.sleep(self.interval)
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+_profile_lock = asyncio.Lock()
+
+
+def profile_in_progress() -> bool:
+    return _profile_lock.locked()
+
+
+async def profile_event_loop(duration: float, interval: float) -> str:
+    """Sample the calling event loop's thread for ``duration`` seconds."""
+    async with _profile_lock:
+        sampler = StackSampler(threading.get_ident(), interval)
+        await asyncio.to_thread(sampler.run, duration)
+        return sampler.collapsed()
+
+
+class LoopLagMonitor:
+    """Log the loop thread's stack whenever the event loop stalls beyond ``threshold`` seconds."""
+
+    def __init__(self, threshold: float, interval: float = 0.05):
+        self.threshold = threshold
+        self.interval = interval
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = 0.0
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._beat()
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-monitor", daemon=True)
+        self._watchdog.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._handle is not None:
+            self._handle.cancel()
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+
+    def _beat(self) -> None:
+        self._last_beat = time.monotonic()
+        self._handle = self._loop.call_later(self.interval, self._beat)
+
+    def _watch(self) -> None:
+        reported_beat = None
+        while not self._stop.wait(self.interval):
+            last_beat = self._last_beat
+            lag = time.monotonic() - last_beat - self.interval
+            if lag < self.threshold or reported_beat == last_beat:
+                continue
+            reported_beat = last_beat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "<unavailable>"
+            del frame
+            logger.warning(
+                "Event loop blocked for %.0f ms; loop thread stack:\n%s",
+                lag * 1000,
+                stack,
+                extra={"loop_lag_ms": round(lag * 1000, 1)},
+            )
@@ -0,0 +1,307 @@
+"""Distributed token-bucket rate limiting.
+
+Each check runs one Lua script against the shared ``redis_client``. The script
+refills the bucket from Redis' own clock, debits it, and reports what is left,
+so every worker agrees on a caller's budget. Two local shortcuts save most of
+the Redis round trips:
+
+* **Leases.** A caller whose bucket is at least half full is clearly under the
+  limit. The script debits up to ``lease`` extra tokens for such a caller, and
+  the worker spends them locally over the next ``lease_ttl`` seconds. Leased
+  tokens that are never used simply expire, which only ever errs on the strict
+  side.
+* **Denials.** When a caller is denied, the worker remembers it until the
+  bucket has a token again, so a client hammering the endpoint is rejected
+  without touching Redis.
+
+A Redis failure fails open: the request is allowed and a warning is logged.
+"""
+
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, Literal, Optional
+
+from fastapi import HTTPException, Request, status
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.auth.utils import decode_token
+from api.config import Config
+from api.db.redis import redis_client
+from api.metrics import RATE_LIMIT_DECISIONS
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_KEY_PREFIX = "ratelimit"
+MAX_LOCAL_ENTRIES = 10_000
+
+# KEYS[1] bucket hash; ARGV: capacity, refill rate (tokens/s), cost, lease.
+# Returns {allowed, granted, remaining, retry_after_ms, reset_ms}.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local lease = tonumber(ARGV[4])
+
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil then
+    tokens = capacity
+    ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate / 1000)
+
+local allowed = 0
+local granted = 0
+local retry_after = 0
+if tokens >= cost then
+    allowed = 1
+    tokens = tokens - cost
+    granted = cost
+    if lease > 0 and tokens >= capacity / 2 then
+        local extra = math.min(lease, math.floor(tokens - capacity / 2))
+        tokens = tokens - extra
+        granted = granted + extra
+    end
+else
+    retry_after = math.ceil((cost - tokens) * 1000 / rate)
+end
+
+local reset = math.ceil((capacity - tokens) * 1000 / rate)
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.max(reset, 1000))
+return {allowed, granted, math.floor(tokens), retry_after, reset}
+"""
+
+_token_bucket = redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+
+
+@dataclass(slots=True)
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: float
+    retry_after: float = 0.0
+
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(max(self.remaining, 0)),
+            "X-RateLimit-Reset": str(math.ceil(self.reset)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(math.ceil(self.retry_after), 1))
+        return headers
+
+
+@dataclass(slots=True)
+class _LocalEntry:
+    tokens: int
+    expires_at: float
+    remaining: int
+    reset_at: float
+    denied: bool = False
+
+
+class RateLimiter:
+    """FastAPI dependency enforcing a token bucket per route and caller.
+
+    ``capacity`` is the burst size and ``per_minute`` the sustained rate.
+    Callers are identified by user id (from a valid bearer token, falling back
+    to the client IP) or by client IP alone.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        capacity: int,
+        per_minute: float,
+        key: Literal["user", "ip"] = "ip",
+        lease: Optional[int] = None,
+        lease_ttl: float = 1.0,
+    ):
+        self.name = name
+        self.capacity = capacity
+        self.rate = per_minute / 60
+        self.key = key
+        self.lease = Config.RATE_LIMIT_LEASE_SIZE if lease is None else lease
+        self.lease_ttl = lease_ttl
+        self._local: Dict[str, _LocalEntry] = {}
+        self._decisions = {
+            result: RATE_LIMIT_DECISIONS.labels(name, result)
+            for result in ("local_allow", "local_deny", "redis_allow", "redis_deny", "error")
+        }
+
+    async def __call__(self, request: Request) -> None:
+        await self.limit(request)
+
+    async def limit(self, request: Request, cost: int = 1) -> None:
+        """Debit ``cost`` tokens from the caller's bucket, raising 429 when it is short.
+
+        Batch routes call this with their operation count once the body is
+        parsed. A cost above ``capacity`` could never be paid, so it is capped:
+        the largest batches drain the whole bucket instead.
+        """
+        if not Config.RATE_LIMIT_ENABLED:
+            return
+
+        result = await self.check(self.identify(request), min(cost, self.capacity))
+        if result is None:
+            return
+
+        request.state.rate_limit_headers = result.headers()
+        if not result.allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers=result.headers(),
+            )
+
+    def identify(self, request: Request) -> str:
+        if self.key == "user":
+            authorization = request.headers.get("authorization", "")
+            scheme, _, token = authorization.partition(" ")
+            if scheme.lower() == "bearer" and token:
+                token_data = decode_token(token)
+                if token_data and token_data.get("user", {}).get("user_id"):
+                    return f"user:{token_data['user']['user_id']}"
+        return f"ip:{client_ip(request)}"
+
+    async def check(self, identity: str, cost: int = 1) -> Optional[RateLimitResult]:
+        now = time.monotonic()
+        entry = self._local.get(identity)
+        if entry is not None:
+            if entry.denied and now < entry.expires_at:
+                self._decisions["local_deny"].inc()
+                return RateLimitResult(
+                    allowed=False,
+                    limit=self.capacity,
+                    remaining=0,
+                    reset=entry.reset_at - now,
+                    retry_after=entry.expires_at - now,
+                )
+            if not entry.denied and now < entry.expires_at and entry.tokens >= cost:
+                entry.tokens -= cost
+                self._decisions["local_allow"].inc()
+                return RateLimitResult(
+                    allowed=True,
+                    limit=self.capacity,
+                    remaining=entry.remaining + entry.tokens,
+                    reset=max(entry.reset_at - now, 0),
+                )
+            del self._local[identity]
+
+        try:
+            allowed, granted, remaining, retry_after_ms, reset_ms = await _token_bucket(
+                keys=[f"{RATE_LIMIT_KEY_PREFIX}:{self.name}:{identity}"],
+                args=[self.capacity, self.rate, cost, self.lease],
+            )
+        except Exception:
+            logger.warning(f"Rate limit check failed for {self.name}; allowing request", exc_info=True)
+            self._decisions["error"].inc()
+            return None
+
+        reset_at = now + reset_ms / 1000
+        if not allowed:
+            self._decisions["redis_deny"].inc()
+            self._remember(identity, _LocalEntry(0, now + retry_after_ms / 1000, 0, reset_at, denied=True))
+            return RateLimitResult(
+                allowed=False,
+                limit=self.capacity,
+                remaining=0,
+                reset=reset_ms / 1000,
+                retry_after=retry_after_ms / 1000,
+            )
+
+        self._decisions["redis_allow"].inc()
+        leased = int(granted) - cost
+        if leased > 0:
+            self._remember(identity, _LocalEntry(leased, now + self.lease_ttl, int(remaining), reset_at))
+        return RateLimitResult(
+            allowed=True,
+            limit=self.capacity,
+            remaining=int(remaining) + leased,
+            reset=reset_ms / 1000,
+        )
+
+    def _remember(self, identity: str, entry: _LocalEntry) -> None:
+        if len(self._local) >= MAX_LOCAL_ENTRIES:
+            now = time.monotonic()
+            for stale in [key for key, value in self._local.items() if value.expires_at <= now]:
+                del self._local[stale]
+            if len(self._local) >= MAX_LOCAL_ENTRIES:
+                self._local.clear()
+        self._local[identity] = entry
+
+
+def client_ip(request: Request) -> str:
+    if Config.RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+class RateLimitHeadersMiddleware:
+    """Copy the headers computed by a ``RateLimiter`` dependency onto the response.
+
+    Routes return their own ``JSONResponse`` objects, which FastAPI does not
+    merge dependency-set headers into, so they are applied at the ASGI layer.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                rate_limit_headers = scope.get("state", {}).get("rate_limit_headers")
+                if rate_limit_headers:
+                    present = {name.lower() for name, _ in message.get("headers", [])}
+                    headers = list(message.get("headers", []))
+                    for name, value in rate_limit_headers.items():
+                        encoded = name.lower().encode("latin-1")
+                        if encoded not in present:
+                            headers.append((encoded, value.encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+login_rate_limiter = RateLimiter(
+    "auth-login",
+    capacity=Config.RATE_LIMIT_LOGIN_BURST,
+    per_minute=Config.RATE_LIMIT_LOGIN_PER_MINUTE,
+    key="ip",
+    lease=0,
+)
+signup_rate_limiter = RateLimiter(
+    "auth-signup",
+    capacity=Config.RATE_LIMIT_SIGNUP_BURST,
+    per_minute=Config.RATE_LIMIT_SIGNUP_PER_MINUTE,
+    key="ip",
+    lease=0,
+)
+vote_rate_limiter = RateLimiter(
+    "votes-create",
+    capacity=Config.RATE_LIMIT_VOTES_BURST,
+    per_minute=Config.RATE_LIMIT_VOTES_PER_MINUTE,
+    key="user",
+)
+follow_rate_limiter = RateLimiter(
+    "follows-write",
+    capacity=Config.RATE_LIMIT_FOLLOWS_BURST,
+    per_minute=Config.RATE_LIMIT_FOLLOWS_PER_MINUTE,
+    key="user",
+)
@@ -1,24 +1,27 @@
+from datetime import datetime
 from logging import Logger
 import logging
-from typing import List
+from typing import List, Literal, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from fastapi.responses import JSONResponse
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from api.votes.schemas import VoteCreate, VoteResponse
+from api.votes.schemas import VoteBatch, VoteBatchResult, VoteCreate, VotePage, VoteResponse, VoteSummary
 from api.auth.dependencies import AccessTokenBearer
+from api.config import Config
 from api.votes.service import VoteService
 from api.db.main import get_session
 from api.db.models import Votes
+from api.rate_limit import vote_rate_limiter
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/votes", tags=["votes"])
 vote_service = VoteService()
 
-@router.post("/create")
+@router.post("/create", dependencies=[Depends(vote_rate_limiter)])
 async def create_vote(vote_data: VoteCreate, session: AsyncSession = Depends(get_session), token_details: dict = Depends(AccessTokenBearer())):
     user_id_str = token_details["user"]["user_id"]
     if not user_id_str:
@@ -36,6 +39,40 @@ async def create_vote(vote_data: VoteCreate, session: AsyncSession = Depends(get
     return vote
 
 
+@router.post("/batch", response_model=List[VoteBatchResult])
+async def create_votes_batch(request: Request, vote_batch: VoteBatch, session: AsyncSession = Depends(get_session), token_details: dict = Depends(AccessTokenBearer())):
+    user_id_str = token_details["user"]["user_id"]
+    if not user_id_str:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    
+    try:
+        user_id = UUID(user_id_str)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid user ID format")
+    
+    await vote_rate_limiter.limit(request, cost=len(vote_batch.operations))
+    return await vote_service.create_votes_batch(user_id, vote_batch.operations, session)
+
+
+@router.get("/me")
+async def get_my_votes(
+    post_ids: List[UUID] = Query(min_length=1, max_length=Config.BATCH_MAX_OPERATIONS),
+    session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(AccessTokenBearer())
+):
+    user_id_str = token_details["user"]["user_id"]
+    if not user_id_str:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    
+    try:
+        user_id = UUID(user_id_str)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid user ID format")
+    
+    my_votes = await vote_service.get_user_votes_for_posts(user_id, post_ids, session)
+    return {"votes": {str(post_id): my_votes.get(post_id) for post_id in post_ids}}
+
+
 @router.get("/{vote_id}")
 async def get_vote_by_id(vote_id: str, session: AsyncSession = Depends(get_session), token_details: dict = Depends(AccessTokenBearer())):
     try:
@@ -59,22 +96,62 @@ async def delete_vote(vote_id: str, session: AsyncSession = Depends(get_session)
         status_code=status.HTTP_200_OK
     )
     
-@router.get("/post/{post_id}", response_model=List[VoteResponse])
-async def get_votes_by_post(post_id: str, session: AsyncSession = Depends(get_session), token_details: dict = Depends(AccessTokenBearer())):
+@router.get("/post/{post_id}", response_model=VotePage)
+async def get_votes_by_post(
+    post_id: str,
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(AccessTokenBearer())
+):
     try:
         post_uuid = UUID(post_id)
     except (ValueError, TypeError):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid post ID format")
     
-    votes = await vote_service.get_votes_by_post(post_uuid, session)
-    return [VoteResponse(**vote.model_dump()) for vote in votes]
+    return await vote_service.get_votes_by_post(post_uuid, session, limit, cursor)
+
+@router.get("/post/{post_id}/summary", response_model=VoteSummary)
+async def get_vote_summary_by_post(
+    post_id: str,
+    bucket: Literal["hour", "day", "week", "month"] = "day",
+    since: Optional[datetime] = None,
+    session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(AccessTokenBearer())
+):
+    try:
+        post_uuid = UUID(post_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid post ID format")
+    
+    return await vote_service.get_vote_summary(Votes.post_id == post_uuid, session, bucket, since)
+
+@router.get("/user/{user_id}", response_model=VotePage)
+async def get_votes_by_user(
+    user_id: str,
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(AccessTokenBearer())
+):
+    try:
+        user_uuid = UUID(user_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid user ID format")
+    
+    return await vote_service.get_votes_by_user(user_uuid, session, limit, cursor)
 
-@router.get("/user/{user_id}", response_model=List[VoteResponse])
-async def get_votes_by_user(user_id: str, session: AsyncSession = Depends(get_session), token_details: dict = Depends(AccessTokenBearer())):
+@router.get("/user/{user_id}/summary", response_model=VoteSummary)
+async def get_vote_summary_by_user(
+    user_id: str,
+    bucket: Literal["hour", "day", "week", "month"] = "day",
+    since: Optional[datetime] = None,
+    session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(AccessTokenBearer())
+):
     try:
         user_uuid = UUID(user_id)
     except (ValueError, TypeError):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid user ID format")
     
-    votes = await vote_service.get_votes_by_user(user_uuid, session)
-    return [VoteResponse(**vote.model_dump()) for vote in votes]
\ No newline at end of file
+    return await vote_service.get_vote_summary(Votes.user_id == user_uuid, session, bucket, since)
@@ -1,8 +1,10 @@
 from datetime import datetime
+from typing import List, Literal, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, Field
 
+from api.config import Config
 from api.db.models import VoteType
 
 class VoteCreate(BaseModel):
@@ -17,4 +19,35 @@ class VoteResponse(BaseModel):
     user_id: UUID
     vote_type: VoteType
     created_at: datetime
-    
\ No newline at end of file
+    
+
+class VoteBatchItem(BaseModel):
+    post_id: UUID
+    vote_type: VoteType
+
+
+class VoteBatch(BaseModel):
+    operations: List[VoteBatchItem] = Field(min_length=1, max_length=Config.BATCH_MAX_OPERATIONS)
+
+
+class VoteBatchResult(BaseModel):
+    post_id: UUID
+    status: Literal["created", "updated", "unchanged", "not_found"]
+
+
+class VotePage(BaseModel):
+    items: List[VoteResponse]
+    next_cursor: Optional[str] = None
+
+
+class VoteHistogramBucket(BaseModel):
+    bucket: datetime
+    upvotes: int
+    downvotes: int
+
+
+class VoteSummary(BaseModel):
+    upvotes: int
+    downvotes: int
+    bucket: Literal["hour", "day", "week", "month"]
+    histogram: List[VoteHistogramBucket]
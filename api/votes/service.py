@@ -1,15 +1,27 @@
-from typing import List
+from datetime import datetime
+from typing import Dict, List, Optional
 from uuid import UUID
 
 from fastapi import HTTPException, status
+from sqlalchemy import bindparam, func, literal_column, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from api.db.models import Posts, Votes, VoteType
-from api.posts.algorithm import safe_record_interaction
+from api.db.pagination import decode_cursor, encode_cursor
+from api.posts.algorithm import Interaction, safe_record_interaction, safe_record_interactions
+from api.posts.ranking import hot_score_sql, update_hot_score
 from api.posts.service import PostService
 
-from .schemas import VoteCreate, VoteResponse
+from .schemas import (
+    VoteBatchItem,
+    VoteBatchResult,
+    VoteCreate,
+    VoteHistogramBucket,
+    VoteResponse,
+    VoteSummary,
+)
 
 
 class VoteService:
@@ -57,6 +69,7 @@ class VoteService:
                     post.upvote_count += 1
                 else:
                     post.downvote_count += 1
+                update_hot_score(post)
                 
                 await session.commit()
                 await session.refresh(existing_vote)
@@ -75,6 +88,7 @@ class VoteService:
                     post.upvote_count += 1
                 else:
                     post.downvote_count += 1
+                update_hot_score(post)
                 
                 await session.commit()
                 await session.refresh(new_vote)
@@ -91,6 +105,100 @@ class VoteService:
             await session.rollback()
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error creating vote: {e}") 
                
+    async def create_votes_batch(
+        self, user_id: UUID, operations: List[VoteBatchItem], session: AsyncSession
+    ) -> List[VoteBatchResult]:
+        """Apply many votes for one user with set-based reads and a single commit.
+
+        Later operations on the same post win. Counter changes are accumulated
+        per post and written with one executemany UPDATE.
+        """
+        try:
+            requested = {op.post_id: op.vote_type for op in operations}
+            post_ids = list(requested)
+
+            result = await session.execute(
+                select(Posts.id, Posts.author_id).where(Posts.id.in_(post_ids))
+            )
+            authors = {row.id: row.author_id for row in result.all()}
+
+            result = await session.execute(
+                select(Votes.post_id, Votes.vote_type).where(
+                    Votes.user_id == user_id,
+                    Votes.post_id.in_(post_ids),
+                )
+            )
+            existing = {row.post_id: row.vote_type for row in result.all()}
+
+            results: List[VoteBatchResult] = []
+            upserts = []
+            counter_deltas = []
+            interactions = []
+            for post_id, vote_type in requested.items():
+                if post_id not in authors:
+                    results.append(VoteBatchResult(post_id=post_id, status="not_found"))
+                    continue
+
+                old_vote_type = existing.get(post_id)
+                if old_vote_type == vote_type:
+                    results.append(VoteBatchResult(post_id=post_id, status="unchanged"))
+                    continue
+
+                upvote_delta = int(vote_type == VoteType.UPVOTE) - int(old_vote_type == VoteType.UPVOTE)
+                downvote_delta = int(vote_type == VoteType.DOWNVOTE) - int(old_vote_type == VoteType.DOWNVOTE)
+                upserts.append({"post_id": post_id, "user_id": user_id, "vote_type": vote_type})
+                counter_deltas.append({"b_id": post_id, "b_up": upvote_delta, "b_down": downvote_delta})
+                interactions.append(
+                    Interaction(
+                        user_id=user_id,
+                        interaction_type="upvotes" if vote_type == VoteType.UPVOTE else "downvotes",
+                        author_id=authors[post_id],
+                        post_id=post_id,
+                    )
+                )
+                results.append(
+                    VoteBatchResult(post_id=post_id, status="updated" if old_vote_type else "created")
+                )
+
+            if not upserts:
+                return results
+
+            insert_stmt = pg_insert(Votes).values(upserts)
+            await session.execute(
+                insert_stmt.on_conflict_do_update(
+                    constraint="unique_user_post_vote",
+                    set_={"vote_type": insert_stmt.excluded.vote_type},
+                )
+            )
+
+            posts_table = Posts.__table__
+            await session.execute(
+                update(posts_table)
+                .where(posts_table.c.id == bindparam("b_id"))
+                .values(
+                    upvote_count=posts_table.c.upvote_count + bindparam("b_up"),
+                    downvote_count=posts_table.c.downvote_count + bindparam("b_down"),
+                    hot_score=hot_score_sql(
+                        posts_table.c.upvote_count + bindparam("b_up"),
+                        posts_table.c.downvote_count + bindparam("b_down"),
+                        posts_table.c.comment_count,
+                        posts_table.c.created_at,
+                    ),
+                ),
+                counter_deltas,
+            )
+            await session.commit()
+
+            await safe_record_interactions(interactions)
+            return results
+
+        except HTTPException:
+            await session.rollback()
+            raise
+        except Exception as e:
+            await session.rollback()
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error applying vote batch: {e}")
+
     async def get_vote_by_id(self, vote_id: UUID, session: AsyncSession) -> Votes:
         try:
             result = await session.execute(select(Votes).where(Votes.id == vote_id))
@@ -112,6 +220,7 @@ class VoteService:
                         post.upvote_count -= 1
                     else:
                         post.downvote_count -= 1
+                    update_hot_score(post)
                     await session.commit()
                     await session.refresh(post)
                     reverse_type = (
@@ -128,18 +237,110 @@ class VoteService:
         except Exception as e:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error deleting vote: {e}")
         
-    async def get_votes_by_post(self, post_id: UUID, session: AsyncSession) -> List[Votes]:
+    async def get_user_votes_for_posts(
+        self, user_id: UUID, post_ids: List[UUID], session: AsyncSession
+    ) -> Dict[UUID, VoteType]:
+        """Return the user's vote type for each of ``post_ids`` they have voted on.
+
+        Only ``(post_id, vote_type)`` is selected; the lookup is served by the
+        ``unique_user_post_vote`` index since both columns are equality-bound.
+        """
+        if not post_ids:
+            return {}
+        try:
+            result = await session.execute(
+                select(Votes.post_id, Votes.vote_type).where(
+                    Votes.user_id == user_id,
+                    Votes.post_id.in_(post_ids),
+                )
+            )
+            return {row.post_id: row.vote_type for row in result.all()}
+        except Exception as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error getting user votes: {e}")
+
+    async def attach_my_votes(self, user_id: UUID, posts: List[Posts], session: AsyncSession) -> List[dict]:
+        my_votes = await self.get_user_votes_for_posts(user_id, [post.id for post in posts], session)
+        return [{**post.model_dump(), "my_vote": my_votes.get(post.id)} for post in posts]
+        
+    async def _list_votes(self, where_clause, session: AsyncSession, limit: int, cursor: Optional[str]) -> dict:
+        query = (
+            select(Votes.id, Votes.post_id, Votes.user_id, Votes.vote_type, Votes.created_at)
+            .where(where_clause)
+            .order_by(Votes.created_at.desc(), Votes.id.desc())
+            .limit(limit + 1)
+        )
+        if cursor:
+            created_at, vote_id = decode_cursor(cursor, 2)
+            try:
+                query = query.where(
+                    tuple_(Votes.created_at, Votes.id) < (datetime.fromisoformat(created_at), UUID(vote_id))
+                )
+            except ValueError:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+        result = await session.execute(query)
+        rows = result.all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].created_at.isoformat(), rows[-1].id)
+        return {"items": [dict(row._mapping) for row in rows], "next_cursor": next_cursor}
+
+    async def get_votes_by_post(
+        self, post_id: UUID, session: AsyncSession, limit: int = 50, cursor: Optional[str] = None
+    ) -> dict:
         try:
-            result = await session.execute(select(Votes).where(Votes.post_id == post_id))
-            votes = result.scalars().all()
-            return votes
+            return await self._list_votes(Votes.post_id == post_id, session, limit, cursor)
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error getting votes by post: {e}")
         
-    async def get_votes_by_user(self, user_id: UUID, session: AsyncSession) -> List[Votes]:
+    async def get_votes_by_user(
+        self, user_id: UUID, session: AsyncSession, limit: int = 50, cursor: Optional[str] = None
+    ) -> dict:
         try:
-            result = await session.execute(select(Votes).where(Votes.user_id == user_id))
-            votes = result.scalars().all()
-            return votes
+            return await self._list_votes(Votes.user_id == user_id, session, limit, cursor)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error getting votes by user: {e}")
+
+    async def get_vote_summary(
+        self,
+        where_clause,
+        session: AsyncSession,
+        bucket: str = "day",
+        since: Optional[datetime] = None,
+    ) -> VoteSummary:
+        """Up/down totals and a time-bucketed histogram from one GROUP BY query.
+
+        ``bucket`` is validated against ``VoteSummary.bucket`` before it is
+        inlined into ``date_trunc``; a bound parameter would render twice and
+        Postgres would reject the GROUP BY.
+        """
+        try:
+            bucket_column = func.date_trunc(literal_column(f"'{bucket}'"), Votes.created_at).label("bucket")
+            query = (
+                select(
+                    bucket_column,
+                    func.count().filter(Votes.vote_type == VoteType.UPVOTE).label("upvotes"),
+                    func.count().filter(Votes.vote_type == VoteType.DOWNVOTE).label("downvotes"),
+                )
+                .where(where_clause)
+                .group_by(literal_column("1"))
+                .order_by(literal_column("1"))
+            )
+            if since is not None:
+                query = query.where(Votes.created_at >= since)
+
+            result = await session.execute(query)
+            histogram = [VoteHistogramBucket(**row._mapping) for row in result.all()]
+            return VoteSummary(
+                upvotes=sum(b.upvotes for b in histogram),
+                downvotes=sum(b.downvotes for b in histogram),
+                bucket=bucket,
+                histogram=histogram,
+            )
         except Exception as e:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error getting votes by user: {e}")
\ No newline at end of file
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error getting vote summary: {e}")
@@ -0,0 +1,209 @@
+"""Micro-benchmarks for the FYP ranking engine in ``api/posts/algorithm.py``.
+
+Usage::
+
+    python -m benchmarks.fyp --fake-redis --seen 1000 10000 100000 1000000 --authors 10 100 1000 10000
+    python -m benchmarks.fyp --fake-redis --repeat 50 --output fyp.json
+
+For every (seen posts, preferred authors) combination a synthetic user is
+prepared in Redis, then ``get_fyp_recommendations`` and ``record_interaction``
+are timed. Each result records latency (mean/p50/p95), Redis commands and round
+trips per call, and SQL statements per call. Posts and authors come from
+the seeded database (``python -m benchmarks.seed``), so the SQL side runs real
+plans. ``--score-candidates`` also times the vectorised blend and per-author
+diversification on synthetic candidate sets of the given sizes.
+
+The run overwrites ``fyp:ranked_posts`` with the seeded posts and upvotes them
+through ``record_interaction``. It therefore refuses to touch the configured
+Redis unless ``--allow-live-redis`` is passed, which is meant for a disposable
+instance, since Redis round trips are only realistic against a real server.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from uuid import UUID, uuid4
+
+import numpy as np
+from sqlalchemy import select
+
+from api.db.main import dispose_engine, get_session
+from api.db.models import Posts
+from api.db.redis import fyp_redis_client
+from api.instrumentation import collect_stats
+from api.posts import algorithm
+from api.posts.scoring import blend_scores, diversified_order
+from benchmarks.load import percentile
+
+REDIS_CHUNK = 10000
+
+
+async def _load_ids(session, limit: int) -> tuple[list[UUID], list[UUID]]:
+    result = await session.execute(select(Posts.id, Posts.author_id).limit(limit))
+    rows = result.all()
+    if not rows:
+        raise RuntimeError("No posts found; run `python -m benchmarks.seed` first")
+    return [row.id for row in rows], list(dict.fromkeys(row.author_id for row in rows))
+
+
+async def _prepare_user(redis, user_id: UUID, post_ids: list[UUID], author_ids: list[UUID], seen: int, authors: int) -> None:
+    viewed_key = algorithm._user_viewed_key(user_id)
+    half = min(len(post_ids), seen // 2)
+    seen_ids = [str(pid) for pid in post_ids[:half]] + [str(uuid4()) for _ in range(seen - half)]
+    for start in range(0, len(seen_ids), REDIS_CHUNK):
+        await redis.sadd(viewed_key, *seen_ids[start : start + REDIS_CHUNK])
+
+    preferred = [str(aid) for aid in author_ids[:authors]] + [str(uuid4()) for _ in range(authors - min(authors, len(author_ids)))]
+    mapping = {aid: float(authors - rank) for rank, aid in enumerate(preferred)}
+    items = list(mapping.items())
+    for start in range(0, len(items), REDIS_CHUNK):
+        await redis.zadd(algorithm._user_preferred_authors_key(user_id), dict(items[start : start + REDIS_CHUNK]))
+    await redis.hset(algorithm._user_interactions_key(user_id), "bench", 1)
+
+
+async def _cleanup_user(redis, user_id: UUID) -> None:
+    await redis.delete(
+        algorithm._user_viewed_key(user_id),
+        algorithm._user_preferred_authors_key(user_id),
+        algorithm._user_interactions_key(user_id),
+    )
+
+
+def _latency_stats(samples: list[float]) -> dict:
+    samples = sorted(samples)
+    return {
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 0.95) * 1000, 3),
+    }
+
+
+async def bench_case(session, post_ids, author_ids, seen: int, authors: int, repeat: int, limit: int) -> dict:
+    user_id = uuid4()
+    await _prepare_user(fyp_redis_client, user_id, post_ids, author_ids, seen, authors)
+    try:
+        fyp_samples, fyp_commands, fyp_round_trips, fyp_sql = [], 0, 0, 0
+        for _ in range(repeat):
+            with collect_stats() as stats:
+                started = time.perf_counter()
+                await algorithm.get_fyp_recommendations(fyp_redis_client, session, user_id, limit=limit)
+                fyp_samples.append(time.perf_counter() - started)
+            fyp_commands += stats.redis_commands
+            fyp_round_trips += stats.redis_round_trips
+            fyp_sql += stats.sql_statements
+
+        record_samples, record_commands, record_round_trips = [], 0, 0
+        for i in range(repeat):
+            with collect_stats() as stats:
+                started = time.perf_counter()
+                await algorithm.record_interaction(
+                    fyp_redis_client, user_id, "upvotes", author_ids[i % len(author_ids)], post_ids[i % len(post_ids)], mark_viewed=False
+                )
+                record_samples.append(time.perf_counter() - started)
+            record_commands += stats.redis_commands
+            record_round_trips += stats.redis_round_trips
+    finally:
+        await _cleanup_user(fyp_redis_client, user_id)
+
+    return {
+        "seen_posts": seen,
+        "preferred_authors": authors,
+        "get_fyp_recommendations": {
+            **_latency_stats(fyp_samples),
+            "redis_commands_per_call": fyp_commands / repeat,
+            "redis_round_trips_per_call": fyp_round_trips / repeat,
+            "sql_statements_per_call": fyp_sql / repeat,
+        },
+        "record_interaction": {
+            **_latency_stats(record_samples),
+            "redis_commands_per_call": record_commands / repeat,
+            "redis_round_trips_per_call": record_round_trips / repeat,
+        },
+    }
+
+
+def bench_scoring(candidates: int, repeat: int) -> dict:
+    """Time the vectorised blend and diversification on synthetic candidate columns."""
+    rng = np.random.default_rng(candidates)
+    now = time.time()
+    affinity = rng.uniform(-1, 1, candidates)
+    created_at = now - rng.uniform(0, 30 * 86400, candidates)
+    upvotes = rng.integers(0, 500, candidates).astype(np.float64)
+    downvotes = rng.integers(0, 50, candidates).astype(np.float64)
+    comments = rng.integers(0, 80, candidates).astype(np.float64)
+    author_codes = rng.integers(0, max(1, candidates // 20), candidates)
+
+    blend_samples, diversify_samples = [], []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        scores = blend_scores(affinity, created_at, upvotes, downvotes, comments, now, algorithm.BLEND_WEIGHT)
+        blended = time.perf_counter()
+        diversified_order(scores, author_codes, algorithm.MAX_POSTS_PER_AUTHOR)
+        diversify_samples.append(time.perf_counter() - blended)
+        blend_samples.append(blended - started)
+    return {
+        "candidates": candidates,
+        "blend_scores": _latency_stats(blend_samples),
+        "diversified_order": _latency_stats(diversify_samples),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    if args.fake_redis:
+        import fakeredis
+
+        fyp_redis_client.connection_pool = fakeredis.FakeAsyncRedis(decode_responses=True).connection_pool
+
+    scoring = [bench_scoring(candidates, max(args.repeat, 100)) for candidates in args.score_candidates]
+    for case in scoring:
+        print(json.dumps(case), file=sys.stderr)
+
+    results = []
+    async for session in get_session():
+        post_ids, author_ids = await _load_ids(session, args.posts)
+        await fyp_redis_client.zadd("fyp:ranked_posts", {str(pid): float(i) for i, pid in enumerate(post_ids)})
+        for seen in args.seen:
+            for authors in args.authors:
+                case = await bench_case(session, post_ids, author_ids, seen, authors, args.repeat, args.limit)
+                print(json.dumps(case), file=sys.stderr)
+                results.append(case)
+    await dispose_engine()
+    return {"repeat": args.repeat, "limit": args.limit, "scoring": scoring, "cases": results}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--seen", type=int, nargs="+", default=[1000, 10000, 100000, 1000000])
+    parser.add_argument("--authors", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--posts", type=int, default=5000, help="Seeded posts to use as candidates")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--score-candidates", type=int, nargs="+", default=[1000, 5000], help="Candidate set sizes for the scoring micro-benchmark")
+    parser.add_argument("--fake-redis", action="store_true")
+    parser.add_argument(
+        "--allow-live-redis",
+        action="store_true",
+        help="Run against the configured Redis; overwrites fyp:ranked_posts, so only use a disposable instance",
+    )
+    parser.add_argument("--output")
+    return parser
+
+
+def main() -> None:
+    parser = build_parser()
+    args = parser.parse_args()
+    if not args.fake_redis and not args.allow_live_redis:
+        parser.error("this benchmark overwrites fyp:ranked_posts; pass --fake-redis, or --allow-live-redis for a disposable Redis")
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
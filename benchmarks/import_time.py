@@ -0,0 +1,96 @@
+"""Measure cold-start import time of the ``api`` package.
+
+Usage::
+
+    python -m benchmarks.import_time --runs 10
+    python -m benchmarks.import_time --output import.json --max-ms 1500
+
+Each run imports ``api`` in a fresh interpreter with ``-X importtime``, so
+nothing is cached in ``sys.modules``. The report has the wall time of the
+import (mean/p50/p95) and the modules with the largest cumulative import time
+from the median run. ``--max-ms`` exits non-zero when the p50 exceeds the
+budget, so CI can keep cold start from creeping up on autoscaled pods.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks.load import percentile
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import {module}; print((time.perf_counter() - t) * 1000)"
+
+
+def _parse_importtime(stderr: str) -> list[dict]:
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            modules.append(
+                {"module": name.strip(), "self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000}
+            )
+        except ValueError:
+            continue
+    return modules
+
+
+def run_once(module: str) -> tuple[float, list[dict]]:
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT_SNIPPET.format(module=module)],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    return float(completed.stdout.strip().splitlines()[-1]), _parse_importtime(completed.stderr)
+
+
+def run(args: argparse.Namespace) -> dict:
+    runs = [run_once(args.module) for _ in range(args.runs)]
+    samples = sorted(wall for wall, _ in runs)
+    _, median_modules = sorted(runs, key=lambda item: item[0])[len(runs) // 2]
+    top_level = [m for m in median_modules if m["module"].split(".")[0] == args.module.split(".")[0]]
+    return {
+        "module": args.module,
+        "runs": args.runs,
+        "wall_ms": {
+            "mean": round(statistics.fmean(samples), 2),
+            "p50": round(percentile(samples, 0.5), 2),
+            "p95": round(percentile(samples, 0.95), 2),
+        },
+        "slowest_modules": sorted(median_modules, key=lambda m: m["cumulative_ms"], reverse=True)[: args.top],
+        "slowest_own_modules": sorted(top_level, key=lambda m: m["self_ms"], reverse=True)[: args.top],
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--module", default="api")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=15, help="How many modules to list")
+    parser.add_argument("--max-ms", type=float, help="Fail if the p50 import time exceeds this budget")
+    parser.add_argument("--output")
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    report = run(args)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(output + "\n")
+    print(output)
+    if args.max_ms is not None and report["wall_ms"]["p50"] > args.max_ms:
+        print(f"Import time p50 {report['wall_ms']['p50']} ms exceeds budget of {args.max_ms} ms", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""Closed-loop load generator for the API hot paths.
+
+Usage::
+
+    python -m benchmarks.load --base-url http://localhost:8000 --concurrency 32 --duration 30
+    python -m benchmarks.load --in-process --fake-redis --disable-rate-limits --output run.json
+    python -m benchmarks.load --in-process --disable-rate-limits --compare baseline.json --max-regression 0.15
+
+Each scenario runs ``--concurrency`` workers for ``--duration`` seconds against
+one endpoint and reports throughput and p50/p95/p99 latency. Results are
+written as JSON so runs can be diffed; ``--compare`` exits non-zero when p95 or
+throughput regresses by more than ``--max-regression`` against a previous run.
+
+Postgres is always required (the models use Postgres-only types and server
+defaults). ``--fake-redis`` swaps the shared Redis connection pool for an
+in-memory fakeredis pool when running ``--in-process``. Seed data first with
+``python -m benchmarks.seed``.
+
+The rate limits would otherwise dominate a run: logging in ``--sessions``
+users from one address exhausts the login burst, and the vote scenario hits
+the per-user vote limit. ``--disable-rate-limits`` turns them off for an
+``--in-process`` run. A server under test must be started with
+``RATE_LIMIT_ENABLED=false``. Responses with status 429 are reported as
+``rate_limited``, separately from other ``errors``.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from typing import Awaitable, Callable
+
+import httpx
+
+from benchmarks.seed import SEED_PASSWORD, seed_email
+
+SCENARIOS = ("feed", "following-feed", "fyp", "votes-create", "comments-post", "auth-login")
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies: list[float], errors: int, rate_limited: int, elapsed: float) -> dict:
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rate_limited": rate_limited,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+class LoadContext:
+    """Tokens and ids gathered before the timed phase so it only measures the target endpoint."""
+
+    def __init__(self, client: httpx.AsyncClient, users: int, rng: random.Random):
+        self.client = client
+        self.users = users
+        self.rng = rng
+        self.tokens: list[str] = []
+        self.post_ids: list[str] = []
+
+    async def prepare(self, sessions: int) -> None:
+        for index in self.rng.sample(range(self.users), min(sessions, self.users)):
+            response = await self.client.post(
+                "/auth/login", json={"email": seed_email(index), "password": SEED_PASSWORD}
+            )
+            if response.status_code == 429:
+                raise RuntimeError(
+                    "Login was rate limited while preparing sessions; use --disable-rate-limits "
+                    "(--in-process) or start the server with RATE_LIMIT_ENABLED=false"
+                )
+            response.raise_for_status()
+            self.tokens.append(response.json()["access_token"])
+
+        for offset in range(0, 500, 100):
+            response = await self.client.get("/posts/feed", params={"limit": 100, "offset": offset})
+            response.raise_for_status()
+            self.post_ids.extend(post["id"] for post in response.json())
+        if not self.tokens or not self.post_ids:
+            raise RuntimeError("No seeded users or posts found; run `python -m benchmarks.seed` first")
+
+    def auth(self) -> dict:
+        return {"Authorization": f"Bearer {self.rng.choice(self.tokens)}"}
+
+
+def build_request(ctx: LoadContext, scenario: str) -> Callable[[], Awaitable[httpx.Response]]:
+    client = ctx.client
+    if scenario == "feed":
+        return lambda: client.get("/posts/feed", params={"limit": 20, "offset": ctx.rng.randrange(0, 200, 20)})
+    if scenario == "following-feed":
+        return lambda: client.get("/posts/following-feed", headers=ctx.auth())
+    if scenario == "fyp":
+        return lambda: client.get("/posts/fyp", headers=ctx.auth())
+    if scenario == "votes-create":
+        return lambda: client.post(
+            "/votes/create",
+            json={"post_id": ctx.rng.choice(ctx.post_ids), "vote_type": ctx.rng.choice(["upvote", "downvote"])},
+            headers=ctx.auth(),
+        )
+    if scenario == "comments-post":
+        return lambda: client.get(f"/comments/post/{ctx.rng.choice(ctx.post_ids)}", headers=ctx.auth())
+    if scenario == "auth-login":
+        return lambda: client.post(
+            "/auth/login",
+            json={"email": seed_email(ctx.rng.randrange(ctx.users)), "password": SEED_PASSWORD},
+        )
+    raise ValueError(f"Unknown scenario: {scenario}")
+
+
+async def run_scenario(ctx: LoadContext, scenario: str, concurrency: int, duration: float, warmup: float) -> dict:
+    send = build_request(ctx, scenario)
+    latencies: list[float] = []
+    errors = 0
+    rate_limited = 0
+
+    async def worker(deadline: float, record: bool) -> None:
+        nonlocal errors, rate_limited
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                status_code = (await send()).status_code
+            except httpx.HTTPError:
+                status_code = None
+            if record:
+                if status_code == 429:
+                    rate_limited += 1
+                elif status_code is not None and status_code < 400:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+
+    if warmup:
+        deadline = time.perf_counter() + warmup
+        await asyncio.gather(*(worker(deadline, False) for _ in range(concurrency)))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(started + duration, True) for _ in range(concurrency)))
+    return summarize(latencies, errors, rate_limited, time.perf_counter() - started)
+
+
+def compare(current: dict, baseline: dict, max_regression: float) -> list[str]:
+    regressions = []
+    for scenario, stats in current["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(scenario)
+        if not previous:
+            continue
+        if previous["p95_ms"] and stats["p95_ms"] > previous["p95_ms"] * (1 + max_regression):
+            regressions.append(f"{scenario}: p95 {previous['p95_ms']}ms -> {stats['p95_ms']}ms")
+        if previous["throughput_rps"] and stats["throughput_rps"] < previous["throughput_rps"] * (1 - max_regression):
+            regressions.append(
+                f"{scenario}: throughput {previous['throughput_rps']} -> {stats['throughput_rps']} rps"
+            )
+    return regressions
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _make_client(args: argparse.Namespace) -> httpx.AsyncClient:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    if not args.in_process:
+        return httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout)
+
+    from api import app
+    from api.config import Config
+    from api.db.redis import auth_redis_client, fyp_redis_client, redis_client
+
+    if args.disable_rate_limits:
+        Config.RATE_LIMIT_ENABLED = False
+
+    if args.fake_redis:
+        import fakeredis
+
+        server = fakeredis.FakeServer()
+        for client in (redis_client, auth_redis_client, fyp_redis_client):
+            client.connection_pool = fakeredis.FakeAsyncRedis(server=server, decode_responses=True).connection_pool
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://bench",
+        limits=limits,
+        timeout=args.timeout,
+    )
+
+
+async def run(args: argparse.Namespace) -> dict:
+    rng = random.Random(args.seed)
+    async with _make_client(args) as client:
+        ctx = LoadContext(client, args.users, rng)
+        await ctx.prepare(args.sessions)
+
+        results = {}
+        for scenario in args.scenarios:
+            results[scenario] = await run_scenario(ctx, scenario, args.concurrency, args.duration, args.warmup)
+            print(f"{scenario}: {results[scenario]}", file=sys.stderr)
+
+    return {
+        "meta": {
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "target": "in-process" if args.in_process else args.base_url,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "scenarios": results,
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--in-process", action="store_true", help="Drive the ASGI app directly instead of over HTTP")
+    parser.add_argument("--fake-redis", action="store_true", help="Use fakeredis (only with --in-process; needs the bench extra)")
+    parser.add_argument(
+        "--disable-rate-limits",
+        action="store_true",
+        help="Turn off the API rate limits (only with --in-process; start a server with RATE_LIMIT_ENABLED=false)",
+    )
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--users", type=int, default=2000, help="Number of seeded users (see benchmarks.seed)")
+    parser.add_argument("--sessions", type=int, default=50, help="Distinct logged-in users to rotate through")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", help="Previous JSON report to check for regressions")
+    parser.add_argument("--max-regression", type=float, default=0.10)
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(output + "\n")
+    print(output)
+
+    if args.compare:
+        with open(args.compare) as fh:
+            regressions = compare(report, json.load(fh), args.max_regression)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""Seed a synthetic Chefly dataset for load tests and benchmarks.
+
+Usage::
+
+    python -m benchmarks.seed --users 5000 --posts 20000 --votes 200000 --comments 50000
+
+Rows are written with bulk Core INSERTs in chunks (no ORM objects) against
+``Config.DB_URL``. Follow out-degrees follow a power law and targets, post
+authors and voted posts are drawn from a Zipf-like popularity distribution so a
+few "celebrity" users and viral posts dominate, as in production. Every seeded
+user shares the password ``SEED_PASSWORD`` so ``/auth/login`` can be driven.
+"""
+
+import argparse
+import asyncio
+import bisect
+import itertools
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+
+from sqlalchemy import insert, text, update
+from sqlmodel import SQLModel
+
+from api.auth.utils import hash_password
+from api.db.main import dispose_engine, get_engine
+from api.db.models import Comments, Follows, Posts, PostType, User, Votes, VoteType
+from api.posts.ranking import hot_score_sql
+
+SEED_PASSWORD = "Benchmark1!"
+SEED_EMAIL_DOMAIN = "bench.chefly.test"
+CHUNK_SIZE = 5000
+
+
+def seed_email(index: int) -> str:
+    return f"user{index}@{SEED_EMAIL_DOMAIN}"
+
+
+class ZipfSampler:
+    """Draw indexes in ``[0, n)`` with probability proportional to ``1 / (rank + 1) ** s``."""
+
+    def __init__(self, n: int, s: float, rng: random.Random):
+        self.rng = rng
+        self.cumulative = list(itertools.accumulate(1.0 / (rank + 1) ** s for rank in range(n)))
+        self.total = self.cumulative[-1]
+
+    def sample(self) -> int:
+        return bisect.bisect_left(self.cumulative, self.rng.random() * self.total)
+
+
+def _chunks(rows: list, size: int = CHUNK_SIZE):
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
+
+
+async def _bulk_insert(conn, model, rows: list) -> None:
+    for chunk in _chunks(rows):
+        await conn.execute(insert(model.__table__), chunk)
+
+
+async def seed(args: argparse.Namespace) -> dict:
+    rng = random.Random(args.seed)
+    now = datetime.now(timezone.utc)
+    started = time.perf_counter()
+
+    async with get_engine().begin() as conn:
+        if args.create_schema:
+            await conn.run_sync(SQLModel.metadata.create_all)
+
+        hashed = hash_password(SEED_PASSWORD)
+        user_ids: list[UUID] = [uuid4() for _ in range(args.users)]
+        await _bulk_insert(
+            conn,
+            User,
+            [
+                {
+                    "id": user_id,
+                    "first_name": "Bench",
+                    "last_name": f"User{i}",
+                    "username": f"bench_{i}_{user_id.hex[:6]}",
+                    "email": seed_email(i),
+                    "hashed_password": hashed,
+                    "is_verified": True,
+                }
+                for i, user_id in enumerate(user_ids)
+            ],
+        )
+
+        popularity = ZipfSampler(args.users, args.zipf, rng)
+        follow_edges: set[tuple[int, int]] = set()
+        for follower in range(args.users):
+            degree = min(int(rng.paretovariate(args.follow_alpha)) - 1, args.max_following, args.users - 1)
+            for _ in range(max(degree, 0)):
+                target = popularity.sample()
+                if target != follower:
+                    follow_edges.add((follower, target))
+        await _bulk_insert(
+            conn,
+            Follows,
+            [
+                {"follower_id": user_ids[a], "following_id": user_ids[b]}
+                for a, b in follow_edges
+            ],
+        )
+
+        post_types = list(PostType)
+        post_ids: list[UUID] = [uuid4() for _ in range(args.posts)]
+        await _bulk_insert(
+            conn,
+            Posts,
+            [
+                {
+                    "id": post_id,
+                    "title": f"Benchmark recipe {i}",
+                    "content": f"Synthetic content for post {i}. " * 4,
+                    "content_type": rng.choice(post_types),
+                    "author_id": user_ids[popularity.sample()],
+                    "created_at": now - timedelta(seconds=rng.randrange(args.max_age_days * 86400)),
+                }
+                for i, post_id in enumerate(post_ids)
+            ],
+        )
+
+        post_popularity = ZipfSampler(args.posts, args.zipf, rng)
+        vote_pairs: set[tuple[int, int]] = set()
+        for _ in range(args.votes):
+            vote_pairs.add((rng.randrange(args.users), post_popularity.sample()))
+        await _bulk_insert(
+            conn,
+            Votes,
+            [
+                {
+                    "user_id": user_ids[u],
+                    "post_id": post_ids[p],
+                    "vote_type": VoteType.UPVOTE if rng.random() < args.upvote_ratio else VoteType.DOWNVOTE,
+                }
+                for u, p in vote_pairs
+            ],
+        )
+
+        comments_by_post: dict[int, list[UUID]] = {}
+        comment_rows = []
+        for _ in range(args.comments):
+            post_index = post_popularity.sample()
+            siblings = comments_by_post.setdefault(post_index, [])
+            comment_id = uuid4()
+            comment_rows.append(
+                {
+                    "id": comment_id,
+                    "post_id": post_ids[post_index],
+                    "user_id": user_ids[rng.randrange(args.users)],
+                    "content": "Synthetic benchmark comment.",
+                    "parent_id": rng.choice(siblings) if siblings and rng.random() < args.reply_ratio else None,
+                }
+            )
+            siblings.append(comment_id)
+        await _bulk_insert(conn, Comments, comment_rows)
+
+        await conn.execute(text(
+            """
+            UPDATE posts p SET
+                upvote_count = COALESCE(v.up, 0),
+                downvote_count = COALESCE(v.down, 0),
+                comment_count = COALESCE(c.n, 0)
+            FROM posts p2
+            LEFT JOIN (
+                SELECT post_id,
+                       count(*) FILTER (WHERE vote_type = 'UPVOTE') AS up,
+                       count(*) FILTER (WHERE vote_type = 'DOWNVOTE') AS down
+                FROM votes GROUP BY post_id
+            ) v ON v.post_id = p2.id
+            LEFT JOIN (
+                SELECT post_id, count(*) AS n FROM comments WHERE NOT is_deleted GROUP BY post_id
+            ) c ON c.post_id = p2.id
+            WHERE p.id = p2.id
+            """
+        ))
+        posts = Posts.__table__
+        await conn.execute(
+            update(posts).values(
+                hot_score=hot_score_sql(posts.c.upvote_count, posts.c.downvote_count, posts.c.comment_count, posts.c.created_at)
+            )
+        )
+        await conn.execute(text(
+            """
+            UPDATE users u SET
+                followers_count = COALESCE(fr.n, 0),
+                following_count = COALESCE(fg.n, 0)
+            FROM users u2
+            LEFT JOIN (SELECT following_id, count(*) AS n FROM follows GROUP BY following_id) fr
+                ON fr.following_id = u2.id
+            LEFT JOIN (SELECT follower_id, count(*) AS n FROM follows GROUP BY follower_id) fg
+                ON fg.follower_id = u2.id
+            WHERE u.id = u2.id
+            """
+        ))
+
+    await dispose_engine()
+    return {
+        "users": args.users,
+        "follows": len(follow_edges),
+        "posts": args.posts,
+        "votes": len(vote_pairs),
+        "comments": len(comment_rows),
+        "password": SEED_PASSWORD,
+        "email_pattern": f"user{{i}}@{SEED_EMAIL_DOMAIN}",
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--posts", type=int, default=10000)
+    parser.add_argument("--votes", type=int, default=100000)
+    parser.add_argument("--comments", type=int, default=20000)
+    parser.add_argument("--follow-alpha", type=float, default=1.2, help="Pareto shape of follow out-degree")
+    parser.add_argument("--max-following", type=int, default=2000)
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent for user/post popularity")
+    parser.add_argument("--upvote-ratio", type=float, default=0.8)
+    parser.add_argument("--reply-ratio", type=float, default=0.4)
+    parser.add_argument("--max-age-days", type=int, default=90)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--create-schema", action="store_true", help="Run metadata.create_all first")
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    print(json.dumps(asyncio.run(seed(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
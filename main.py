@@ -1,5 +1,225 @@
-def main():
-    print("Hello from chefly!")
+"""Production entry point for the chefly API.
+
+Usage::
+
+    python main.py                                  # one worker per core
+    python main.py --workers 8 --db-connection-budget 80 --cpu-affinity
+    python main.py --print-config                   # show the effective config and exit
+
+The supervisor binds the listening socket once and spawns one process per
+worker, each running uvicorn on uvloop and httptools. It restarts workers that
+crash. On SIGTERM/SIGINT it forwards SIGTERM to the workers, which stop
+accepting connections and drain in-flight requests for up to
+``--graceful-timeout`` seconds. Workers still running after that are killed.
+
+``--db-connection-budget`` is the number of Postgres connections this instance
+may hold. It is split evenly across workers and exported to them as
+``DB_POOL_SIZE``/``DB_MAX_OVERFLOW``, so adding workers never oversubscribes
+the database.
+"""
+
+import argparse
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Optional
+
+DEFAULT_GRACEFUL_TIMEOUT = 30
+SUPERVISOR_POLL_INTERVAL = 0.5
+
+
+def default_workers() -> int:
+    if os.environ.get("WEB_CONCURRENCY"):
+        return int(os.environ["WEB_CONCURRENCY"])
+    return len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+
+
+def split_connection_budget(budget: int, workers: int) -> tuple[int, int]:
+    """Return ``(pool_size, max_overflow)`` per worker for a per-instance connection budget."""
+    per_worker = budget // workers
+    if per_worker < 1:
+        raise SystemExit(f"--db-connection-budget {budget} is smaller than --workers {workers}")
+    # Keep a quarter of each worker's share as overflow for bursts.
+    max_overflow = per_worker // 4
+    return per_worker - max_overflow, max_overflow
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default=os.environ.get("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 8000)))
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--loop", choices=["uvloop", "asyncio", "auto"], default="uvloop")
+    parser.add_argument("--http", choices=["httptools", "h11", "auto"], default="httptools")
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--keep-alive", type=int, default=5, help="Keep-alive timeout in seconds")
+    parser.add_argument("--graceful-timeout", type=int, default=DEFAULT_GRACEFUL_TIMEOUT)
+    parser.add_argument(
+        "--db-connection-budget",
+        type=int,
+        default=int(os.environ["DB_CONNECTION_BUDGET"]) if os.environ.get("DB_CONNECTION_BUDGET") else None,
+        help="Total Postgres connections for this instance, split across workers",
+    )
+    parser.add_argument("--cpu-affinity", action="store_true", help="Pin each worker to one CPU (Linux only)")
+    parser.add_argument("--proxy-headers", action="store_true", help="Trust X-Forwarded-* from --forwarded-allow-ips")
+    parser.add_argument("--forwarded-allow-ips", default="127.0.0.1")
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--print-config", action="store_true", help="Print the effective configuration and exit")
+    return parser
+
+
+def uvicorn_options(args: argparse.Namespace) -> dict:
+    return {
+        "loop": args.loop,
+        "http": args.http,
+        "backlog": args.backlog,
+        "timeout_keep_alive": args.keep_alive,
+        "timeout_graceful_shutdown": args.graceful_timeout,
+        "proxy_headers": args.proxy_headers,
+        "forwarded_allow_ips": args.forwarded_allow_ips,
+        "log_level": args.log_level,
+        "lifespan": "on",
+    }
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    """Export per-worker settings; spawned workers read them through ``Settings``."""
+    if args.db_connection_budget is not None:
+        pool_size, max_overflow = split_connection_budget(args.db_connection_budget, args.workers)
+        os.environ["DB_POOL_SIZE"] = str(pool_size)
+        os.environ["DB_MAX_OVERFLOW"] = str(max_overflow)
+
+
+def effective_config(args: argparse.Namespace) -> list[tuple[str, str]]:
+    from api.config import Config
+
+    cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+    db_per_worker = Config.DB_POOL_SIZE + Config.DB_MAX_OVERFLOW
+    redis_per_worker = Config.REDIS_MAX_CONNECTIONS + Config.REDIS_AUTH_MAX_CONNECTIONS + Config.REDIS_FYP_MAX_CONNECTIONS
+    return [
+        ("bind", f"{args.host}:{args.port} (backlog {args.backlog})"),
+        ("workers", str(args.workers)),
+        ("cpus available", f"{len(cpus)} {cpus}"),
+        ("cpu affinity", "one cpu per worker" if args.cpu_affinity else "off"),
+        ("event loop / http", f"{args.loop} / {args.http}"),
+        ("graceful timeout", f"{args.graceful_timeout}s"),
+        ("db pool per worker", f"{Config.DB_POOL_SIZE} + {Config.DB_MAX_OVERFLOW} overflow (timeout {Config.DB_POOL_TIMEOUT}s)"),
+        ("db connections max", f"{db_per_worker * args.workers} ({db_per_worker} x {args.workers} workers)"),
+        ("redis mode", Config.REDIS_MODE),
+        (
+            "redis pools per worker",
+            f"general {Config.REDIS_MAX_CONNECTIONS}, auth {Config.REDIS_AUTH_MAX_CONNECTIONS}, fyp {Config.REDIS_FYP_MAX_CONNECTIONS}",
+        ),
+        ("redis connections max", f"{redis_per_worker * args.workers}"),
+        (
+            "load shedding",
+            f"{Config.LOAD_SHED_MAX_IN_FLIGHT} in flight per worker" if Config.LOAD_SHEDDING_ENABLED else "off",
+        ),
+        ("rate limiting", "on" if Config.RATE_LIMIT_ENABLED else "off"),
+        ("metrics", "/metrics (per worker)" if Config.METRICS_ENABLED else "off"),
+    ]
+
+
+def print_config(args: argparse.Namespace) -> None:
+    rows = effective_config(args)
+    width = max(len(key) for key, _ in rows)
+    print("chefly runtime configuration", file=sys.stderr)
+    for key, value in rows:
+        print(f"  {key:<{width}}  {value}", file=sys.stderr)
+
+
+def serve_worker(options: dict, sock: socket.socket, index: int, cpus: Optional[list[int]]) -> None:
+    import uvicorn
+
+    # Own process group: a terminal Ctrl-C reaches only the supervisor, which
+    # forwards a single SIGTERM. A second signal would make uvicorn skip the drain.
+    os.setpgrp()
+    if cpus:
+        os.sched_setaffinity(0, {cpus[index % len(cpus)]})
+    os.environ["WORKER_INDEX"] = str(index)
+    config = uvicorn.Config("api:app", **options)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class Supervisor:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.options = uvicorn_options(args)
+        self.context = multiprocessing.get_context("spawn")
+        self.cpus = sorted(os.sched_getaffinity(0)) if args.cpu_affinity else None
+        self.processes: list[Optional[multiprocessing.Process]] = [None] * args.workers
+        self.stopping = False
+
+    def bind(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET6 if ":" in self.args.host else socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.args.host, self.args.port))
+        sock.listen(self.args.backlog)
+        sock.set_inheritable(True)
+        return sock
+
+    def spawn(self, index: int, sock: socket.socket) -> None:
+        process = self.context.Process(
+            target=serve_worker,
+            args=(self.options, sock, index, self.cpus),
+            name=f"chefly-worker-{index}",
+        )
+        process.start()
+        self.processes[index] = process
+
+    def handle_signal(self, signum, frame) -> None:
+        self.stopping = True
+
+    def run(self) -> None:
+        sock = self.bind()
+        signal.signal(signal.SIGTERM, self.handle_signal)
+        signal.signal(signal.SIGINT, self.handle_signal)
+        for index in range(self.args.workers):
+            self.spawn(index, sock)
+        print(f"Started {self.args.workers} workers (supervisor pid {os.getpid()})", file=sys.stderr)
+
+        while not self.stopping:
+            time.sleep(SUPERVISOR_POLL_INTERVAL)
+            for index, process in enumerate(self.processes):
+                if not self.stopping and process is not None and not process.is_alive():
+                    print(f"Worker {index} (pid {process.pid}) exited with {process.exitcode}; restarting", file=sys.stderr)
+                    self.spawn(index, sock)
+
+        self.shutdown()
+        sock.close()
+
+    def shutdown(self) -> None:
+        print("Draining workers", file=sys.stderr)
+        for process in self.processes:
+            if process is not None and process.is_alive():
+                os.kill(process.pid, signal.SIGTERM)
+
+        deadline = time.monotonic() + self.args.graceful_timeout + 5
+        for process in self.processes:
+            if process is not None:
+                process.join(max(0, deadline - time.monotonic()))
+        for process in self.processes:
+            if process is not None and process.is_alive():
+                print(f"Worker pid {process.pid} did not drain in time; killing", file=sys.stderr)
+                process.kill()
+                process.join()
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    if args.workers < 1:
+        raise SystemExit("--workers must be at least 1")
+    if args.cpu_affinity and not hasattr(os, "sched_setaffinity"):
+        raise SystemExit("--cpu-affinity is only supported on Linux")
+
+    configure_environment(args)
+    print_config(args)
+    if args.print_config:
+        return
+    Supervisor(args).run()
 
 
 if __name__ == "__main__":
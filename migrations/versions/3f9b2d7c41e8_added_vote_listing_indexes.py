@@ -0,0 +1,37 @@
+"""added vote listing indexes
+
+Revision ID: 3f9b2d7c41e8
+Revises: ac6796f1136a
+Create Date: 2026-10-19 10:12:44.102311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9b2d7c41e8'
+down_revision: Union[str, Sequence[str], None] = 'ac6796f1136a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction, and a plain
+    # CREATE INDEX would block vote writes for the whole build.
+    with op.get_context().autocommit_block():
+        # VoteService.get_votes_by_post: post_id = ? ORDER BY created_at DESC, id DESC
+        op.create_index('ix_votes_post_id_created_at_id', 'votes', ['post_id', 'created_at', 'id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        # VoteService.get_votes_by_user: user_id = ? ORDER BY created_at DESC, id DESC
+        op.create_index('ix_votes_user_id_created_at_id', 'votes', ['user_id', 'created_at', 'id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_votes_user_id_created_at_id', table_name='votes', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_votes_post_id_created_at_id', table_name='votes', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,36 @@
+"""replaced posts author upvote index
+
+Revision ID: 4a8c2e6f1d93
+Revises: 9e5a1c7d3b62
+Create Date: 2026-10-19 23:02:47.518304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a8c2e6f1d93'
+down_revision: Union[str, Sequence[str], None] = '9e5a1c7d3b62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # get_personalized_posts now orders candidates by hot_score, which left
+    # (author_id, upvote_count) unused. Build the replacement before dropping it.
+    with op.get_context().autocommit_block():
+        # get_personalized_posts: author_id IN (...) ORDER BY hot_score DESC
+        op.create_index('ix_posts_author_id_hot_score', 'posts', ['author_id', 'hot_score'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_posts_author_id_upvote_count', table_name='posts', postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_posts_author_id_upvote_count', 'posts', ['author_id', 'upvote_count'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_posts_author_id_hot_score', table_name='posts', postgresql_concurrently=True, if_exists=True)
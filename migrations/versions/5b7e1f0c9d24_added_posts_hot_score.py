@@ -0,0 +1,62 @@
+"""added posts hot score
+
+Revision ID: 5b7e1f0c9d24
+Revises: 8d41c6e2a9f3
+Create Date: 2026-10-19 16:42:10.215907
+
+"""
+from typing import Sequence, Union
+from uuid import UUID
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7e1f0c9d24'
+down_revision: Union[str, Sequence[str], None] = '8d41c6e2a9f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('posts', sa.Column('hot_score', postgresql.DOUBLE_PRECISION(), server_default='0', nullable=False))
+    # Backfill with the formula from api/posts/ranking.py as of this revision.
+    # Keyset-ordered batches, each committed on its own, so no single
+    # transaction holds row locks on (or rewrites) the whole table.
+    backfill = sa.text(
+        """
+        WITH batch AS (
+            SELECT id FROM posts WHERE id > :last_id ORDER BY id LIMIT :batch_size
+        )
+        UPDATE posts SET hot_score =
+            sign(coalesce(upvote_count, 0) - coalesce(downvote_count, 0) + 0.5 * coalesce(comment_count, 0))
+            * log(greatest(abs(coalesce(upvote_count, 0) - coalesce(downvote_count, 0) + 0.5 * coalesce(comment_count, 0)), 1))
+            + (extract(epoch FROM created_at) - 1735689600) / 45000
+        FROM batch WHERE posts.id = batch.id
+        RETURNING posts.id
+        """
+    )
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        last_id = UUID(int=0)
+        while True:
+            updated = bind.execute(backfill, {"last_id": last_id, "batch_size": BACKFILL_BATCH_SIZE}).scalars().all()
+            if not updated:
+                break
+            last_id = max(updated)
+
+        # PostService.hot_feed: ORDER BY hot_score DESC, id DESC with a keyset cursor
+        op.create_index('ix_posts_hot_score_id', 'posts', ['hot_score', 'id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_posts_hot_score_id', table_name='posts', postgresql_concurrently=True, if_exists=True)
+    op.drop_column('posts', 'hot_score')
@@ -0,0 +1,32 @@
+"""added follows follower created index
+
+Revision ID: 7c3d9a5e2f10
+Revises: e2c4a8f61b37
+Create Date: 2026-10-19 18:05:31.447120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3d9a5e2f10'
+down_revision: Union[str, Sequence[str], None] = 'e2c4a8f61b37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Follow suggestions: most recent follows of a user, LIMIT-ed per seed
+    with op.get_context().autocommit_block():
+        op.create_index('ix_follows_follower_id_created_at', 'follows', ['follower_id', 'created_at'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_follows_follower_id_created_at', table_name='follows', postgresql_concurrently=True, if_exists=True)
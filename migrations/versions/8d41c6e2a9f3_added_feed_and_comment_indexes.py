@@ -0,0 +1,46 @@
+"""added feed and comment indexes
+
+Revision ID: 8d41c6e2a9f3
+Revises: 3f9b2d7c41e8
+Create Date: 2026-10-19 14:05:31.448120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d41c6e2a9f3'
+down_revision: Union[str, Sequence[str], None] = '3f9b2d7c41e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction. if_not_exists
+    # makes a rerun safe after an interrupted build; an INVALID leftover index
+    # still has to be dropped by hand.
+    with op.get_context().autocommit_block():
+        # PostService.feed: ORDER BY created_at DESC, upvote_count DESC
+        op.create_index('ix_posts_created_at_upvote_count', 'posts', ['created_at', 'upvote_count'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        # PostService.following_feed: author_id IN (...) ORDER BY created_at DESC
+        op.create_index('ix_posts_author_id_created_at', 'posts', ['author_id', 'created_at'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        # get_personalized_posts: author_id IN (...) ORDER BY upvote_count DESC
+        op.create_index('ix_posts_author_id_upvote_count', 'posts', ['author_id', 'upvote_count'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        # CommentService: live comments / replies ordered by created_at
+        op.create_index('ix_comments_live_post_id_created_at', 'comments', ['post_id', 'created_at'], unique=False, postgresql_where=sa.text('NOT is_deleted'), postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_comments_live_parent_id_created_at', 'comments', ['parent_id', 'created_at'], unique=False, postgresql_where=sa.text('NOT is_deleted'), postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_comments_live_parent_id_created_at', table_name='comments', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_comments_live_post_id_created_at', table_name='comments', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_posts_author_id_upvote_count', table_name='posts', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_posts_author_id_created_at', table_name='posts', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_posts_created_at_upvote_count', table_name='posts', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,37 @@
+"""added follow graph outbox
+
+Revision ID: 9e5a1c7d3b62
+Revises: 7c3d9a5e2f10
+Create Date: 2026-10-19 21:14:08.302915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '9e5a1c7d3b62'
+down_revision: Union[str, Sequence[str], None] = '7c3d9a5e2f10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Follow graph events written in the follow transaction, drained to Redis by the relay
+    op.create_table('follow_graph_outbox',
+    sa.Column('id', sa.BIGINT(), autoincrement=True, nullable=False),
+    sa.Column('follower_id', sa.UUID(), nullable=False),
+    sa.Column('following_id', sa.UUID(), nullable=False),
+    sa.Column('followed', sa.BOOLEAN(), nullable=False),
+    sa.Column('created_at', postgresql.TIMESTAMP(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('follow_graph_outbox')
@@ -0,0 +1,41 @@
+"""added per type feed indexes
+
+Revision ID: e2c4a8f61b37
+Revises: 5b7e1f0c9d24
+Create Date: 2026-10-19 17:20:44.903512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2c4a8f61b37'
+down_revision: Union[str, Sequence[str], None] = '5b7e1f0c9d24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# post_type enum label -> index name prefix
+POST_TYPES = (('RECIPE', 'recipe'), ('TIP', 'tip'), ('OTHER', 'other'))
+# feed (created_at DESC, upvote_count DESC), hot feed (hot_score DESC, id DESC),
+# FYP popular posts (upvote_count DESC)
+COLUMN_SETS = (('created_at', 'upvote_count'), ('hot_score', 'id'), ('upvote_count',))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for label, prefix in POST_TYPES:
+            for columns in COLUMN_SETS:
+                op.create_index(f"ix_posts_{prefix}_{'_'.join(columns)}", 'posts', list(columns), unique=False, postgresql_where=sa.text(f"content_type = '{label}'"), postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for label, prefix in POST_TYPES:
+            for columns in COLUMN_SETS:
+                op.drop_index(f"ix_posts_{prefix}_{'_'.join(columns)}", table_name='posts', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,204 @@
+"""EXPLAIN audit of the read paths issued by the service layer.
+
+The read paths of ``PostService``, ``CommentService``, ``VoteService`` and
+``FollowService`` run against a handful of seeded rows, and every statement
+they emit is captured together with its bound parameters. Each statement then
+goes through ``EXPLAIN (FORMAT JSON)`` with ``enable_seqscan`` off: on tables
+this small the planner would pick a sequential scan anyway, but with it
+disabled a ``Seq Scan`` only survives when the table has no index at all, and
+an index scan with a ``Filter`` but no ``Index Cond`` means the planner walked
+an unrelated index instead. A case fails on either, unless it is marked
+``allow_seq_scan`` (e.g. the unbounded ``get_all_posts``). Write paths are not
+audited because the services commit their own transactions.
+
+Like ``test_query_budgets``, the tests run against the Postgres in ``DB_URL``
+and are skipped when it is unreachable::
+
+    python -m unittest discover tests
+"""
+
+import json
+import unittest
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+from uuid import uuid4
+
+from sqlalchemy import delete, event, or_, text
+from sqlmodel import SQLModel
+
+from api.comments.service import CommentService
+from api.db.main import dispose_engine, get_engine, get_sessionmaker
+from api.db.models import Comments, Follows, Posts, PostType, User, Votes, VoteType
+from api.db.redis import close_redis_clients
+from api.follows.service import FollowService
+from api.follows.suggestions import compute_follow_suggestions
+from api.posts.algorithm import CANDIDATE_POOL_SIZE, candidate_query, get_popular_posts
+from api.posts.service import PostService
+from api.votes.service import VoteService
+
+post_service = PostService()
+comment_service = CommentService()
+vote_service = VoteService()
+follow_service = FollowService()
+
+
+@dataclass
+class Case:
+    name: str
+    run: Callable[..., Awaitable[object]]
+    allow_seq_scan: bool = False
+
+
+CASES = [
+    Case("PostService.get_post_by_id", lambda s, ids: post_service.get_post_by_id(str(ids["post_id"]), s)),
+    Case("PostService.get_all_posts", lambda s, ids: post_service.get_all_posts(s), allow_seq_scan=True),
+    Case("PostService.feed", lambda s, ids: post_service.feed(s, limit=20)),
+    Case("PostService.feed (deep page)", lambda s, ids: post_service.feed(s, limit=20, offset=200)),
+    Case("PostService.hot_feed", lambda s, ids: post_service.hot_feed(s, limit=20)),
+    Case("PostService.feed (recipes)", lambda s, ids: post_service.feed(s, limit=20, content_type=PostType.RECIPE)),
+    Case("PostService.hot_feed (tips)", lambda s, ids: post_service.hot_feed(s, limit=20, content_type=PostType.TIP)),
+    Case("get_popular_posts (recipes)", lambda s, ids: get_popular_posts(s, 200, 0, PostType.RECIPE)),
+    Case(
+        "get_personalized_posts candidates",
+        lambda s, ids: s.execute(candidate_query([ids["followed_id"]], CANDIDATE_POOL_SIZE)),
+    ),
+    Case("PostService.following_feed", lambda s, ids: post_service.following_feed(ids["follower_id"], s, limit=20)),
+    Case("CommentService.get_comments_by_post", lambda s, ids: comment_service.get_comments_by_post(ids["post_id"], s)),
+    Case("CommentService.get_replies_to_comment", lambda s, ids: comment_service.get_replies_to_comment(ids["comment_id"], s)),
+    Case("CommentService.get_comment_by_id", lambda s, ids: comment_service.get_comment_by_id(ids["comment_id"], s)),
+    Case("VoteService.get_votes_by_post", lambda s, ids: vote_service.get_votes_by_post(ids["post_id"], s)),
+    Case("VoteService.get_votes_by_user", lambda s, ids: vote_service.get_votes_by_user(ids["follower_id"], s)),
+    Case(
+        "VoteService.get_vote_summary",
+        lambda s, ids: vote_service.get_vote_summary(Votes.post_id == ids["post_id"], s),
+    ),
+    Case(
+        "VoteService.get_user_votes_for_posts",
+        lambda s, ids: vote_service.get_user_votes_for_posts(ids["follower_id"], [ids["post_id"]], s),
+    ),
+    Case("FollowService.get_followers", lambda s, ids: follow_service.get_followers(ids["followed_id"], s)),
+    Case("FollowService.get_following", lambda s, ids: follow_service.get_following(ids["follower_id"], s)),
+    Case("FollowService.get_followers_count", lambda s, ids: follow_service.get_followers_count(ids["followed_id"], s)),
+    Case(
+        "FollowService.get_follow_status",
+        lambda s, ids: follow_service.get_follow_status(ids["follower_id"], ids["followed_id"], s),
+    ),
+    Case("compute_follow_suggestions", lambda s, ids: compute_follow_suggestions(s, ids["follower_id"])),
+]
+
+
+def _unindexed_scans(plan: dict) -> list[str]:
+    """Relations read without an index serving the predicate.
+
+    With ``enable_seqscan`` off the planner walks a whole unrelated index
+    rather than the heap, so an index scan that only filters (no ``Index
+    Cond``) counts as well as a plain ``Seq Scan``.
+    """
+    found = []
+    node_type = plan.get("Node Type")
+    if node_type == "Seq Scan" or (
+        node_type in ("Index Scan", "Index Only Scan") and "Filter" in plan and "Index Cond" not in plan
+    ):
+        found.append(f"{node_type} on {plan['Relation Name']}")
+    for child in plan.get("Plans", []):
+        found.extend(_unindexed_scans(child))
+    return found
+
+
+class ExplainAuditTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        try:
+            async with get_engine().begin() as conn:
+                await conn.execute(text("SELECT 1"))
+                await conn.run_sync(SQLModel.metadata.create_all)
+        except Exception as e:
+            await self._close()
+            self.skipTest(f"Postgres is required: {e}")
+
+        suffix = uuid4().hex[:12]
+        self.users = [
+            User(
+                first_name="Explain",
+                last_name="Audit",
+                username=f"explain_{role}_{suffix}",
+                email=f"explain_{role}_{suffix}@example.com",
+                hashed_password="unused",
+            )
+            for role in ("follower", "followed")
+        ]
+        follower, followed = self.users
+        self.posts = [
+            Posts(title=f"Explain audit {post_type.value}", content_type=post_type, content="...", author_id=followed.id)
+            for post_type in PostType
+        ]
+        comment = Comments(post_id=self.posts[0].id, user_id=follower.id, content="comment")
+        async with get_sessionmaker()() as session:
+            session.add_all(self.users)
+            await session.flush()
+            session.add_all(self.posts)
+            session.add(Follows(follower_id=follower.id, following_id=followed.id))
+            await session.flush()
+            session.add(comment)
+            session.add(Votes(post_id=self.posts[0].id, user_id=follower.id, vote_type=VoteType.UPVOTE))
+            await session.flush()
+            session.add(Comments(post_id=self.posts[0].id, user_id=followed.id, content="reply", parent_id=comment.id))
+            await session.commit()
+
+        self.ids = {
+            "post_id": self.posts[0].id,
+            "comment_id": comment.id,
+            "follower_id": follower.id,
+            "followed_id": followed.id,
+        }
+
+    async def asyncTearDown(self):
+        user_ids = [user.id for user in self.users]
+        post_ids = [post.id for post in self.posts]
+        async with get_sessionmaker()() as session:
+            await session.execute(delete(Votes).where(Votes.post_id.in_(post_ids)))
+            await session.execute(delete(Comments).where(Comments.post_id.in_(post_ids)))
+            await session.execute(delete(Posts).where(Posts.id.in_(post_ids)))
+            await session.execute(
+                delete(Follows).where(or_(Follows.follower_id.in_(user_ids), Follows.following_id.in_(user_ids)))
+            )
+            await session.execute(delete(User).where(User.id.in_(user_ids)))
+            await session.commit()
+        await self._close()
+
+    async def _close(self):
+        # Each test runs on its own event loop, so pooled connections must not outlive it.
+        await dispose_engine()
+        await close_redis_clients()
+
+    async def _capture(self, case: Case) -> list[tuple[str, object]]:
+        engine = get_engine()
+        captured = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+                captured.append((statement, parameters))
+
+        event.listen(engine.sync_engine, "before_cursor_execute", capture)
+        try:
+            async with get_sessionmaker()() as session:
+                await case.run(session, self.ids)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", capture)
+        return captured
+
+    async def test_read_paths_are_served_by_indexes(self):
+        for case in CASES:
+            with self.subTest(case=case.name):
+                statements = await self._capture(case)
+                self.assertTrue(statements, f"{case.name} issued no SELECT")
+                for statement, parameters in statements:
+                    async with get_engine().connect() as conn:
+                        await conn.exec_driver_sql("SET enable_seqscan = off")
+                        plan = (await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)).scalar()
+                    plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+                    if not case.allow_seq_scan:
+                        self.assertEqual(_unindexed_scans(plan), [], " ".join(statement.split()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+"""Query budgets for hot read paths, enforced with ``assert_max_queries``.
+
+The tests run against the Postgres in ``DB_URL`` and the Redis in
+``REDIS_HOST``/``REDIS_PORT``. They create the tables with ``create_all`` and
+delete every row they add. When either service is unreachable they are
+skipped. Run them with::
+
+    python -m unittest discover tests
+"""
+
+import unittest
+from uuid import uuid4
+
+import httpx
+from sqlalchemy import delete, text
+from sqlmodel import SQLModel
+
+from api import app
+from api.auth.utils import create_access_token
+from api.db.main import dispose_engine, get_engine, get_sessionmaker
+from api.db.models import Comments, Posts, PostType, User
+from api.db.redis import close_redis_clients, redis_client
+from api.instrumentation import assert_max_queries
+
+# The whole comment tree is one SELECT, however many comments and replies a post has.
+COMMENT_TREE_BUDGET = 1
+
+
+class CommentTreeQueryBudgetTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        try:
+            async with get_engine().begin() as conn:
+                await conn.execute(text("SELECT 1"))
+                await conn.run_sync(SQLModel.metadata.create_all)
+            await redis_client.ping()
+        except Exception as e:
+            await self._close()
+            self.skipTest(f"Postgres and Redis are required: {e}")
+
+        suffix = uuid4().hex[:12]
+        self.user = User(
+            first_name="Query",
+            last_name="Budget",
+            username=f"budget_{suffix}",
+            email=f"budget_{suffix}@example.com",
+            hashed_password="unused",
+        )
+        self.post = Posts(title="Query budget", content_type=PostType.RECIPE, content="...", author_id=self.user.id)
+        async with get_sessionmaker()() as session:
+            session.add(self.user)
+            await session.flush()
+            session.add(self.post)
+            await session.commit()
+
+        token = create_access_token({"user_id": str(self.user.id), "email": self.user.email})
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+        self.client.headers["Authorization"] = f"Bearer {token}"
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+        async with get_sessionmaker()() as session:
+            await session.execute(delete(Comments).where(Comments.post_id == self.post.id))
+            await session.execute(delete(Posts).where(Posts.id == self.post.id))
+            await session.execute(delete(User).where(User.id == self.user.id))
+            await session.commit()
+        await self._close()
+
+    async def _close(self):
+        # Each test runs on its own event loop, so pooled connections must not outlive it.
+        await dispose_engine()
+        await close_redis_clients()
+
+    async def add_comments(self, count: int, replies_each: int) -> None:
+        async with get_sessionmaker()() as session:
+            for i in range(count):
+                comment = Comments(post_id=self.post.id, user_id=self.user.id, content=f"comment {i}")
+                session.add(comment)
+                for j in range(replies_each):
+                    session.add(
+                        Comments(post_id=self.post.id, user_id=self.user.id, content=f"reply {i}.{j}", parent_id=comment.id)
+                    )
+            await session.commit()
+
+    async def test_comment_tree_is_one_query(self):
+        await self.add_comments(count=25, replies_each=3)
+
+        with assert_max_queries(COMMENT_TREE_BUDGET):
+            response = await self.client.get(f"/comments/post/{self.post.id}")
+
+        self.assertEqual(response.status_code, 200)
+        comments = response.json()
+        self.assertEqual(len(comments), 25)
+        self.assertTrue(all(len(comment["replies"]) == 3 for comment in comments))
+
+    async def test_comment_tree_budget_does_not_grow_with_comments(self):
+        await self.add_comments(count=1, replies_each=1)
+        with assert_max_queries(COMMENT_TREE_BUDGET) as small:
+            await self.client.get(f"/comments/post/{self.post.id}")
+
+        await self.add_comments(count=40, replies_each=2)
+        with assert_max_queries(COMMENT_TREE_BUDGET) as large:
+            response = await self.client.get(f"/comments/post/{self.post.id}")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(large.sql_statements, small.sql_statements)
+
+
+if __name__ == "__main__":
+    unittest.main()